@@ -16,3 +16,6 @@ class AuthRepositoryInterface(ABC):
 
     @abstractmethod
     async def save_user(self, username: str, password: str, email: Optional[str]) -> User: pass
+
+    @abstractmethod
+    async def update_password(self, user_id: int, password: str): pass
@@ -1,35 +1,34 @@
 from fastapi import APIRouter, status, Depends
 from fastapi.security import OAuth2PasswordRequestForm
-from passlib.context import CryptContext
 from sqlalchemy.ext.asyncio import AsyncSession
+from container import get_password_service, get_token_service
 from database import get_db
 from .schemas import CreateUserSchema, Token, RefreshToken
 from .services import AuthServices
 from .repositories import AuthRepository
-from .password_service import PasswordService
-from .token_service import TokenService
+from .password_interface import PasswordInterface
+from .token_interface import TokenInterface
 
 from profile.schemas import ResponseUserSchema
 
 auth_router = APIRouter(prefix='/auth', tags=['auth'])
 
 
+def get_auth_service(db: AsyncSession = Depends(get_db), password_service: PasswordInterface = Depends(get_password_service),
+                     token_service: TokenInterface = Depends(get_token_service)) -> AuthServices:
+    return AuthServices(repository=AuthRepository(session=db), password_service=password_service, token_service=token_service)
+
+
 @auth_router.post('/signup', status_code=status.HTTP_201_CREATED, response_model=ResponseUserSchema)
-async def sign_up(user_data: CreateUserSchema, db: AsyncSession = Depends(get_db)):
-    return await AuthServices(repository=AuthRepository(session=db),
-                              password_service=PasswordService(context=CryptContext(schemes=["bcrypt"], deprecated="auto"))) \
-        .sign_up(data=user_data)
+async def sign_up(user_data: CreateUserSchema, service: AuthServices = Depends(get_auth_service)):
+    return await service.sign_up(data=user_data)
 
 
 @auth_router.post('/login', status_code=status.HTTP_200_OK, response_model=Token)
-async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
-    return await AuthServices(repository=AuthRepository(session=db), token_service=TokenService(),
-                              password_service=PasswordService(context=CryptContext(schemes=['bcrypt'], deprecated='auto'))) \
-        .save_user(username=form_data.username, password=form_data.password)
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), service: AuthServices = Depends(get_auth_service)):
+    return await service.save_user(username=form_data.username, password=form_data.password)
 
 
 @auth_router.post('/refresh_token', response_model=Token, status_code=status.HTTP_201_CREATED)
-async def refresh_token(refresh_token_data: RefreshToken, db: AsyncSession = Depends(get_db)):
-    return await AuthServices(repository=AuthRepository(session=db), token_service=TokenService(),
-                              password_service=PasswordService(context=CryptContext(schemes=['bcrypt'], deprecated='auto'))) \
-        .refresh_token(refresh_token=refresh_token_data.refresh_token)
+async def refresh_token(refresh_token_data: RefreshToken, service: AuthServices = Depends(get_auth_service)):
+    return await service.refresh_token(refresh_token=refresh_token_data.refresh_token)
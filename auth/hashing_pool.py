@@ -0,0 +1,41 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+
+class QueueTimeMetric:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def stats(self) -> dict:
+        return {'count': self.count, 'avg_seconds': self.total / self.count if self.count else 0.0, 'max_seconds': self.max}
+
+
+class HashingPool:
+    def __init__(self, max_workers: int):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='password-hashing')
+        self.max_workers = max_workers
+        self.queue_time = QueueTimeMetric()
+
+    async def run(self, func: Callable, *args, **kwargs):
+        submitted = time.perf_counter()
+
+        def _call():
+            self.queue_time.observe(time.perf_counter() - submitted)
+            return func(*args, **kwargs)
+
+        return await asyncio.get_running_loop().run_in_executor(self._executor, _call)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+    def stats(self) -> dict:
+        return {'max_workers': self.max_workers, 'queue_time': self.queue_time.stats()}
@@ -8,3 +8,6 @@ class PasswordInterface(ABC):
 
     @abstractmethod
     async def hashed_password(self, password: str) -> str: pass
+
+    @abstractmethod
+    async def needs_update(self, hashed_password: str) -> bool: pass
@@ -1,15 +1,26 @@
+from typing import Optional
 from passlib.context import CryptContext
+from starlette.concurrency import run_in_threadpool
+from .hashing_pool import HashingPool
 from .password_interface import PasswordInterface
 
 
 class PasswordService(PasswordInterface):
 
-    def __init__(self, context: CryptContext):
+    def __init__(self, context: CryptContext, pool: Optional[HashingPool] = None):
         self._context = context
+        self._pool = pool
+
+    async def _run(self, func, **kwargs):
+        if self._pool:
+            return await self._pool.run(func, **kwargs)
+        return await run_in_threadpool(func, **kwargs)
 
     async def verify_password(self, plain_password: str, hashed_password: str) -> bool:
-        return self._context.verify(secret=plain_password, hash=hashed_password)
+        return await self._run(self._context.verify, secret=plain_password, hash=hashed_password)
 
     async def hashed_password(self, password: str) -> str:
-        return self._context.hash(secret=password)
+        return await self._run(self._context.hash, secret=password)
 
+    async def needs_update(self, hashed_password: str) -> bool:
+        return self._context.needs_update(hash=hashed_password)
@@ -0,0 +1,30 @@
+import time
+from typing import NamedTuple, Optional
+from utils.ttl_cache import TTLCache
+
+
+class Principal(NamedTuple):
+    id: int
+    username: str
+    is_active: bool
+
+
+class PrincipalCache:
+    def __init__(self, maxsize: int, ttl: int):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._ttl = ttl
+
+    def get(self, token: str) -> Optional[Principal]:
+        return self._cache.get(token)
+
+    def set(self, token: str, principal: Principal, exp: int):
+        self._cache.set(token, principal, ttl=min(self._ttl, exp - time.time()))
+
+    def invalidate_user(self, user_id: int) -> int:
+        return self._cache.invalidate(lambda _, principal: principal.id == user_id)
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        return self._cache.stats()
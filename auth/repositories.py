@@ -1,5 +1,5 @@
 from typing import Optional
-from sqlalchemy import select, insert
+from sqlalchemy import select, insert, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from auth.auth_repository_interface import AuthRepositoryInterface
 from profile.models import User
@@ -31,3 +31,7 @@ class AuthRepository(AuthRepositoryInterface):
         res = await self._session.execute(insert(User).values(username=username, password=password, email=email).returning(User))
         await self._session.commit()
         return res.first()
+
+    async def update_password(self, user_id: int, password: str):
+        await self._session.execute(update(User).where(User.id == user_id).values(password=password))
+        await self._session.commit()
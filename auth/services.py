@@ -18,6 +18,9 @@ class AuthServices:
         if not (user := await self._repository.retrieve_user_by_username(username=username)) \
                 or not await self._password_service.verify_password(plain_password=password, hashed_password=user.password):
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Incorrect username or password')
+        if await self._password_service.needs_update(hashed_password=user.password):
+            hashed_password = await self._password_service.hashed_password(password=password)
+            await self._repository.update_password(user_id=user.id, password=hashed_password)
         return user
 
     async def sign_up(self, data: CreateUserSchema):
@@ -1,5 +1,7 @@
+import asyncio
 import pytest
 from passlib.context import CryptContext
+from ..hashing_pool import HashingPool
 from ..password_service import PasswordService
 
 
@@ -14,3 +16,19 @@ class TestPasswordService:
     async def test_successfully_verify_passwords(self, get_password_security, password):
         hashed_password = await get_password_security.hashed_password(password=password)
         assert await get_password_security.verify_password(plain_password=password, hashed_password=hashed_password)
+
+    @pytest.mark.asyncio
+    async def test_hashing_runs_in_pool(self):
+        pool = HashingPool(max_workers=2)
+        service = PasswordService(context=CryptContext(schemes=['bcrypt'], deprecated='auto', bcrypt__rounds=4), pool=pool)
+        hashed_passwords = await asyncio.gather(*(service.hashed_password(password=f'password-{i}') for i in range(4)))
+        assert await service.verify_password(plain_password='password-3', hashed_password=hashed_passwords[3])
+        assert pool.stats()['queue_time']['count'] == 5
+        pool.shutdown()
+
+    @pytest.mark.parametrize('hash_rounds, context_rounds, expected_value', [(4, 4, False), (4, 5, True), (5, 4, True)])
+    @pytest.mark.asyncio
+    async def test_needs_update(self, hash_rounds: int, context_rounds: int, expected_value: bool):
+        hashed_password = CryptContext(schemes=['bcrypt'], bcrypt__rounds=hash_rounds).hash('1234567890')
+        service = PasswordService(context=CryptContext(schemes=['bcrypt'], deprecated='auto', bcrypt__rounds=context_rounds))
+        assert await service.needs_update(hashed_password=hashed_password) == expected_value
@@ -0,0 +1,51 @@
+import pytest
+from httpx import AsyncClient
+from conftest import retrieve_token
+from settings import get_settings
+
+
+class TestGetUser:
+
+    @pytest.mark.asyncio
+    async def test_principal_loaded_with_column_only_query(self, first_user_client_with_jwt: AsyncClient, query_counter, app_container):
+        app_container.principal_cache.clear()
+        response = await first_user_client_with_jwt.get(url='/listings/favorites')
+        assert response.status_code == 200
+        principal_stmt = query_counter.statements[0]
+        assert principal_stmt.startswith('SELECT auth.id, auth.username, auth.is_active \nFROM auth')
+        assert 'JOIN' not in principal_stmt
+
+    @pytest.mark.asyncio
+    async def test_unknown_user_is_unauthorized(self, client_without_jwt: AsyncClient, token_service):
+        token = await retrieve_token(token_service=token_service, username='ghost')
+        response = await client_without_jwt.get(url='/listings/favorites', headers={'Authorization': f'Bearer {token}'})
+        assert response.status_code == 401
+        assert response.json()['detail'] == 'Could not validate credentials'
+
+    @pytest.mark.asyncio
+    async def test_principal_cached_by_token(self, first_user_client_with_jwt: AsyncClient, query_counter, app_container):
+        principal_cache = app_container.principal_cache
+        principal_cache.clear()
+        hits, misses = principal_cache.stats()['hits'], principal_cache.stats()['misses']
+        await first_user_client_with_jwt.get(url='/listings/favorites')
+        await first_user_client_with_jwt.get(url='/listings/favorites')
+        assert principal_cache.stats()['misses'] == misses + 1
+        assert principal_cache.stats()['hits'] == hits + 1
+        assert sum(stmt.startswith('SELECT auth.id') for stmt in query_counter.statements) == 1
+
+
+class TestMetricsToken:
+    @pytest.mark.parametrize('token, headers, status_code', [
+        (None, {}, 404),
+        (None, {'Authorization': 'Bearer anything'}, 404),
+        ('metrics-secret', {}, 401),
+        ('metrics-secret', {'Authorization': 'Bearer wrong'}, 401),
+        ('metrics-secret', {'Authorization': 'Bearer metrics-secret'}, 200),
+    ])
+    @pytest.mark.asyncio
+    async def test_metrics_require_configured_token(self, client_without_jwt: AsyncClient, monkeypatch, token, headers: dict, status_code: int):
+        monkeypatch.setattr(get_settings(), 'metrics_token', token)
+        response = await client_without_jwt.get(url='/metrics', headers=headers)
+        assert response.status_code == status_code
+        if status_code == 200:
+            assert 'listings_single_flight' in response.json()
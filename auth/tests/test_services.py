@@ -0,0 +1,45 @@
+from collections import namedtuple
+from typing import Optional
+import pytest
+from passlib.context import CryptContext
+from ..auth_repository_interface import AuthRepositoryInterface
+from ..password_service import PasswordService
+from ..services import AuthServices
+from ..token_service import TokenService
+
+
+class InMemoryAuthRepository(AuthRepositoryInterface):
+    StoredUser = namedtuple('StoredUser', 'id username password email')
+
+    def __init__(self, users: list):
+        self.users = {user.username: user for user in users}
+
+    async def retrieve_user_by_email(self, email: str):
+        return next((user for user in self.users.values() if email and user.email == email), None)
+
+    async def retrieve_user_by_username(self, username: str):
+        return self.users.get(username)
+
+    async def save_user(self, username: str, password: str, email: Optional[str]):
+        self.users[username] = self.StoredUser(id=len(self.users) + 1, username=username, password=password, email=email)
+        return self.users[username]
+
+    async def update_password(self, user_id: int, password: str):
+        user = next(user for user in self.users.values() if user.id == user_id)
+        self.users[user.username] = user._replace(password=password)
+
+
+class TestAuthServices:
+
+    @pytest.mark.parametrize('stored_rounds, current_rounds, rehashed', [(4, 5, True), (5, 5, False)])
+    @pytest.mark.asyncio
+    async def test_rehash_password_on_login(self, stored_rounds: int, current_rounds: int, rehashed: bool):
+        stored_hash = CryptContext(schemes=['bcrypt'], bcrypt__rounds=stored_rounds).hash('1234567890')
+        repository = InMemoryAuthRepository(users=[InMemoryAuthRepository.StoredUser(id=1, username='elliot', password=stored_hash, email=None)])
+        password_service = PasswordService(context=CryptContext(schemes=['bcrypt'], deprecated='auto', bcrypt__rounds=current_rounds))
+        await AuthServices(repository=repository, password_service=password_service, token_service=TokenService()) \
+            .save_user(username='elliot', password='1234567890')
+        new_hash = repository.users['elliot'].password
+        assert (new_hash != stored_hash) == rehashed
+        assert await password_service.verify_password(plain_password='1234567890', hashed_password=new_hash)
+        assert not await password_service.needs_update(hashed_password=new_hash)
@@ -0,0 +1,36 @@
+import argparse
+import asyncio
+import time
+from database import AsyncSessionLocal
+from listings.fast_repository import FastReadRepositoryListing
+from listings.repositories import RepositoryListing
+from listings.serializers import dumps_listings
+
+
+async def bench(repository_class, limit: int, requests: int) -> tuple[float, float, int]:
+    async with AsyncSessionLocal() as session:
+        repository = repository_class(session)
+        listings = []
+        for _ in range(10):
+            listings = await repository.get_all_listings(offset=0, limit=limit, base_building_params={}, advanced_building_params={},
+                                                         price_params={}, address_params={})
+            dumps_listings(listings)
+        cpu, wall = time.process_time(), time.perf_counter()
+        for _ in range(requests):
+            dumps_listings(await repository.get_all_listings(offset=0, limit=limit, base_building_params={}, advanced_building_params={},
+                                                             price_params={}, address_params={}))
+        return (time.process_time() - cpu) / requests, (time.perf_counter() - wall) / requests, len(listings)
+
+
+async def main(limit: int, requests: int):
+    for repository_class in (RepositoryListing, FastReadRepositoryListing):
+        cpu, wall, count = await bench(repository_class, limit=limit, requests=requests)
+        print(f'{repository_class.__name__}: {count} listings per page, cpu {cpu * 1000:.2f} ms, wall {wall * 1000:.2f} ms per request')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compare per-request CPU of the ORM and raw asyncpg listing reads against DATABASE_URL.')
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--requests', type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(main(limit=args.limit, requests=args.requests))
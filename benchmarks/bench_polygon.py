@@ -0,0 +1,50 @@
+import argparse
+import time
+import numpy as np
+from listings.geometry import points_in_polygon
+
+
+def star_polygon(vertices: int, rng: np.random.Generator) -> np.ndarray:
+    angles = np.linspace(0, 2 * np.pi, vertices, endpoint=False)
+    radius = rng.uniform(0.3, 1.0, size=vertices)
+    return np.column_stack((radius * np.cos(angles), radius * np.sin(angles)))
+
+
+def naive_points_in_polygon(latitudes: np.ndarray, longitudes: np.ndarray, polygon: np.ndarray) -> np.ndarray:
+    edges = list(zip(polygon.tolist(), np.roll(polygon, -1, axis=0).tolist()))
+    result = []
+    for x, y in zip(longitudes.tolist(), latitudes.tolist()):
+        inside = False
+        for (ax, ay), (bx, by) in edges:
+            if (ay > y) != (by > y) and x < (bx - ax) * (y - ay) / (by - ay) + ax:
+                inside = not inside
+        result.append(inside)
+    return np.array(result)
+
+
+def bench(func, repeat: int, **kwargs) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(**kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Point-in-polygon throughput over candidate coordinate arrays.')
+    parser.add_argument('--points', type=int, default=100_000)
+    parser.add_argument('--vertices', type=int, nargs='+', default=[50, 500, 2000])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--naive-points', type=int, default=2_000, help='points for the pure Python baseline')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    longitudes, latitudes = rng.uniform(-1, 1, size=(2, args.points))
+    for vertices in args.vertices:
+        polygon = star_polygon(vertices=vertices, rng=rng)
+        vectorized = bench(points_in_polygon, repeat=args.repeat, latitudes=latitudes, longitudes=longitudes, polygon=polygon)
+        naive = bench(naive_points_in_polygon, repeat=1, latitudes=latitudes[:args.naive_points], longitudes=longitudes[:args.naive_points],
+                      polygon=polygon) * args.points / args.naive_points
+        print(f'{args.points} points x {vertices} vertices: vectorized {vectorized * 1000:.1f} ms '
+              f'({args.points / vectorized / 1e6:.2f} M points/s), python loop ~{naive * 1000:.0f} ms, speedup x{naive / vectorized:.0f}')
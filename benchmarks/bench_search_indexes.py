@@ -0,0 +1,128 @@
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import select, text
+from sqlalchemy.dialects import postgresql
+from database import engine
+from listings.models import Listing
+from listings.repositories import RepositoryListing
+
+CITIES = ['new york', 'los angeles', 'chicago', 'houston', 'phoenix', 'philadelphia', 'san antonio', 'san diego', 'dallas', 'austin',
+          'jacksonville', 'fort worth', 'columbus', 'charlotte', 'indianapolis', 'seattle', 'denver', 'boston', 'nashville', 'portland']
+
+NEW_YORK, PORTLAND = {'city': 'New York'}, {'city': 'Portland'}
+SELL, RENT = {'category_type': 'SELL'}, {'category_type': 'RENT'}
+
+WORKLOAD = {
+    'newest': {},
+    'city': {'address_params': NEW_YORK},
+    'city_prefix': {'address_params': {'city': 'san%'}},
+    'city_category': {'address_params': NEW_YORK, 'base_building_params': SELL},
+    'rare_city_category': {'address_params': PORTLAND, 'base_building_params': RENT},
+    'rare_city': {'address_params': PORTLAND},
+    'rare_city_category_price': {'address_params': PORTLAND, 'base_building_params': RENT, 'price_params': {'max_price': 30000}},
+    'rare_city_category_rooms': {'address_params': PORTLAND, 'base_building_params': {**RENT, 'number_of_rooms': 5}},
+    'category': {'base_building_params': RENT},
+    'category_rooms': {'base_building_params': {**SELL, 'number_of_rooms': 2}},
+    'category_rooms_price': {'base_building_params': {**SELL, 'number_of_rooms': 3}, 'price_params': {'min_price': 100000, 'max_price': 102000}},
+    'category_price_band': {'base_building_params': SELL, 'price_params': {'min_price': 250000, 'max_price': 252000}},
+    'price_range': {'price_params': {'min_price': 500000, 'max_price': 502000}},
+    'total_area': {'advanced_building_params': {'min_total_area': 120, 'max_total_area': 130}},
+    'floors': {'advanced_building_params': {'min_number_of_floors': 20, 'max_number_of_floors': 25}},
+    'year_built': {'advanced_building_params': {'from_year_built': 2020, 'to_year_built': 2021}},
+    'bbox': {'geo_params': {'bbox': (-74.05, 40.6, -73.9, 40.8)}},
+    'radius_by_distance': {'geo_params': {'lat': 40.7061, 'lng': -74.0085, 'radius_km': 5, 'sort': 'distance'}},
+    'category_offset_page': {'base_building_params': SELL, 'offset': 200},
+    'category_keyset_page': {'base_building_params': SELL, 'cursor': 30},
+}
+
+
+def rnd(column: str, n: int) -> str:
+    return f"(abs(hashtext('{column}' || i)) % {n})"
+
+
+async def seed(rows: int):
+    cities = ', '.join(f"'{city}'" for city in CITIES)
+    async with engine.begin() as connection:
+        await connection.execute(text("INSERT INTO auth (username) VALUES ('workload') ON CONFLICT DO NOTHING"))
+        await connection.execute(text(f"""
+            INSERT INTO listings (user_id, title, price, category_type, house_type, wall_type, elevator, number_of_rooms, total_area,
+                                  number_of_floors, year_built, country, city, latitude, longitude, is_published, created, updated)
+            SELECT (SELECT id FROM auth WHERE username = 'workload'), 'listing ' || i, 10000 + {rnd('price', 990000)},
+                   (ARRAY['SELL', 'RENT', 'DAILY_RENT'])[1 + {rnd('category', 3)}]::categories,
+                   (ARRAY['NEW_BUILDING', 'SECONDARY_HOUSING'])[1 + {rnd('house', 2)}]::houses,
+                   (ARRAY['BRICK', 'WOOD', 'PANEL'])[1 + {rnd('wall', 3)}]::walls, {rnd('elevator', 4)} <> 0,
+                   1 + {rnd('rooms', 5)}, 20 + {rnd('area', 180)}, 1 + {rnd('floors', 30)}, 1950 + {rnd('year', 72)},
+                   'USA', initcap((ARRAY[{cities}])[1 + floor({len(CITIES)} * power({rnd('city', 10 ** 6)} / 10.0 ^ 6, 3))::int]),
+                   25 + {rnd('lat', 2400000)} / 100000.0, -124 + {rnd('lng', 5700000)} / 100000.0,
+                   {rnd('published', 20)} <> 0, now() - i * interval '30 seconds', now() - i * interval '30 seconds'
+            FROM generate_series(1, :rows) AS i"""), {'rows': rows})
+        await connection.execute(text('ANALYZE listings'))
+
+
+async def workload_sql() -> dict[str, str]:
+    repository, statements = RepositoryListing(session=None), {}
+    for name, shape in WORKLOAD.items():
+        days = shape.get('cursor')
+        stmt = await repository._all_listings_stmt(
+            stmt=select(Listing), offset=shape.get('offset', 0), limit=20, base_building_params=shape.get('base_building_params', {}),
+            advanced_building_params=shape.get('advanced_building_params', {}), price_params=shape.get('price_params', {}),
+            address_params=shape.get('address_params', {}), geo_params=shape.get('geo_params', {}),
+            cursor=((datetime.now() - timedelta(days=days)).isoformat(sep=' '), 0) if days else None)
+        statements[name] = str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={'literal_binds': True}))
+    return statements
+
+
+def plan_nodes(plan: dict) -> list[str]:
+    node = plan['Node Type'] + (f" {plan['Index Name']}" if 'Index Name' in plan else '')
+    return [node] + [child for subplan in plan.get('Plans', ()) for child in plan_nodes(subplan)]
+
+
+async def record(path: str, runs: int):
+    results = {}
+    async with engine.connect() as connection:
+        for name, sql in (await workload_sql()).items():
+            await connection.execute(text(sql))
+            timings = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                (await connection.execute(text(sql))).all()
+                timings.append((time.perf_counter() - start) * 1000)
+            plan = (await connection.execute(text(f'EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}'))).scalar()[0]['Plan']
+            results[name] = {'median_ms': statistics.median(timings), 'max_ms': max(timings), 'nodes': plan_nodes(plan), 'sql': sql, 'plan': plan}
+            print(f"{name:24} {results[name]['median_ms']:9.2f} ms  {' > '.join(results[name]['nodes'][:4])}")
+    with open(path, 'w') as file:
+        json.dump(results, file, indent=2)
+
+
+def compare(before_path: str, after_path: str):
+    with open(before_path) as before_file, open(after_path) as after_file:
+        before, after = json.load(before_file), json.load(after_file)
+    print(f"{'shape':24} {'before ms':>10} {'after ms':>10} {'speedup':>8}  after plan")
+    for name in (name for name in before if name in after):
+        old, new = before[name]['median_ms'], after[name]['median_ms']
+        print(f"{name:24} {old:10.2f} {new:10.2f} {old / new:7.1f}x  {' > '.join(after[name]['nodes'][:4])}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Replay the top listing filter shapes against DATABASE_URL and record plans and latencies. '
+                                                 'Record once before and once after `alembic upgrade`, then compare the two files.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    seed_parser = commands.add_parser('seed', help='insert synthetic listings')
+    seed_parser.add_argument('--rows', type=int, default=1000000)
+    record_parser = commands.add_parser('record', help='run the workload and write plans and latencies to a JSON file')
+    record_parser.add_argument('path')
+    record_parser.add_argument('--runs', type=int, default=7)
+    compare_parser = commands.add_parser('compare', help='print a before/after table')
+    compare_parser.add_argument('before')
+    compare_parser.add_argument('after')
+    args = parser.parse_args()
+    if args.command == 'seed':
+        asyncio.run(seed(rows=args.rows))
+    elif args.command == 'record':
+        asyncio.run(record(path=args.path, runs=args.runs))
+    else:
+        compare(before_path=args.before, after_path=args.after)
@@ -0,0 +1,47 @@
+import argparse
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse
+from pydantic import parse_obj_as
+from listings.models import Listing, Image
+from listings.schemas import ListingSchema
+from listings.serializers import dumps_listings
+
+
+def make_listings(count: int) -> list[Listing]:
+    now = datetime(2021, 12, 1, 10, 30)
+    return [Listing(id=i, user_id=1, title=f'listing {i}', price=Decimal('1000.50') + i, created=now, updated=now + timedelta(minutes=i),
+                    is_published=True, category_type='SELL', house_type='NEW_BUILDING', wall_type='BRICK', elevator=True, number_of_floors=9,
+                    number_of_rooms=3, total_area=65.5, year_built=2015, description='some description', slug=f'listing-{i}', country='usa',
+                    city='new york', street='wall street', region='ny', district='manhattan', house_number='60', latitude=40.7061,
+                    longitude=-74.0085, full_address='60 Wall Street, New York', geocode_status='DONE',
+                    images=[Image(id=i * 10 + j, photo=f'{i}-{j}.jpg', listing_id=i) for j in range(3)])
+            for i in range(count)]
+
+
+def validated(listings: list[Listing]) -> bytes:
+    return ORJSONResponse(content=jsonable_encoder(parse_obj_as(list[ListingSchema], listings))).body
+
+
+def bench(func, listings: list[Listing], repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(listings)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compare the validated ListingSchema path with the direct orjson serializer.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[20, 100, 500])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        listings = make_listings(size)
+        assert dumps_listings(listings) == validated(listings)
+        slow, fast = bench(validated, listings, args.repeat), bench(dumps_listings, listings, args.repeat)
+        print(f'{size} listings: pydantic {slow * 1000:.2f} ms, direct {fast * 1000:.2f} ms, speedup x{slow / fast:.1f}')
@@ -1,5 +1,6 @@
 import asyncio
 import pytest
+from sqlalchemy import event
 from sqlalchemy.orm import sessionmaker
 from auth.token_interface import TokenInterface
 from settings import get_settings
@@ -8,6 +9,8 @@ from database import Base, get_db
 from httpx import AsyncClient
 from main import app
 from auth.token_service import TokenService
+from container import get_upstream_geo
+from listings.tests.fake_geo import FakeGeo
 
 settings = get_settings()
 
@@ -22,13 +25,31 @@ def token_service():
     return TokenService()
 
 
+@pytest.fixture(scope='session')
+def fake_geo() -> FakeGeo:
+    return FAKE_GEO
+
+
+FAKE_GEO = FakeGeo()
+
 database_url = get_settings().test_database_url
 test_engine = create_async_engine(database_url, future=True)
+async_test_session = sessionmaker(bind=test_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+@pytest.fixture(scope='session', autouse=True)
+async def app_container():
+    await app.router.startup()
+    yield app.state.container
+    await app.router.shutdown()
 
 
 @pytest.fixture(scope='module')
 @pytest.mark.asyncio
-async def db_session():
+async def db_session(app_container):
+    app_container.principal_cache.clear()
+    await app_container.listings_cache.invalidate()
+    app_container.listing_detail_cache.clear()
     async with test_engine.begin() as connection:
         await connection.run_sync(Base.metadata.drop_all)
         await connection.run_sync(Base.metadata.create_all)
@@ -44,8 +65,38 @@ async def client_without_jwt(db_session) -> AsyncClient:
         yield client
 
 
+class QueryCounter:
+    def __init__(self):
+        self.statements: list[str] = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __len__(self) -> int:
+        return len(self.statements)
+
+
+FAST_READ_ROUTES = {'get_listings', 'show_favorites_listings', 'get_listings_batch', 'post_listings_batch'}
+
+
+@pytest.fixture(params=['orm', 'fast'])
+async def read_path(request, monkeypatch, app_container) -> str:
+    await app_container.listings_cache.invalidate()
+    app_container.listing_detail_cache.clear()
+    if request.param == 'fast':
+        monkeypatch.setattr(settings, 'listings_fast_read_routes', FAST_READ_ROUTES)
+    return request.param
+
+
+@pytest.fixture
+def query_counter() -> QueryCounter:
+    counter = QueryCounter()
+    event.listen(test_engine.sync_engine, 'before_cursor_execute', counter)
+    yield counter
+    event.remove(test_engine.sync_engine, 'before_cursor_execute', counter)
+
+
 async def get_test_db():
-    async_test_session = sessionmaker(bind=test_engine, class_=AsyncSession, expire_on_commit=False)
     async with async_test_session() as session:
         yield session
 
@@ -84,6 +135,21 @@ async def first_user_client_with_jwt(token_service: TokenInterface, first_user):
         yield client
 
 
+LISTING_DATA = {'title': 'test listing', 'price': 1000, 'country': 'usa', 'city': 'new york', 'street': 'wall street'}
+
+
+@pytest.fixture(scope='class')
+async def listing_id(first_user_client_with_jwt) -> int:
+    return (await first_user_client_with_jwt.post('/listings/', data=LISTING_DATA)).json()['id']
+
+
+async def save_listings(listings) -> dict[str, int]:
+    async with async_test_session() as session:
+        session.add_all(listings)
+        await session.commit()
+        return {listing.title: listing.id for listing in listings}
+
+
 @pytest.fixture(scope='module')
 @pytest.mark.asyncio
 async def second_user_client_with_jwt(token_service: TokenInterface, second_user):
@@ -94,3 +160,4 @@ async def second_user_client_with_jwt(token_service: TokenInterface, second_user
 
 
 app.dependency_overrides[get_db] = get_test_db
+app.dependency_overrides[get_upstream_geo] = lambda: FAKE_GEO
@@ -0,0 +1,112 @@
+from typing import Optional
+from fastapi import Depends, Request
+from passlib.context import CryptContext
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from auth.hashing_pool import HashingPool
+from auth.password_interface import PasswordInterface
+from auth.password_service import PasswordService
+from auth.principal import PrincipalCache
+from auth.token_interface import TokenInterface
+from auth.token_service import TokenService
+from image_service.image_service_interface import ImageServiceInterface
+from database import get_db, AsyncSessionLocal
+from image_service.local_image_service import ImageService
+from listings.geocode_cache import CachedGeo, GeocodeCache, GeocodeCacheRepository
+from listings.geocode_worker import GeocodeWorker
+from listings.offline_geo import Gazetteer, OfflineGeo
+from listings.result_cache import ListingsResultCache
+from listings.detail_cache import ListingDetailCache
+from listings.utils import Geo, GeoInterface
+from settings import Settings, LISTINGS_IMAGES_DIR
+from utils.cache_backend_interface import CacheBackendInterface
+from utils.cache_backends import MemoryCacheBackend, RedisCacheBackend
+from utils.single_flight import SingleFlight
+
+
+class Container:
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self.token_service = TokenService()
+        self.hashing_pool = HashingPool(max_workers=settings.password_hash_workers)
+        self.password_service = PasswordService(
+            context=CryptContext(schemes=['bcrypt'], deprecated='auto', bcrypt__rounds=settings.password_hash_rounds), pool=self.hashing_pool)
+        self.principal_cache = PrincipalCache(maxsize=settings.principal_cache_size, ttl=settings.principal_cache_ttl)
+        self.image_service = ImageService(path=str(LISTINGS_IMAGES_DIR))
+        self.geo = self._build_geo(settings=settings)
+        self.geocode_cache = GeocodeCache(maxsize=settings.geocode_cache_size, ttl=settings.geocode_cache_ttl)
+        self.cache_backend = self._build_cache_backend(settings=settings)
+        self.listings_cache = ListingsResultCache(backend=self.cache_backend, ttl=settings.listings_cache_ttl) if self.cache_backend else None
+        self.listings_single_flight = SingleFlight()
+        self.listing_detail_cache = ListingDetailCache(maxsize=settings.listing_detail_cache_size, ttl=settings.listing_detail_cache_ttl,
+                                                       maxbytes=settings.listing_detail_cache_max_bytes,
+                                                       negative_ttl=settings.listing_detail_cache_negative_ttl, backend=self.cache_backend)
+        self.geocode_worker = GeocodeWorker(session_factory=AsyncSessionLocal, geo=self.geo, cache=self.geocode_cache,
+                                            requests_per_second=settings.geocode_requests_per_second, batch_size=settings.geocode_batch_size,
+                                            poll_interval=settings.geocode_poll_interval, claim_timeout=settings.geocode_claim_timeout,
+                                            on_commit=self._on_listings_geocoded)
+
+    @staticmethod
+    def _build_geo(settings: Settings) -> GeoInterface:
+        if not settings.gazetteer_dir:
+            return Geo()
+        return OfflineGeo(gazetteer=Gazetteer.load(settings.gazetteer_dir), fallback=Geo(), max_distance_km=settings.gazetteer_max_distance_km)
+
+    @staticmethod
+    def _build_cache_backend(settings: Settings) -> Optional[CacheBackendInterface]:
+        if settings.listings_cache_backend == 'memory':
+            return MemoryCacheBackend(maxsize=settings.listings_cache_size, maxbytes=settings.listings_cache_max_bytes,
+                                      ttl=settings.listings_cache_ttl)
+        if settings.listings_cache_backend == 'redis':
+            return RedisCacheBackend(url=settings.redis_url)
+        return None
+
+    async def _on_listings_geocoded(self, listing_ids: list[int]):
+        await self.listing_detail_cache.invalidate(*listing_ids)
+        if self.listings_cache:
+            await self.listings_cache.invalidate()
+
+    async def startup(self):
+        if self.settings.geocode_async:
+            self.geocode_worker.start()
+
+    async def shutdown(self):
+        await self.geocode_worker.stop()
+        await self.geo.close()
+        if self.cache_backend:
+            await self.cache_backend.close()
+        self.hashing_pool.shutdown()
+
+    def stats(self) -> dict:
+        return {'principal_cache': self.principal_cache.stats(), 'password_hashing': self.hashing_pool.stats(),
+                'geocode_cache': self.geocode_cache.stats(), 'listings_cache': self.listings_cache.stats() if self.listings_cache else None,
+                'listing_detail_cache': self.listing_detail_cache.stats(), 'listings_single_flight': self.listings_single_flight.stats()}
+
+
+def get_container(request: Request) -> Container:
+    return request.app.state.container
+
+
+def get_token_service(container: Container = Depends(get_container)) -> TokenInterface:
+    return container.token_service
+
+
+def get_password_service(container: Container = Depends(get_container)) -> PasswordInterface:
+    return container.password_service
+
+
+def get_principal_cache(container: Container = Depends(get_container)) -> PrincipalCache:
+    return container.principal_cache
+
+
+def get_image_service(container: Container = Depends(get_container)) -> ImageServiceInterface:
+    return container.image_service
+
+
+def get_upstream_geo(container: Container = Depends(get_container)) -> GeoInterface:
+    return container.geo
+
+
+def get_geo(db: AsyncSession = Depends(get_db, use_cache=False), geo: GeoInterface = Depends(get_upstream_geo),
+            container: Container = Depends(get_container)) -> GeoInterface:
+    return CachedGeo(geo=geo, cache=container.geocode_cache, repository=GeocodeCacheRepository(session=db))
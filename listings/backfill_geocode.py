@@ -0,0 +1,52 @@
+import argparse
+import asyncio
+from sqlalchemy import update, or_
+from sqlalchemy.orm import sessionmaker
+from database import AsyncSessionLocal
+from settings import get_settings
+from .geocode_cache import GeocodeCache
+from .geocode_worker import GeocodeWorker
+from .models import Listing
+from .schemas import GeocodeStatus
+from .utils import Geo
+
+
+async def mark_missing_coordinates(session_factory: sessionmaker, retry_failed: bool = False) -> int:
+    statuses = [Listing.geocode_status.is_(None)]
+    if retry_failed:
+        statuses.append(Listing.geocode_status == GeocodeStatus.FAILED.value)
+    async with session_factory() as session:
+        result = await session.execute(
+            update(Listing).where(or_(Listing.latitude.is_(None), Listing.longitude.is_(None)), Listing.city.isnot(None), or_(*statuses))
+            .values(geocode_status=GeocodeStatus.PENDING.value, updated=Listing.updated)
+            .execution_options(synchronize_session=False))
+        await session.commit()
+        return result.rowcount
+
+
+async def backfill(requests_per_second: float, batch_size: int, retry_failed: bool):
+    settings = get_settings()
+    marked = await mark_missing_coordinates(session_factory=AsyncSessionLocal, retry_failed=retry_failed)
+    geo = Geo()
+    worker = GeocodeWorker(session_factory=AsyncSessionLocal, geo=geo,
+                           cache=GeocodeCache(maxsize=settings.geocode_cache_size, ttl=settings.geocode_cache_ttl),
+                           requests_per_second=requests_per_second, batch_size=batch_size, poll_interval=settings.geocode_poll_interval,
+                           claim_timeout=settings.geocode_claim_timeout)
+    try:
+        async with worker.leadership() as leader:
+            if not leader:
+                print(f'marked {marked} listings, left for the running geocode worker')
+                return
+            processed = await worker.run_until_empty()
+    finally:
+        await geo.close()
+    print(f'marked {marked} listings, geocoded {processed}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Geocode listings that have no coordinates.')
+    parser.add_argument('--rps', type=float, default=get_settings().geocode_requests_per_second, help='upstream requests per second')
+    parser.add_argument('--batch-size', type=int, default=get_settings().geocode_batch_size)
+    parser.add_argument('--retry-failed', action='store_true', help='also retry listings whose geocoding failed before')
+    args = parser.parse_args()
+    asyncio.run(backfill(requests_per_second=args.rps, batch_size=args.batch_size, retry_failed=args.retry_failed))
@@ -0,0 +1,21 @@
+import math
+
+CELLS_PER_TILE = 4
+MAX_CLUSTER_CELLS = 256
+
+
+def grid_cells(size: float, bbox: tuple[float, float, float, float]) -> int:
+    # The grid is aligned to multiples of size, so a bbox touches a partial cell at each edge, plus one more where it wraps the antimeridian
+    min_lng, min_lat, max_lng, max_lat = bbox
+    if min_lng <= max_lng:
+        cols = math.ceil((max_lng - min_lng) / size) + 1
+    else:
+        cols = math.ceil((max_lng - min_lng + 360) / size) + 3
+    return cols * (math.ceil((max_lat - min_lat) / size) + 1)
+
+
+def cell_size(zoom: int, bbox: tuple[float, float, float, float]) -> float:
+    size = 360 / (2 ** zoom * CELLS_PER_TILE)
+    while (cells := grid_cells(size=size, bbox=bbox)) > MAX_CLUSTER_CELLS:
+        size *= max(math.sqrt(cells / MAX_CLUSTER_CELLS), 1.05)
+    return size
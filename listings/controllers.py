@@ -1,81 +1,129 @@
 from typing import Optional
-from fastapi import APIRouter, Depends, UploadFile, File, status, Form
-from sqlalchemy.ext.asyncio import AsyncSession
-from database import get_db
-from permissions import GetUser
-from settings import LISTINGS_IMAGES_DIR
-from profile.models import User
-from auth.token_service import TokenService
+from fastapi import APIRouter, Depends, UploadFile, File, status, Form, Query, Header
+from container import get_image_service, get_geo
+from auth.principal import Principal
+from permissions import get_current_user
+from image_service.image_service_interface import ImageServiceInterface
 from .service import ListingsService
-from .repositories import RepositoryListing
 from .schemas import UpdateListingSchema, CreateListingSchema, ListingSchema, BaseAddressSchema, PriceQuerySchema, BuildingQuerySchema, \
-    BaseBuildingSchema
-from .dependencies import LimitOffsetQueryParams
-from image_service.local_image_service import ImageService
-from .utils import Geo
+    BaseBuildingSchema, GeoQuerySchema, ClusterSchema, PolygonSearchSchema, ListingIdsSchema, ListingBatchSchema, FacetsSchema
+from .dependencies import LimitOffsetQueryParams, get_listings_service, get_fields
+from .utils import GeoInterface
 
 listings_router = APIRouter(prefix='/listings', tags=['listings'])
 
 
 @listings_router.get('/user/{user_id}', status_code=status.HTTP_200_OK, response_model=list[ListingSchema])
-async def get_user_listings(user_id: int, commons: LimitOffsetQueryParams = Depends(), db: AsyncSession = Depends(get_db)):
-    return await ListingsService(repository=RepositoryListing(session=db)) \
-        .get_user_listings(user_id=user_id, limit=commons.limit, offset=commons.offset)
+async def get_user_listings(user_id: int, commons: LimitOffsetQueryParams = Depends(), fields: Optional[str] = Depends(get_fields),
+                            service: ListingsService = Depends(get_listings_service)):
+    return await service.get_user_listings(user_id=user_id, limit=commons.limit, offset=commons.offset, cursor=commons.cursor, fields=fields)
 
 
 @listings_router.get('/', status_code=status.HTTP_200_OK, response_model=list[ListingSchema])
-async def get_listings(commons: LimitOffsetQueryParams = Depends(),
+async def get_listings(commons: LimitOffsetQueryParams = Depends(), if_none_match: Optional[str] = Header(None),
                        address_params: BaseAddressSchema = Depends(BaseAddressSchema.as_query),
                        base_building_params: BaseBuildingSchema = Depends(BaseBuildingSchema.as_query),
                        advanced_building_params: BuildingQuerySchema = Depends(BuildingQuerySchema.as_query),
                        price_params: PriceQuerySchema = Depends(PriceQuerySchema.as_query),
-                       db: AsyncSession = Depends(get_db)):
-    return await ListingsService(repository=RepositoryListing(session=db)) \
-        .get_all_listings(limit=commons.limit, offset=commons.offset, base_building_params=base_building_params,
-                          advanced_building_params=advanced_building_params, price_params=price_params, address_params=address_params)
+                       geo_params: GeoQuerySchema = Depends(GeoQuerySchema.as_query), fields: Optional[str] = Depends(get_fields),
+                       q: Optional[str] = Query(None, max_length=200, description='full-text search over title and description'),
+                       total: bool = Query(False, description='add X-Total-Count, exact up to a cap and estimated above it'),
+                       service: ListingsService = Depends(get_listings_service)):
+    return await service.get_all_listings(limit=commons.limit, offset=commons.offset, base_building_params=base_building_params,
+                                          advanced_building_params=advanced_building_params, price_params=price_params,
+                                          address_params=address_params, cursor=commons.cursor, geo_params=geo_params,
+                                          if_none_match=if_none_match, fields=fields, search=q, total=total)
+
+
+@listings_router.get('/clusters', status_code=status.HTTP_200_OK, response_model=list[ClusterSchema])
+async def get_listing_clusters(zoom: int = Query(..., ge=0, le=22), address_params: BaseAddressSchema = Depends(BaseAddressSchema.as_query),
+                               base_building_params: BaseBuildingSchema = Depends(BaseBuildingSchema.as_query),
+                               advanced_building_params: BuildingQuerySchema = Depends(BuildingQuerySchema.as_query),
+                               price_params: PriceQuerySchema = Depends(PriceQuerySchema.as_query),
+                               geo_params: GeoQuerySchema = Depends(GeoQuerySchema.as_query),
+                               service: ListingsService = Depends(get_listings_service)):
+    return await service.get_listing_clusters(zoom=zoom, base_building_params=base_building_params, price_params=price_params,
+                                              advanced_building_params=advanced_building_params, address_params=address_params,
+                                              geo_params=geo_params)
+
+
+@listings_router.get('/facets', status_code=status.HTTP_200_OK, response_model=FacetsSchema)
+async def get_listing_facets(if_none_match: Optional[str] = Header(None), address_params: BaseAddressSchema = Depends(BaseAddressSchema.as_query),
+                             base_building_params: BaseBuildingSchema = Depends(BaseBuildingSchema.as_query),
+                             advanced_building_params: BuildingQuerySchema = Depends(BuildingQuerySchema.as_query),
+                             price_params: PriceQuerySchema = Depends(PriceQuerySchema.as_query),
+                             geo_params: GeoQuerySchema = Depends(GeoQuerySchema.as_query),
+                             q: Optional[str] = Query(None, max_length=200, description='full-text search over title and description'),
+                             service: ListingsService = Depends(get_listings_service)):
+    return await service.get_listing_facets(base_building_params=base_building_params, advanced_building_params=advanced_building_params,
+                                            price_params=price_params, address_params=address_params, geo_params=geo_params, search=q,
+                                            if_none_match=if_none_match)
+
+
+@listings_router.get('/batch', status_code=status.HTTP_200_OK, response_model=ListingBatchSchema)
+async def get_listings_batch(batch: ListingIdsSchema = Depends(ListingIdsSchema.as_query), if_none_match: Optional[str] = Header(None),
+                             service: ListingsService = Depends(get_listings_service)):
+    return await service.get_listings_batch(listing_ids=batch.ids, if_none_match=if_none_match)
+
+
+@listings_router.post('/batch', status_code=status.HTTP_200_OK, response_model=ListingBatchSchema)
+async def post_listings_batch(batch: ListingIdsSchema, service: ListingsService = Depends(get_listings_service)):
+    return await service.get_listings_batch(listing_ids=batch.ids)
+
+
+@listings_router.post('/search/polygon', status_code=status.HTTP_200_OK, response_model=list[ListingSchema])
+async def search_in_polygon(search: PolygonSearchSchema, commons: LimitOffsetQueryParams = Depends(),
+                            address_params: BaseAddressSchema = Depends(BaseAddressSchema.as_query),
+                            base_building_params: BaseBuildingSchema = Depends(BaseBuildingSchema.as_query),
+                            advanced_building_params: BuildingQuerySchema = Depends(BuildingQuerySchema.as_query),
+                            price_params: PriceQuerySchema = Depends(PriceQuerySchema.as_query),
+                            service: ListingsService = Depends(get_listings_service)):
+    return await service.search_in_polygon(search=search, limit=commons.limit, offset=commons.offset, base_building_params=base_building_params,
+                                           advanced_building_params=advanced_building_params, price_params=price_params,
+                                           address_params=address_params)
 
 
 @listings_router.get('/favorites', status_code=status.HTTP_200_OK, response_model=list[ListingSchema])
-async def show_favorites_listings(commons: LimitOffsetQueryParams = Depends(), db: AsyncSession = Depends(get_db),
-                                  user: User = Depends(GetUser(token_service=TokenService()))):
-    return await ListingsService(repository=RepositoryListing(session=db)) \
-        .show_favorites_listings(offset=commons.offset, limit=commons.limit, user=user)
+async def show_favorites_listings(commons: LimitOffsetQueryParams = Depends(), fields: Optional[str] = Depends(get_fields),
+                                  service: ListingsService = Depends(get_listings_service), user: Principal = Depends(get_current_user)):
+    return await service.show_favorites_listings(offset=commons.offset, limit=commons.limit, user=user, cursor=commons.cursor, fields=fields)
 
 
 @listings_router.post('/', response_model=ListingSchema, status_code=status.HTTP_201_CREATED)
 async def add_listing(listing: CreateListingSchema = Depends(CreateListingSchema.as_form),
                       address: BaseAddressSchema = Depends(BaseAddressSchema.as_form), files: Optional[list[UploadFile]] = File(None),
-                      db: AsyncSession = Depends(get_db), user: User = Depends(GetUser(token_service=TokenService()))):
-    return await ListingsService(repository=RepositoryListing(session=db)) \
-        .add_listing(listing=listing, address=address, files=files, user=user, file_service=ImageService(path=str(LISTINGS_IMAGES_DIR)), geo=Geo())
+                      service: ListingsService = Depends(get_listings_service), user: Principal = Depends(get_current_user),
+                      file_service: ImageServiceInterface = Depends(get_image_service), geo: GeoInterface = Depends(get_geo)):
+    return await service.add_listing(listing=listing, address=address, files=files, user=user, file_service=file_service, geo=geo)
 
 
 @listings_router.put('/{listing_id}', status_code=status.HTTP_200_OK, response_model=ListingSchema)
 async def update_listing(listing_id: int, updated_listing: UpdateListingSchema = Depends(UpdateListingSchema.as_form),
                          updated_address: BaseAddressSchema = Depends(BaseAddressSchema.as_form),
-                         files: Optional[list[UploadFile]] = Form(None), db: AsyncSession = Depends(get_db),
-                         user: User = Depends(GetUser(token_service=TokenService()))):
-    return await ListingsService(repository=RepositoryListing(session=db)) \
-        .update_listing(listing_id=listing_id, listing=updated_listing, address=updated_address, user=user, files=files,
-                        file_service=ImageService(path=str(LISTINGS_IMAGES_DIR)), geo=Geo())
+                         files: Optional[list[UploadFile]] = Form(None), service: ListingsService = Depends(get_listings_service),
+                         user: Principal = Depends(get_current_user), file_service: ImageServiceInterface = Depends(get_image_service),
+                         geo: GeoInterface = Depends(get_geo)):
+    return await service.update_listing(listing_id=listing_id, listing=updated_listing, address=updated_address, user=user, files=files,
+                                        file_service=file_service, geo=geo)
 
 
 @listings_router.delete('/{listing_id}', status_code=status.HTTP_204_NO_CONTENT)
-async def delete_listing(listing_id: int, db: AsyncSession = Depends(get_db), user: User = Depends(GetUser(token_service=TokenService()))):
-    return await ListingsService(repository=RepositoryListing(session=db)).delete_listing(listing_id=listing_id, user=user,
-                                                                                          file_service=ImageService(path=str(LISTINGS_IMAGES_DIR)))
+async def delete_listing(listing_id: int, service: ListingsService = Depends(get_listings_service), user: Principal = Depends(get_current_user),
+                         file_service: ImageServiceInterface = Depends(get_image_service)):
+    return await service.delete_listing(listing_id=listing_id, user=user, file_service=file_service)
 
 
 @listings_router.get('/{listing_id}', response_model=ListingSchema, status_code=status.HTTP_200_OK)
-async def detail_listing(listing_id: int, db: AsyncSession = Depends(get_db)):
-    return await ListingsService(repository=RepositoryListing(session=db)).detail_listing(listing_id=listing_id)
+async def detail_listing(listing_id: int, if_none_match: Optional[str] = Header(None), service: ListingsService = Depends(get_listings_service)):
+    return await service.detail_listing(listing_id=listing_id, if_none_match=if_none_match)
 
 
 @listings_router.post('/favorites/{listing_id}', status_code=status.HTTP_201_CREATED)
-async def add_to_favorites(listing_id: int, db: AsyncSession = Depends(get_db), user: User = Depends(GetUser(token_service=TokenService()))):
-    return await ListingsService(repository=RepositoryListing(session=db)).add_to_favorites(listing_id=listing_id, user=user)
+async def add_to_favorites(listing_id: int, service: ListingsService = Depends(get_listings_service), user: Principal = Depends(get_current_user)):
+    return await service.add_to_favorites(listing_id=listing_id, user=user)
 
 
 @listings_router.delete('/favorites/{favorite_id}', status_code=status.HTTP_204_NO_CONTENT)
-async def remove_from_favorites(favorite_id: int, db: AsyncSession = Depends(get_db), user: User = Depends(GetUser(token_service=TokenService()))):
-    return await ListingsService(repository=RepositoryListing(session=db)).remove_from_favorites(favorite_id=favorite_id, user=user)
+async def remove_from_favorites(favorite_id: int, service: ListingsService = Depends(get_listings_service),
+                                user: Principal = Depends(get_current_user)):
+    return await service.remove_from_favorites(favorite_id=favorite_id, user=user)
@@ -1,10 +1,39 @@
 from typing import Optional
+from fastapi import Depends, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from container import Container, get_container
+from database import get_db
+from settings import get_settings
+from .fast_repository import FastReadRepositoryListing
+from .pagination import MAX_PAGE_SIZE
+from .repositories import RepositoryListing
+from .repository_interface import RepositoryInterface
+from .service import ListingsService
 
 
 class LimitOffsetQueryParams:
-    def __init__(self, limit: int = 20, offset: int = 0):
+    def __init__(self, limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE), offset: int = Query(0, ge=0), cursor: Optional[str] = None):
         self.limit = limit
         self.offset = offset
+        self.cursor = cursor
+
+
+def get_fields(fields: Optional[str] = Query(None, description='card, full or comma-separated field names')) -> Optional[str]:
+    return fields
+
+
+def get_listings_repository(request: Request, db: AsyncSession = Depends(get_db)) -> RepositoryInterface:
+    endpoint = request.scope.get('endpoint')
+    if endpoint and endpoint.__name__ in get_settings().listings_fast_read_routes:
+        return FastReadRepositoryListing(session=db)
+    return RepositoryListing(session=db)
+
+
+def get_listings_service(repository: RepositoryInterface = Depends(get_listings_repository),
+                         container: Container = Depends(get_container)) -> ListingsService:
+    return ListingsService(repository=repository, defer_geocoding=get_settings().geocode_async,
+                           result_cache=container.listings_cache, detail_cache=container.listing_detail_cache,
+                           single_flight=container.listings_single_flight, exact_count_limit=get_settings().listings_exact_count_limit)
 
 
 # class FilterQueryParams:
@@ -0,0 +1,115 @@
+from typing import Awaitable, Callable, Iterable, NamedTuple, Optional
+import orjson
+from fastapi import HTTPException, status
+from fastapi.responses import ORJSONResponse, Response
+from utils.cache_backend_interface import CacheBackendInterface
+from utils.conditional import body_etag, make_etag, http_date
+from utils.ttl_cache import TTLCache
+from .serializers import dumps_listing
+
+
+class RenderedListing(NamedTuple):
+    body: bytes
+    etag: str
+    last_modified: str
+
+    @property
+    def headers(self) -> dict:
+        return {'ETag': self.etag, 'Last-Modified': self.last_modified}
+
+    def response(self) -> Response:
+        return Response(content=self.body, media_type=ORJSONResponse.media_type, headers=self.headers)
+
+
+NOT_FOUND = RenderedListing(body=b'', etag='', last_modified='')
+
+
+def listing_etag(listing_id: int, updated, image_ids, geocode_status) -> str:
+    return make_etag(listing_id, updated.isoformat(), ','.join(str(image_id) for image_id in sorted(image_ids)), geocode_status)
+
+
+def render_listing(listing) -> RenderedListing:
+    body = dumps_listing(listing)
+    etag = listing_etag(listing_id=listing.id, updated=listing.updated, image_ids=[image.id for image in listing.images],
+                        geocode_status=listing.geocode_status)
+    return RenderedListing(body=body, etag=etag, last_modified=http_date(listing.updated))
+
+
+def render_batch(listing_ids: list[int], rendered: dict[int, RenderedListing]) -> Response:
+    found = [listing_id for listing_id in listing_ids if rendered.get(listing_id, NOT_FOUND) is not NOT_FOUND]
+    missing = [listing_id for listing_id in listing_ids if rendered.get(listing_id, NOT_FOUND) is NOT_FOUND]
+    body = b'{"listings":[' + b','.join(rendered[listing_id].body for listing_id in found) + b'],"missing":' + orjson.dumps(missing) + b'}'
+    return Response(content=body, media_type=ORJSONResponse.media_type, headers={'ETag': body_etag(body)})
+
+
+class ListingDetailCache:
+    NAMESPACE = 'listing_detail'
+
+    def __init__(self, maxsize: int, maxbytes: int, ttl: float, negative_ttl: float, backend: Optional[CacheBackendInterface] = None):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl, maxbytes=maxbytes, weigher=lambda entry: len(entry[1].body))
+        self._negative_ttl = negative_ttl
+        self._backend = backend
+        self._invalidations = 0
+
+    @staticmethod
+    def _not_found():
+        return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Listing not found')
+
+    async def _generation(self) -> int:
+        # a shared backend carries invalidations from every process; entries rendered under an older generation are never served
+        return await self._backend.get_generation(self.NAMESPACE) if self._backend else self._invalidations
+
+    def _lookup(self, listing_id: int, generation: int) -> Optional[RenderedListing]:
+        if (entry := self._cache.get(listing_id)) is None:
+            return None
+        if entry[0] != generation:
+            self._cache.pop(listing_id)
+            return None
+        return entry[1]
+
+    def _store(self, listing_id: int, generation: int, rendered: RenderedListing):
+        self._cache.set(listing_id, (generation, rendered), ttl=self._negative_ttl if rendered is NOT_FOUND else None)
+
+    async def get(self, listing_id: int) -> Optional[RenderedListing]:
+        if (rendered := self._lookup(listing_id=listing_id, generation=await self._generation())) is NOT_FOUND:
+            raise self._not_found()
+        return rendered
+
+    async def load(self, listing_id: int, load: Callable[[], Awaitable]) -> RenderedListing:
+        generation = await self._generation()
+        try:
+            listing = await load()
+        except HTTPException as exc:
+            if exc.status_code == status.HTTP_404_NOT_FOUND:
+                self._store(listing_id=listing_id, generation=generation, rendered=NOT_FOUND)
+            raise
+        rendered = render_listing(listing)
+        self._store(listing_id=listing_id, generation=generation, rendered=rendered)
+        return rendered
+
+    async def get_many(self, listing_ids: Iterable[int]) -> dict[int, RenderedListing]:
+        generation = await self._generation()
+        rendered = {listing_id: self._lookup(listing_id=listing_id, generation=generation) for listing_id in listing_ids}
+        return {listing_id: value for listing_id, value in rendered.items() if value is not None}
+
+    async def load_many(self, listing_ids: list[int], load: Callable[[], Awaitable[list]]) -> dict[int, RenderedListing]:
+        generation = await self._generation()
+        rendered = {listing.id: render_listing(listing) for listing in await load()}
+        rendered.update({listing_id: NOT_FOUND for listing_id in listing_ids if listing_id not in rendered})
+        for listing_id, value in rendered.items():
+            self._store(listing_id=listing_id, generation=generation, rendered=value)
+        return rendered
+
+    async def invalidate(self, *listing_ids: Optional[int]):
+        self._invalidations += 1
+        for listing_id in listing_ids:
+            self._cache.pop(listing_id)
+        if self._backend:
+            await self._backend.bump_generation(self.NAMESPACE)
+
+    def clear(self):
+        self._invalidations += 1
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        return self._cache.stats()
@@ -0,0 +1,37 @@
+from sqlalchemy import func, literal_column
+from .models import Listing
+
+FACET_COLUMNS = ('category_type', 'number_of_rooms', 'house_type', 'wall_type')
+PRICE_BUCKETS = (0, 50000, 100000, 200000, 500000, 1000000)
+
+
+def price_bucket():
+    return func.width_bucket(Listing.price, literal_column(f"ARRAY[{', '.join(map(str, PRICE_BUCKETS))}]::numeric[]"))
+
+
+def facet_expressions() -> list:
+    return [getattr(Listing, name) for name in FACET_COLUMNS] + [price_bucket()]
+
+
+def grouping_masks() -> dict[int, str]:
+    names = FACET_COLUMNS + ('price',)
+    everything = (1 << len(names)) - 1
+    return {everything: 'total', **{everything ^ (1 << (len(names) - 1 - index)): name for index, name in enumerate(names)}}
+
+
+def facet_counts(rows: list) -> dict:
+    masks, facets = grouping_masks(), {'total': 0, **{name: [] for name in FACET_COLUMNS}, 'price': []}
+    for row in rows:
+        name = masks[row.grouping]
+        if name == 'total':
+            facets['total'] = row.count
+        elif name == 'price':
+            if row.price_bucket:
+                max_price = PRICE_BUCKETS[row.price_bucket] if row.price_bucket < len(PRICE_BUCKETS) else None
+                facets['price'].append({'min_price': PRICE_BUCKETS[row.price_bucket - 1], 'max_price': max_price, 'count': row.count})
+        else:
+            facets[name].append({'value': getattr(row, name), 'count': row.count})
+    for name in FACET_COLUMNS:
+        facets[name].sort(key=lambda facet: (facet['value'] is None, facet['value']))
+    facets['price'].sort(key=lambda bucket: bucket['min_price'])
+    return facets
@@ -0,0 +1,86 @@
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from auth.principal import Principal
+from .models import Listing, Image
+from .repositories import RepositoryListing
+
+LISTING_COLUMNS = tuple(prop.key for prop in Listing.__mapper__.column_attrs if not prop.deferred)
+IMAGE_COLUMNS = tuple(column.name for column in Image.__table__.columns)
+
+
+class ImageRecord:
+    __slots__ = IMAGE_COLUMNS
+
+    def __init__(self, row):
+        for name in IMAGE_COLUMNS:
+            setattr(self, name, row[name])
+
+
+class ListingRecord:
+    __slots__ = LISTING_COLUMNS + ('images',)
+
+    def __init__(self, row):
+        for name, value in row.items():
+            setattr(self, name, value)
+        self.images = []
+
+    @property
+    def cover_image(self) -> Optional[ImageRecord]:
+        return min(self.images, key=lambda image: image.id, default=None)
+
+
+class FastReadRepositoryListing(RepositoryListing):
+    IMAGES_SQL = f'SELECT {", ".join(IMAGE_COLUMNS)} FROM images WHERE listing_id = ANY($1::integer[]) ORDER BY id'
+    COVER_IMAGES_SQL = (f'SELECT DISTINCT ON (listing_id) {", ".join(IMAGE_COLUMNS)} FROM images WHERE listing_id = ANY($1::integer[]) '
+                        'ORDER BY listing_id, id')
+
+    async def _driver_connection(self):
+        connection = await self._session.connection()
+        raw = await connection.get_raw_connection()
+        return raw.driver_connection
+
+    def _compile(self, stmt) -> tuple[str, list]:
+        compiled = stmt.compile(dialect=self._session.bind.dialect)
+        params = [compiled.params[name] for name in compiled.positiontup]
+        sql = compiled.string % tuple(f'${index}' for index in range(1, len(params) + 1))
+        return sql, [param.value if isinstance(param, Enum) else param for param in params]
+
+    @classmethod
+    def _select(cls, fields: Optional[tuple[str, ...]] = None):
+        return select(*(Listing.__table__.c[name] for name in (LISTING_COLUMNS if fields is None else cls._projected_columns(fields))))
+
+    async def _fetch_listings(self, stmt, fields: Optional[tuple[str, ...]] = None) -> list[ListingRecord]:
+        driver = await self._driver_connection()
+        sql, params = self._compile(stmt)
+        listings = [ListingRecord(row) for row in await driver.fetch(sql, *params)]
+        if listings and (fields is None or {'images', 'cover_image'} & set(fields)):
+            by_id = {listing.id: listing for listing in listings}
+            images_sql = self.IMAGES_SQL if fields is None or 'images' in fields else self.COVER_IMAGES_SQL
+            for row in await driver.fetch(images_sql, list(by_id)):
+                by_id[row['listing_id']].images.append(ImageRecord(row))
+        return listings
+
+    async def get_all_listings(self, offset: int, limit: int, base_building_params: dict, advanced_building_params: dict, price_params: dict,
+                               address_params: dict, cursor: Optional[tuple[datetime, int]] = None,
+                               geo_params: Optional[dict] = None, fields: Optional[tuple[str, ...]] = None,
+                               search: Optional[str] = None) -> list[ListingRecord]:
+        stmt = await self._all_listings_stmt(stmt=self._select(fields), offset=offset, limit=limit, base_building_params=base_building_params,
+                                             advanced_building_params=advanced_building_params, price_params=price_params,
+                                             address_params=address_params, cursor=cursor, geo_params=geo_params, search=search)
+        return await self._fetch_listings(stmt, fields=fields)
+
+    async def get_detail_listing(self, listing_id: int) -> ListingRecord:
+        if not (listings := await self._fetch_listings(self._select().where(Listing.id == listing_id))):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Listing not found')
+        return listings[0]
+
+    async def get_listings_by_ids(self, listing_ids: list[int]) -> list[ListingRecord]:
+        return await self._fetch_listings(self._by_ids_stmt(self._select(), listing_ids=listing_ids))
+
+    async def show_favorites_listings(self, offset: int, limit: int, user: Principal,
+                                      cursor: Optional[tuple[datetime, int]] = None, fields: Optional[tuple[str, ...]] = None) -> list[ListingRecord]:
+        stmt = self._favorites_stmt(self._select(fields), offset=offset, limit=limit, user=user, cursor=cursor)
+        return await self._fetch_listings(stmt, fields=fields)
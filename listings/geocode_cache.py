@@ -0,0 +1,65 @@
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from utils.single_flight import SingleFlight
+from utils.ttl_cache import TTLCache
+from .models import GeocodeCache as GeocodeCacheModel
+from .utils import GeoInterface
+
+
+def normalize_address(country: Optional[str], city: Optional[str], street: Optional[str], house_number: Optional[str] = None) -> str:
+    return '|'.join(' '.join(str(part).lower().split()) if part else '' for part in (country, city, street, house_number))
+
+
+class GeocodeCacheRepository:
+    def __init__(self, session: AsyncSession):
+        self._session = session
+
+    async def get(self, address_key: str) -> Optional[tuple[float, float, str]]:
+        result = await self._session.execute(
+            select(GeocodeCacheModel.latitude, GeocodeCacheModel.longitude, GeocodeCacheModel.full_address)
+            .where(GeocodeCacheModel.address_key == address_key))
+        return tuple(row) if (row := result.first()) else None
+
+    async def save(self, address_key: str, point: tuple[float, float, str]):
+        latitude, longitude, full_address = point
+        await self._session.execute(
+            insert(GeocodeCacheModel).values(address_key=address_key, latitude=latitude, longitude=longitude, full_address=full_address)
+            .on_conflict_do_nothing(index_elements=[GeocodeCacheModel.address_key]))
+        await self._session.commit()
+
+
+class GeocodeCache:
+    def __init__(self, maxsize: int, ttl: int):
+        self.memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.single_flight = SingleFlight()
+
+    def stats(self) -> dict:
+        return {**self.memory.stats(), 'lookups': self.single_flight.stats()}
+
+
+class CachedGeo(GeoInterface):
+    def __init__(self, geo: GeoInterface, cache: GeocodeCache, repository: GeocodeCacheRepository):
+        self._geo = geo
+        self._cache = cache
+        self._repository = repository
+
+    async def _lookup(self, address_key: str, country: str, city: str, street: str, house_number: Optional[str]):
+        if point := await self._repository.get(address_key=address_key):
+            return point
+        point = await self._geo.get_longitude_and_latitude(country=country, city=city, street=street, house_number=house_number)
+        await self._repository.save(address_key=address_key, point=point)
+        return point
+
+    async def get_longitude_and_latitude(self, country: str, city: str, street: str, house_number: Optional[str] = None):
+        address_key = normalize_address(country=country, city=city, street=street, house_number=house_number)
+        if point := self._cache.memory.get(address_key):
+            return point
+        point = await self._cache.single_flight.do(
+            address_key, lambda: self._lookup(address_key=address_key, country=country, city=city, street=street, house_number=house_number))
+        self._cache.memory.set(address_key, point)
+        return point
+
+    async def get_address_from_latitude_longitude(self, latitude: float, longitude: float):
+        return await self._geo.get_address_from_latitude_longitude(latitude=latitude, longitude=longitude)
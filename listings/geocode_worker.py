@@ -0,0 +1,152 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Optional
+from datetime import datetime, timedelta
+from sqlalchemy import select, update, func, or_, and_
+from sqlalchemy.orm import sessionmaker
+from .geocode_cache import CachedGeo, GeocodeCache, GeocodeCacheRepository
+from .models import Listing
+from .schemas import GeocodeStatus
+from .utils import GeoInterface
+
+logger = logging.getLogger(__name__)
+
+GEOCODE_WORKER_LOCK = 7_340_211
+
+
+class RateLimiter:
+    def __init__(self, requests_per_second: float):
+        self._interval = 1 / requests_per_second
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            now = time.monotonic()
+            if (delay := self._next_slot - now) > 0:
+                await asyncio.sleep(delay)
+            self._next_slot = max(now, self._next_slot) + self._interval
+
+
+class RateLimitedGeo(GeoInterface):
+    def __init__(self, geo: GeoInterface, rate_limiter: RateLimiter):
+        self._geo = geo
+        self._rate_limiter = rate_limiter
+
+    async def get_longitude_and_latitude(self, country: str, city: str, street: str, house_number: Optional[str] = None):
+        await self._rate_limiter.acquire()
+        return await self._geo.get_longitude_and_latitude(country=country, city=city, street=street, house_number=house_number)
+
+    async def get_address_from_latitude_longitude(self, latitude: float, longitude: float):
+        await self._rate_limiter.acquire()
+        return await self._geo.get_address_from_latitude_longitude(latitude=latitude, longitude=longitude)
+
+
+class GeocodeWorker:
+    def __init__(self, session_factory: sessionmaker, geo: GeoInterface, cache: GeocodeCache, requests_per_second: float,
+                 batch_size: int, poll_interval: float, claim_timeout: float = 300.0,
+                 on_commit: Optional[Callable[[list[int]], Awaitable]] = None):
+        self._session_factory = session_factory
+        self._geo = RateLimitedGeo(geo=geo, rate_limiter=RateLimiter(requests_per_second=requests_per_second))
+        self._cache = cache
+        self._batch_size = batch_size
+        self._poll_interval = poll_interval
+        self._claim_timeout = claim_timeout
+        self._on_commit = on_commit
+        self._task: Optional[asyncio.Task] = None
+
+    async def _geocode(self, cached_geo: CachedGeo, row) -> dict:
+        try:
+            lat, lng, full_address = await cached_geo.get_longitude_and_latitude(country=row.country, city=row.city, street=row.street,
+                                                                                 house_number=row.house_number)
+        except Exception:
+            logger.exception('Could not geocode listing %s', row.id)
+            return {'geocode_status': GeocodeStatus.FAILED.value}
+        return {'latitude': lat, 'longitude': lng, 'full_address': full_address, 'geocode_status': GeocodeStatus.DONE.value}
+
+    async def _claim(self, claimed_at: datetime) -> list:
+        expired = claimed_at - timedelta(seconds=self._claim_timeout)
+        claimable = (select(Listing.id)
+                     .where(or_(Listing.geocode_status == GeocodeStatus.PENDING.value,
+                                and_(Listing.geocode_status == GeocodeStatus.IN_PROGRESS.value, Listing.geocode_claimed_at < expired)))
+                     .order_by(Listing.id).limit(self._batch_size).with_for_update(skip_locked=True))
+        async with self._session_factory() as session:
+            result = await session.execute(
+                update(Listing).where(Listing.id.in_(claimable.scalar_subquery()))
+                .values(geocode_status=GeocodeStatus.IN_PROGRESS.value, geocode_claimed_at=claimed_at, updated=Listing.updated)
+                .returning(Listing.id, Listing.country, Listing.city, Listing.street, Listing.house_number)
+                .execution_options(synchronize_session=False))
+            rows = sorted(result.all(), key=lambda row: row.id)
+            await session.commit()
+        return rows
+
+    async def _save(self, listing_id: int, claimed_at: datetime, values: dict) -> bool:
+        async with self._session_factory() as session:
+            result = await session.execute(
+                update(Listing).where(Listing.id == listing_id, Listing.geocode_status == GeocodeStatus.IN_PROGRESS.value,
+                                      Listing.geocode_claimed_at == claimed_at)
+                .values(**values, geocode_claimed_at=None, updated=Listing.updated).execution_options(synchronize_session=False))
+            await session.commit()
+        return result.rowcount == 1
+
+    async def run_once(self) -> int:
+        claimed_at = datetime.now()
+        rows = await self._claim(claimed_at=claimed_at)
+        saved = []
+        for row in rows:
+            async with self._session_factory() as cache_session:
+                cached_geo = CachedGeo(geo=self._geo, cache=self._cache, repository=GeocodeCacheRepository(session=cache_session))
+                values = await self._geocode(cached_geo=cached_geo, row=row)
+            if await self._save(listing_id=row.id, claimed_at=claimed_at, values=values):
+                saved.append(row.id)
+        if saved and self._on_commit:
+            await self._on_commit(saved)
+        return len(rows)
+
+    async def run_until_empty(self) -> int:
+        processed = 0
+        while count := await self.run_once():
+            processed += count
+        return processed
+
+    @asynccontextmanager
+    async def leadership(self) -> AsyncIterator[bool]:
+        async with self._session_factory() as session:
+            connection = await session.connection(execution_options={'isolation_level': 'AUTOCOMMIT'})
+            leader = (await connection.execute(select(func.pg_try_advisory_lock(GEOCODE_WORKER_LOCK)))).scalar()
+            try:
+                yield leader
+            finally:
+                if leader:
+                    try:
+                        await connection.execute(select(func.pg_advisory_unlock(GEOCODE_WORKER_LOCK)))
+                    except BaseException:
+                        await connection.invalidate()
+                        raise
+
+    async def _run_forever(self):
+        while True:
+            try:
+                async with self.leadership() as leader:
+                    while leader:
+                        if not await self.run_once():
+                            await asyncio.sleep(self._poll_interval)
+                await asyncio.sleep(self._poll_interval)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception('Geocode worker batch failed')
+                await asyncio.sleep(self._poll_interval)
+
+    def start(self):
+        self._task = asyncio.create_task(self._run_forever())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
@@ -0,0 +1,28 @@
+import numpy as np
+
+
+def polygon_bbox(polygon: np.ndarray) -> tuple[float, float, float, float]:
+    min_lng, min_lat = polygon.min(axis=0)
+    max_lng, max_lat = polygon.max(axis=0)
+    return float(min_lng), float(min_lat), float(max_lng), float(max_lat)
+
+
+def points_in_polygon(latitudes: np.ndarray, longitudes: np.ndarray, polygon: np.ndarray) -> np.ndarray:
+    """Even-odd rule over (lng, lat) vertices.
+
+    Points are sorted by latitude once, so each edge only tests the contiguous slice of points inside its latitude band.
+    """
+    order = np.argsort(np.asarray(latitudes, dtype=np.float64), kind='stable')
+    x, y = np.asarray(longitudes, dtype=np.float64)[order], np.asarray(latitudes, dtype=np.float64)[order]
+    inside = np.zeros(x.shape, dtype=bool)
+    ax, ay = polygon[:, 0], polygon[:, 1]
+    bx, by = np.roll(ax, -1), np.roll(ay, -1)
+    starts = np.searchsorted(y, np.minimum(ay, by), side='left')
+    ends = np.searchsorted(y, np.maximum(ay, by), side='left')
+    for edge in np.flatnonzero(ends > starts).tolist():
+        start, end = starts[edge], ends[edge]
+        slope = (bx[edge] - ax[edge]) / (by[edge] - ay[edge])
+        inside[start:end] ^= x[start:end] < (y[start:end] - ay[edge]) * slope + ax[edge]
+    result = np.empty_like(inside)
+    result[order] = inside
+    return result
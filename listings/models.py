@@ -1,12 +1,28 @@
 from datetime import datetime
+from typing import Optional
 import sqlalchemy as _sql
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from database import Base
-from sqlalchemy.dialects.postgresql import ENUM
+from sqlalchemy.dialects.postgresql import ENUM, TSVECTOR
+
+SEARCH_CONFIG = 'english'
+SEARCH_VECTOR = f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A') || " \
+                f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B')"
 
 
 class Listing(Base):
     __tablename__ = 'listings'
+    __table_args__ = (
+        _sql.Index('ix_listings_published_updated_id', 'updated', 'id', postgresql_where=_sql.text('is_published')),
+        _sql.Index('ix_listings_published_category_rooms_updated_id', 'category_type', 'number_of_rooms', 'updated', 'id',
+                   postgresql_where=_sql.text('is_published')),
+        _sql.Index('ix_listings_published_category_price', 'category_type', 'price', postgresql_where=_sql.text('is_published')),
+        _sql.Index('ix_listings_user_id_updated_id', 'user_id', 'updated', 'id'),
+        _sql.Index('ix_listings_latitude_longitude', 'latitude', 'longitude'),
+        _sql.Index('ix_listings_geocode_pending', 'id', postgresql_where=_sql.text("geocode_status = 'PENDING'")),
+        _sql.Index('ix_listings_geocode_claimed_at', 'geocode_claimed_at', postgresql_where=_sql.text("geocode_status = 'IN_PROGRESS'")),
+        _sql.Index('ix_listings_search_vector', 'search_vector', postgresql_using='gin'),
+    )
 
     id = _sql.Column(_sql.Integer, primary_key=True, index=True)
     category_type = _sql.Column(ENUM('SELL', 'RENT', 'DAILY_RENT', name='categories', ), nullable=False, default='SELL')
@@ -18,7 +34,7 @@ class Listing(Base):
     description = _sql.Column(_sql.String, nullable=True)
     created = _sql.Column(_sql.DateTime, default=datetime.now)
     updated = _sql.Column(_sql.DateTime, default=datetime.now, onupdate=datetime.now)
-    is_published = _sql.Column(_sql.Boolean, default=True)
+    is_published = _sql.Column(_sql.Boolean, default=True, server_default=_sql.true(), nullable=False)
     user_id = _sql.Column(_sql.Integer, _sql.ForeignKey('auth.id'))
     number_of_views = _sql.Column(_sql.Integer, nullable=True)
 
@@ -31,25 +47,40 @@ class Listing(Base):
     longitude = _sql.Column(_sql.Float, nullable=True)
     latitude = _sql.Column(_sql.Float, nullable=True)
     full_address = _sql.Column(_sql.String, nullable=True)
+    geocode_status = _sql.Column(ENUM('PENDING', 'IN_PROGRESS', 'DONE', 'FAILED', name='geocode_statuses', ), nullable=True)
+    geocode_claimed_at = deferred(_sql.Column(_sql.DateTime, nullable=True))
     house_type = _sql.Column(ENUM('NEW_BUILDING', 'SECONDARY_HOUSING', name='houses', ), nullable=True, default='NEW_BUILDING')
     wall_type = _sql.Column(ENUM('BRICK', 'WOOD', 'PANEL', name='walls', ), nullable=True, default='BRICK')
     number_of_floors = _sql.Column(_sql.Integer, default=1)
     elevator = _sql.Column(_sql.Boolean, default=True)
     year_built = _sql.Column(_sql.Integer)
+    search_vector = deferred(_sql.Column(TSVECTOR, _sql.Computed(SEARCH_VECTOR, persisted=True)))
+
+    favorites = relationship('Favorite', backref='listing', lazy='select', cascade='all, delete')
+    images = relationship('Image', backref='article', cascade='all, delete', lazy='selectin')
 
-    favorites = relationship('Favorite', backref='listing', lazy='joined', cascade='all, delete')
-    images = relationship('Image', backref='article', cascade='all, delete', lazy='joined')
+    @property
+    def cover_image(self) -> Optional['Image']:
+        return min(self.images, key=lambda image: image.id, default=None)
 
     def __repr__(self) -> str:
         return f'<Listing: {self.title}>'
 
 
+for _name in ('country', 'city', 'street', 'region', 'district', 'house_number'):
+    _sql.Index(f'ix_listings_lower_{_name}', _sql.func.lower(Listing.__table__.c[_name]).label(f'lower_{_name}'),
+               postgresql_ops={f'lower_{_name}': 'text_pattern_ops'})
+
+_sql.Index('ix_listings_published_city_category_updated_id', _sql.func.lower(Listing.__table__.c.city), Listing.__table__.c.category_type,
+           Listing.__table__.c.updated, Listing.__table__.c.id, postgresql_where=_sql.text('is_published'))
+
+
 class Image(Base):
     __tablename__ = 'images'
 
     id = _sql.Column(_sql.Integer, primary_key=True, index=True)
     photo = _sql.Column(_sql.String, nullable=False)
-    listing_id = _sql.Column(_sql.Integer, _sql.ForeignKey('listings.id'))
+    listing_id = _sql.Column(_sql.Integer, _sql.ForeignKey('listings.id'), index=True)
 
     def __repr__(self) -> str:
         return f'<Image: {self.photo}>'
@@ -57,6 +88,9 @@ class Image(Base):
 
 class Favorite(Base):
     __tablename__ = 'favorites'
+    __table_args__ = (
+        _sql.Index('ix_favorites_user_id_listing_id', 'user_id', 'listing_id'),
+    )
 
     id = _sql.Column(_sql.Integer, primary_key=True, index=True)
     listing_id = _sql.Column(_sql.Integer, _sql.ForeignKey('listings.id'))
@@ -65,3 +99,16 @@ class Favorite(Base):
 
     def __repr__(self) -> str:
         return f'<Favorite: listing: {self.listing_id} user: {self.user_id}>'
+
+
+class GeocodeCache(Base):
+    __tablename__ = 'geocode_cache'
+
+    address_key = _sql.Column(_sql.String, primary_key=True)
+    latitude = _sql.Column(_sql.Float, nullable=False)
+    longitude = _sql.Column(_sql.Float, nullable=False)
+    full_address = _sql.Column(_sql.String, nullable=True)
+    created = _sql.Column(_sql.DateTime, default=datetime.now)
+
+    def __repr__(self) -> str:
+        return f'<GeocodeCache: {self.address_key}>'
@@ -0,0 +1,101 @@
+import argparse
+import csv
+import sys
+from pathlib import Path
+from typing import Optional, Union
+import numpy as np
+from fastapi import HTTPException, status
+from scipy.spatial import cKDTree
+from .utils import GeoInterface
+
+EARTH_RADIUS_KM = 6371.0088
+
+POINTS_FILE = 'points.npy'
+LABELS_FILE = 'labels.bin'
+OFFSETS_FILE = 'offsets.npy'
+
+GEONAMES_NAME, GEONAMES_LATITUDE, GEONAMES_LONGITUDE, GEONAMES_COUNTRY, GEONAMES_ADMIN1 = 1, 4, 5, 8, 10
+
+
+def to_unit_vectors(latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+    lat, lng = np.radians(latitudes, dtype=np.float64), np.radians(longitudes, dtype=np.float64)
+    cos_lat = np.cos(lat)
+    return np.column_stack((cos_lat * np.cos(lng), cos_lat * np.sin(lng), np.sin(lat)))
+
+
+def chord_to_km(chord: np.ndarray) -> np.ndarray:
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(chord / 2, 0, 1))
+
+
+def build_gazetteer(tsv_path: Union[str, Path], directory: Union[str, Path]) -> int:
+    csv.field_size_limit(sys.maxsize)
+    latitudes, longitudes, labels = [], [], []
+    with open(tsv_path, encoding='utf-8', newline='') as file:
+        for row in csv.reader(file, delimiter='\t', quoting=csv.QUOTE_NONE):
+            latitudes.append(float(row[GEONAMES_LATITUDE]))
+            longitudes.append(float(row[GEONAMES_LONGITUDE]))
+            labels.append(', '.join(part for part in (row[GEONAMES_NAME], row[GEONAMES_ADMIN1], row[GEONAMES_COUNTRY]) if part).encode())
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    np.save(directory / POINTS_FILE, to_unit_vectors(np.array(latitudes), np.array(longitudes)))
+    np.save(directory / OFFSETS_FILE, np.cumsum([0] + [len(label) for label in labels], dtype=np.int64))
+    (directory / LABELS_FILE).write_bytes(b''.join(labels))
+    return len(labels)
+
+
+class Gazetteer:
+    def __init__(self, points: np.ndarray, labels: Union[bytes, np.ndarray], offsets: np.ndarray):
+        self._labels = labels
+        self._offsets = offsets
+        self._tree = cKDTree(points, copy_data=False, balanced_tree=False)
+
+    @classmethod
+    def load(cls, directory: Union[str, Path]) -> 'Gazetteer':
+        directory = Path(directory)
+        return cls(points=np.load(directory / POINTS_FILE, mmap_mode='r'), offsets=np.load(directory / OFFSETS_FILE, mmap_mode='r'),
+                   labels=np.memmap(directory / LABELS_FILE, dtype=np.uint8, mode='r'))
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def label(self, index: int) -> str:
+        return bytes(self._labels[self._offsets[index]:self._offsets[index + 1]]).decode()
+
+    def nearest(self, latitudes: np.ndarray, longitudes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        chords, indexes = self._tree.query(to_unit_vectors(np.atleast_1d(latitudes), np.atleast_1d(longitudes)), k=1)
+        return indexes, chord_to_km(chords)
+
+
+class OfflineGeo(GeoInterface):
+    def __init__(self, gazetteer: Gazetteer, fallback: Optional[GeoInterface] = None, max_distance_km: Optional[float] = None):
+        self._gazetteer = gazetteer
+        self._fallback = fallback
+        self._max_distance_km = max_distance_km
+
+    async def close(self):
+        if self._fallback:
+            await self._fallback.close()
+
+    async def get_longitude_and_latitude(self, country: str, city: str, street: str, house_number: Optional[str] = None):
+        if not self._fallback:
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail='Geocoding is not available')
+        return await self._fallback.get_longitude_and_latitude(country=country, city=city, street=street, house_number=house_number)
+
+    async def get_address_from_latitude_longitude(self, latitude: float, longitude: float) -> Optional[str]:
+        return self.reverse_many(latitudes=[float(latitude)], longitudes=[float(longitude)])[0]
+
+    def reverse_many(self, latitudes, longitudes) -> list[Optional[str]]:
+        indexes, distances = self._gazetteer.nearest(latitudes=np.asarray(latitudes, dtype=np.float64),
+                                                     longitudes=np.asarray(longitudes, dtype=np.float64))
+        if self._max_distance_km is not None:
+            indexes = np.where(distances <= self._max_distance_km, indexes, -1)
+        labels = {index: self._gazetteer.label(index) for index in np.unique(indexes[indexes >= 0]).tolist()}
+        return [labels.get(index) for index in indexes.tolist()]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Convert a GeoNames dump (e.g. cities500.txt) into an offline gazetteer.')
+    parser.add_argument('tsv', help='GeoNames tab-separated file')
+    parser.add_argument('directory', help='output directory, later set as GAZETTEER_DIR')
+    args = parser.parse_args()
+    print(f'{build_gazetteer(tsv_path=args.tsv, directory=args.directory)} places written to {args.directory}')
@@ -0,0 +1,43 @@
+import base64
+import binascii
+from datetime import datetime
+from typing import Optional
+from fastapi import HTTPException, status
+
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+HAS_MORE_HEADER = 'X-Has-More'
+SEARCH_WINDOW_HEADER = 'X-Search-Window'
+TOTAL_COUNT_HEADER = 'X-Total-Count'
+TOTAL_COUNT_KIND_HEADER = 'X-Total-Count-Kind'
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(updated: datetime, listing_id: int) -> str:
+    raw = f'{updated.isoformat()}|{listing_id}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[tuple[datetime, int]]:
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        updated, listing_id = raw.rsplit('|', 1)
+        return datetime.fromisoformat(updated), int(listing_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Invalid cursor')
+
+
+def next_cursor(listings: list, limit: int) -> Optional[str]:
+    if not listings or len(listings) < limit:
+        return None
+    last = listings[-1]
+    return encode_cursor(updated=last.updated, listing_id=last.id)
+
+
+def split_page(listings: list, limit: int, with_cursor: bool = True) -> tuple[list, dict]:
+    page, has_more = listings[:limit], len(listings) > limit
+    headers = {HAS_MORE_HEADER: 'true' if has_more else 'false'}
+    if has_more and with_cursor and (cursor := next_cursor(listings=page, limit=limit)):
+        headers[NEXT_CURSOR_HEADER] = cursor
+    return page, headers
@@ -1,6 +1,10 @@
-from sqlalchemy import between, Column
+import math
+from typing import Optional
+from sqlalchemy import between, Column, func, or_, literal_column
 
-from listings.models import Listing
+from listings.models import Listing, SEARCH_CONFIG
+
+EARTH_RADIUS_KM = 6371.0088
 
 
 class QueryListingParamsService:
@@ -40,10 +44,15 @@ class QueryListingParamsService:
         return stm
 
     @staticmethod
-    async def _address_param(stm, address_params: dict, key: str, column: Column):
+    def address_expr(column: Column, value: str):
+        value = value.lower()
+        if '%' in value or '_' in value:
+            return func.lower(column).like(value)
+        return func.lower(column) == value
+
+    async def _address_param(self, stm, address_params: dict, key: str, column: Column):
         if address_params.get(key):
-            country_expr = column.ilike(address_params.get(key))
-            stm = stm.where(country_expr)
+            stm = stm.where(self.address_expr(column=column, value=address_params.get(key)))
         return stm
 
     async def common_address_params(self, stm, address_params: dict):
@@ -55,3 +64,50 @@ class QueryListingParamsService:
             stm = await self._address_param(address_params=address_params, stm=stm, key='district', column=Listing.district)
             stm = await self._address_param(address_params=address_params, stm=stm, key='house_number', column=Listing.house_number)
         return stm
+
+    @staticmethod
+    def distance_km(lat: float, lng: float):
+        half_dlat = func.radians(Listing.latitude - lat) / 2
+        half_dlng = func.radians(Listing.longitude - lng) / 2
+        a = func.power(func.sin(half_dlat), 2) \
+            + math.cos(math.radians(lat)) * func.cos(func.radians(Listing.latitude)) * func.power(func.sin(half_dlng), 2)
+        return 2 * EARTH_RADIUS_KM * func.asin(func.sqrt(func.least(1.0, a)))
+
+    @staticmethod
+    def radius_bbox(lat: float, lng: float, radius_km: float) -> tuple[float, float, float, float]:
+        angular = radius_km / EARTH_RADIUS_KM
+        min_lat, max_lat = lat - math.degrees(angular), lat + math.degrees(angular)
+        if min_lat <= -90 or max_lat >= 90:
+            return -180.0, max(min_lat, -90.0), 180.0, min(max_lat, 90.0)
+        lng_delta = math.degrees(math.asin(math.sin(angular) / math.cos(math.radians(lat))))
+        min_lng, max_lng = lng - lng_delta, lng + lng_delta
+        return (min_lng + 360 if min_lng < -180 else min_lng), min_lat, (max_lng - 360 if max_lng > 180 else max_lng), max_lat
+
+    @staticmethod
+    def _bbox_expr(min_lng: float, min_lat: float, max_lng: float, max_lat: float):
+        lat_expr = between(Listing.latitude, min_lat, max_lat)
+        if min_lng <= max_lng:
+            return lat_expr & between(Listing.longitude, min_lng, max_lng)
+        return lat_expr & or_(Listing.longitude >= min_lng, Listing.longitude <= max_lng)
+
+    async def geo_params(self, stm, geo_params: dict, distance: Optional = None):
+        if bbox := geo_params.get('bbox'):
+            stm = stm.where(self._bbox_expr(*bbox))
+        if (radius_km := geo_params.get('radius_km')) is not None:
+            lat, lng = geo_params['lat'], geo_params['lng']
+            distance = self.distance_km(lat=lat, lng=lng) if distance is None else distance
+            stm = stm.where(self._bbox_expr(*self.radius_bbox(lat=lat, lng=lng, radius_km=radius_km)), distance <= radius_km)
+        return stm
+
+    @staticmethod
+    def text_query(search: str):
+        return func.websearch_to_tsquery(literal_column(f"'{SEARCH_CONFIG}'::regconfig"), search)
+
+    @staticmethod
+    def text_rank(query):
+        return func.ts_rank_cd(Listing.search_vector, query)
+
+    def search_params(self, stm, search: Optional[str]):
+        if search:
+            stm = stm.where(Listing.search_vector.op('@@')(self.text_query(search)))
+        return stm
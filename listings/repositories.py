@@ -1,16 +1,25 @@
+from datetime import datetime
 from typing import Optional
-from sqlalchemy import select, insert, update
+from sqlalchemy import select, insert, update, tuple_, func, bindparam, any_, Integer
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only, noload
 from image_service.image_service_interface import ImageServiceInterface
-from profile.models import User
+from auth.principal import Principal
 from .repository_interface import RepositoryInterface
 from .models import Listing, Image, Favorite
 from fastapi import HTTPException, status, UploadFile
 import uuid
+import numpy as np
 from .query_filter_service import QueryListingParamsService
+from .geometry import points_in_polygon, polygon_bbox
+from .facets import facet_expressions
+from .counting import Explain, planner_rows
+from .schemas import TotalCountKind
 
 
 class RepositoryListing(RepositoryInterface):
+    PAGINATION_COLUMNS = ('id', 'updated')
 
     def __init__(self, session: AsyncSession):
         self._session = session
@@ -22,7 +31,8 @@ class RepositoryListing(RepositoryInterface):
                 await file_service.write_image(file=image, filename=filename)
                 await self._session.execute(insert(Image).values(photo=filename, listing_id=listing_id))
 
-    async def add_listing(self, listing_data: dict, user: User, files: Optional[list[UploadFile]], file_service: ImageServiceInterface) -> Listing:
+    async def add_listing(self, listing_data: dict, user: Principal, files: Optional[list[UploadFile]],
+                          file_service: ImageServiceInterface) -> Listing:
         listing_result = await self._session.execute(
             insert(Listing).values(**listing_data, user_id=user.id).returning(Listing.id))
         listing_id: Listing = listing_result.scalars().first()
@@ -31,7 +41,7 @@ class RepositoryListing(RepositoryInterface):
         listing = await self._session.execute(select(Listing).where(Listing.id == listing_id))
         return listing.scalars().first()
 
-    async def update_listing(self, listing_id: int, updated_data: dict, user: User, files: Optional[list[UploadFile]],
+    async def update_listing(self, listing_id: int, updated_data: dict, user: Principal, files: Optional[list[UploadFile]],
                              file_service: ImageServiceInterface) -> tuple[bool, Optional[Listing]]:
         if (listing := await self.get_single_listing(listing_id=listing_id)) and listing.user_id != user.id:
             return False, None
@@ -41,31 +51,166 @@ class RepositoryListing(RepositoryInterface):
         await self._session.refresh(listing)
         return True, listing
 
+    @staticmethod
+    def _paginate(stmt, offset: int, limit: int, cursor: Optional[tuple[datetime, int]]):
+        stmt = stmt.order_by(Listing.updated.desc(), Listing.id.desc()).limit(limit)
+        if cursor:
+            return stmt.where(tuple_(Listing.updated, Listing.id) < tuple_(*cursor))
+        return stmt.offset(offset)
+
+    @classmethod
+    def _projected_columns(cls, fields: tuple[str, ...]) -> list[str]:
+        return [column.name for column in Listing.__table__.columns if column.name in fields or column.name in cls.PAGINATION_COLUMNS]
+
+    @classmethod
+    def _project(cls, stmt, fields: Optional[tuple[str, ...]]):
+        if fields is None:
+            return stmt
+        stmt = stmt.options(load_only(*cls._projected_columns(fields)))
+        return stmt if {'images', 'cover_image'} & set(fields) else stmt.options(noload(Listing.images))
+
     async def get_single_listing(self, listing_id: int) -> Listing:
         result = await self._session.execute(select(Listing).filter_by(id=listing_id))
         if not (listing := result.scalars().first()):
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Listing not found')
         return listing
 
-    async def get_user_listings(self, user_id: int, offset: int, limit: int):
-        result = await self._session.execute(select(Listing).where(Listing.user_id == user_id).limit(limit).offset(offset))
-        return result.scalars().unique().all()
+    async def get_user_listings(self, user_id: int, offset: int, limit: int, cursor: Optional[tuple[datetime, int]] = None,
+                                fields: Optional[tuple[str, ...]] = None):
+        stmt = self._paginate(select(Listing).where(Listing.user_id == user_id), offset=offset, limit=limit, cursor=cursor)
+        stmt = self._project(stmt, fields=fields)
+        result = await self._session.execute(stmt)
+        return result.scalars().all()
 
-    async def get_all_listings(self, offset: int, limit: int, base_building_params: dict, advanced_building_params: dict, price_params: dict,
-                               address_params: dict) -> list[Listing]:
+    @staticmethod
+    async def _filter_listings(stmt, base_building_params: dict, advanced_building_params: dict, price_params: dict, address_params: dict,
+                               geo_params: dict, distance=None):
         query_service = QueryListingParamsService()
-        stmt = select(Listing)
         stmt = await query_service.common_address_params(stm=stmt, address_params=address_params)
         stmt = await query_service.advanced_building_params(stm=stmt, advanced_building_params=advanced_building_params)
         stmt = await query_service.price_params(stm=stmt, price_params=price_params)
+        stmt = await query_service.geo_params(stm=stmt, geo_params=geo_params, distance=distance)
+        return stmt.where(Listing.is_published).filter_by(**base_building_params)
+
+    async def _all_listings_stmt(self, stmt, offset: int, limit: int, base_building_params: dict, advanced_building_params: dict,
+                                 price_params: dict, address_params: dict, cursor: Optional[tuple[datetime, int]], geo_params: Optional[dict],
+                                 search: Optional[str] = None):
+        geo_params = geo_params or {}
+        distance = QueryListingParamsService.distance_km(lat=geo_params['lat'], lng=geo_params['lng']) if geo_params.get('sort') else None
+        filters = {'base_building_params': base_building_params, 'advanced_building_params': advanced_building_params,
+                   'price_params': price_params, 'address_params': address_params, 'geo_params': geo_params}
+        if search and distance is None:
+            return await self._search_stmt(stmt, search=search, offset=offset, limit=limit, filters=filters)
+        stmt = await self._filter_listings(stmt=stmt, distance=distance, **filters)
+        stmt = QueryListingParamsService().search_params(stm=stmt, search=search)
+        if distance is not None:
+            return stmt.where(Listing.latitude.isnot(None)).order_by(distance, Listing.id).offset(offset).limit(limit)
+        return self._paginate(stmt, offset=offset, limit=limit, cursor=cursor)
+
+    async def _search_candidates(self, search: str, filters: dict):
+        candidates = QueryListingParamsService().search_params(stm=await self._filter_listings(stmt=select(Listing.id), **filters), search=search)
+        return candidates.order_by(Listing.updated.desc(), Listing.id.desc()).limit(self.SEARCH_CANDIDATES).subquery()
+
+    async def _search_stmt(self, stmt, search: str, offset: int, limit: int, filters: dict):
+        query_service = QueryListingParamsService()
+        candidates = await self._search_candidates(search=search, filters=filters)
+        rank = query_service.text_rank(query_service.text_query(search))
+        stmt = stmt.join(candidates, candidates.c.id == Listing.id)
+        return stmt.order_by(rank.desc(), Listing.updated.desc(), Listing.id.desc()).offset(offset).limit(limit)
+
+    async def get_all_listings(self, offset: int, limit: int, base_building_params: dict, advanced_building_params: dict, price_params: dict,
+                               address_params: dict, cursor: Optional[tuple[datetime, int]] = None,
+                               geo_params: Optional[dict] = None, fields: Optional[tuple[str, ...]] = None,
+                               search: Optional[str] = None) -> list[Listing]:
+        stmt = await self._all_listings_stmt(stmt=self._project(select(Listing), fields=fields), offset=offset, limit=limit,
+                                             base_building_params=base_building_params, advanced_building_params=advanced_building_params,
+                                             price_params=price_params, address_params=address_params, cursor=cursor, geo_params=geo_params,
+                                             search=search)
+        result = await self._session.execute(stmt)
+        return result.scalars().all()
+
+    async def count_listings(self, cap: int, base_building_params: dict, advanced_building_params: dict, price_params: dict, address_params: dict,
+                             geo_params: dict, search: Optional[str] = None) -> tuple[int, TotalCountKind]:
+        stmt = await self._filter_listings(stmt=select(Listing.id), base_building_params=base_building_params, price_params=price_params,
+                                           advanced_building_params=advanced_building_params, address_params=address_params, geo_params=geo_params)
+        stmt = QueryListingParamsService().search_params(stm=stmt, search=search)
+        if geo_params.get('sort'):
+            stmt = stmt.where(Listing.latitude.isnot(None))
+        elif search:
+            reachable = stmt.limit(self.SEARCH_CANDIDATES).subquery()
+            stmt = select(reachable.c.id)
+        count = (await self._session.execute(select(func.count()).select_from(stmt.limit(cap + 1).subquery()))).scalar_one()
+        if count <= cap:
+            return count, TotalCountKind.EXACT
+        estimate = planner_rows((await self._session.execute(Explain(stmt))).scalar_one())
+        if estimate > cap:
+            return estimate, TotalCountKind.ESTIMATE
+        return count, TotalCountKind.AT_LEAST
+
+    async def get_listing_clusters(self, cell_size: float, base_building_params: dict, advanced_building_params: dict, price_params: dict,
+                                   address_params: dict, geo_params: dict) -> list:
+        cell = bindparam('cell_size', cell_size, literal_execute=True)
+        grid_x, grid_y = func.floor(Listing.longitude / cell), func.floor(Listing.latitude / cell)
+        stmt = select(func.count().label('count'), func.avg(Listing.latitude).label('latitude'), func.avg(Listing.longitude).label('longitude'),
+                      func.min(Listing.price).label('min_price'), func.percentile_cont(0.5).within_group(Listing.price).label('median_price'))
+        stmt = await self._filter_listings(stmt=stmt.select_from(Listing), base_building_params=base_building_params, price_params=price_params,
+                                           advanced_building_params=advanced_building_params, address_params=address_params, geo_params=geo_params)
+        result = await self._session.execute(stmt.group_by(grid_x, grid_y).order_by(grid_y, grid_x))
+        return result.all()
+
+    async def get_listing_facets(self, base_building_params: dict, advanced_building_params: dict, price_params: dict, address_params: dict,
+                                 geo_params: dict, search: Optional[str] = None) -> list:
+        expressions = facet_expressions()
+        stmt = select(*expressions[:-1], expressions[-1].label('price_bucket'), func.grouping(*expressions).label('grouping'),
+                      func.count().label('count'))
+        filters = {'base_building_params': base_building_params, 'advanced_building_params': advanced_building_params,
+                   'price_params': price_params, 'address_params': address_params, 'geo_params': geo_params}
+        if search:
+            candidates = await self._search_candidates(search=search, filters=filters)
+            stmt = stmt.select_from(Listing).join(candidates, candidates.c.id == Listing.id)
+        else:
+            stmt = await self._filter_listings(stmt=stmt.select_from(Listing), **filters)
+        result = await self._session.execute(stmt.group_by(func.grouping_sets(*(tuple_(expression) for expression in expressions), tuple_())))
+        return result.all()
+
+    async def get_listings_in_polygon(self, polygon: np.ndarray, offset: int, limit: int, base_building_params: dict, advanced_building_params: dict,
+                                      price_params: dict, address_params: dict) -> list[Listing]:
+        min_lng, min_lat, max_lng, max_lat = polygon_bbox(polygon)
+        stmt = select(Listing.id, Listing.latitude, Listing.longitude).where(
+            Listing.latitude.between(min_lat, max_lat), Listing.longitude.between(min_lng, max_lng))
+        stmt = await self._filter_listings(stmt=stmt, base_building_params=base_building_params, price_params=price_params,
+                                           advanced_building_params=advanced_building_params, address_params=address_params, geo_params={})
+        candidates = (await self._session.execute(stmt.order_by(Listing.updated.desc(), Listing.id.desc()))).all()
+        if not candidates:
+            return []
+        ids, latitudes, longitudes = (np.array(column) for column in zip(*candidates))
+        page = ids[points_in_polygon(latitudes=latitudes, longitudes=longitudes, polygon=polygon)][offset:offset + limit].tolist()
+        if not page:
+            return []
+        result = await self._session.execute(select(Listing).where(Listing.id.in_(page)))
+        listings = {listing.id: listing for listing in result.scalars().all()}
+        return [listings[listing_id] for listing_id in page if listing_id in listings]
+
+    async def get_listing_version(self, listing_id: int) -> tuple[datetime, list[int], Optional[str]]:
         result = await self._session.execute(
-            stmt.filter_by(**base_building_params).order_by(Listing.updated.desc()).limit(limit).offset(offset))
-        return result.scalars().unique().all()
+            select(Listing.updated, func.array_remove(func.array_agg(Image.id), None), Listing.geocode_status)
+            .outerjoin(Image, Image.listing_id == Listing.id).where(Listing.id == listing_id).group_by(Listing.id))
+        if not (version := result.first()):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Listing not found')
+        return tuple(version)
 
     async def get_detail_listing(self, listing_id: int) -> Listing:
         return await self.get_single_listing(listing_id=listing_id)
 
-    async def delete_listing(self, listing_id: int, user: User, file_service: ImageServiceInterface):
+    @staticmethod
+    def _by_ids_stmt(stmt, listing_ids: list[int]):
+        return stmt.where(Listing.id == any_(bindparam('listing_ids', listing_ids, type_=ARRAY(Integer))))
+
+    async def get_listings_by_ids(self, listing_ids: list[int]) -> list[Listing]:
+        result = await self._session.execute(self._by_ids_stmt(select(Listing), listing_ids=listing_ids))
+        return result.scalars().all()
+
+    async def delete_listing(self, listing_id: int, user: Principal, file_service: ImageServiceInterface):
         listing = await self.get_single_listing(listing_id=listing_id)
         if listing.user_id != user.id:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='You cannot delete this listing')
@@ -75,21 +220,27 @@ class RepositoryListing(RepositoryInterface):
         await self._session.delete(listing)
         await self._session.commit()
 
-    async def add_to_favorites(self, listing_id: int, user: User) -> bool:
+    async def add_to_favorites(self, listing_id: int, user: Principal) -> bool:
         listing = await self.get_single_listing(listing_id=listing_id)
         _ = await self._session.execute(insert(Favorite).values(listing_id=listing.id, user_id=user.id, is_favorite=True))
         await self._session.commit()
         return True
 
-    async def remove_from_favorites(self, favorite_id: int, user: User):
+    async def remove_from_favorites(self, favorite_id: int, user: Principal) -> int:
         res = await self._session.execute(select(Favorite).where(Favorite.id == favorite_id, Favorite.user_id == user.id))
         if not (favorite := res.scalars().first()):
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Favorite not found')
         await self._session.delete(favorite)
         await self._session.commit()
+        return favorite.listing_id
+
+    def _favorites_stmt(self, stmt, offset: int, limit: int, user: Principal, cursor: Optional[tuple[datetime, int]]):
+        favorited = select(Favorite.id).where(Favorite.listing_id == Listing.id, Favorite.user_id == user.id, Favorite.is_favorite).exists()
+        stmt = stmt.where(favorited)
+        return self._paginate(stmt, offset=offset, limit=limit, cursor=cursor)
 
-    async def show_favorites_listings(self, offset: int, limit: int, user: User):
-        stmt = select(Listing).join(Favorite).where(Favorite.user_id == user.id, Favorite.is_favorite).offset(offset).limit(limit) \
-            .order_by(Listing.updated.desc())
+    async def show_favorites_listings(self, offset: int, limit: int, user: Principal, cursor: Optional[tuple[datetime, int]] = None,
+                                      fields: Optional[tuple[str, ...]] = None):
+        stmt = self._favorites_stmt(self._project(select(Listing), fields=fields), offset=offset, limit=limit, user=user, cursor=cursor)
         res = await self._session.execute(stmt)
-        return res.scalars().unique().all()
+        return res.scalars().all()
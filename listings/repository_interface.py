@@ -1,41 +1,72 @@
 from abc import ABC, abstractmethod
+from datetime import datetime
+import numpy as np
 from image_service.image_service_interface import ImageServiceInterface
 from .models import Listing
-from profile.models import User
+from .schemas import TotalCountKind
+from auth.principal import Principal
 from typing import Optional
 from fastapi import UploadFile
 
 
 class RepositoryInterface(ABC):
+    SEARCH_CANDIDATES = 1000
+
     @abstractmethod
     async def get_all_listings(self, offset: int, limit: int, base_building_params: dict, advanced_building_params: dict, price_params: dict,
-                               address_params: dict) -> list[Listing]: pass
+                               address_params: dict, cursor: Optional[tuple[datetime, int]] = None,
+                               geo_params: Optional[dict] = None, fields: Optional[tuple[str, ...]] = None,
+                               search: Optional[str] = None) -> list[Listing]: pass
+
+    @abstractmethod
+    async def count_listings(self, cap: int, base_building_params: dict, advanced_building_params: dict, price_params: dict, address_params: dict,
+                             geo_params: dict, search: Optional[str] = None) -> tuple[int, TotalCountKind]: pass
+
+    @abstractmethod
+    async def get_listing_clusters(self, cell_size: float, base_building_params: dict, advanced_building_params: dict, price_params: dict,
+                                   address_params: dict, geo_params: dict) -> list: pass
+
+    @abstractmethod
+    async def get_listing_facets(self, base_building_params: dict, advanced_building_params: dict, price_params: dict, address_params: dict,
+                                 geo_params: dict, search: Optional[str] = None) -> list: pass
+
+    @abstractmethod
+    async def get_listings_in_polygon(self, polygon: np.ndarray, offset: int, limit: int, base_building_params: dict, advanced_building_params: dict,
+                                      price_params: dict, address_params: dict) -> list[Listing]: pass
 
     @abstractmethod
     async def get_single_listing(self, listing_id: int) -> Listing: pass
 
+    @abstractmethod
+    async def get_listing_version(self, listing_id: int) -> tuple[datetime, list[int], Optional[str]]: pass
+
     @abstractmethod
     async def get_detail_listing(self, listing_id: int) -> Listing: pass
 
     @abstractmethod
-    async def get_user_listings(self, user_id: int, offset: int, limit: int): pass
+    async def get_listings_by_ids(self, listing_ids: list[int]) -> list[Listing]: pass
+
+    @abstractmethod
+    async def get_user_listings(self, user_id: int, offset: int, limit: int, cursor: Optional[tuple[datetime, int]] = None,
+                                fields: Optional[tuple[str, ...]] = None): pass
 
     @abstractmethod
-    async def add_listing(self, listing_data: dict, user: User, files: Optional[list[UploadFile]],
+    async def add_listing(self, listing_data: dict, user: Principal, files: Optional[list[UploadFile]],
                           file_service: ImageServiceInterface) -> Listing: pass
 
     @abstractmethod
-    async def update_listing(self, listing_id: int, updated_data: dict, user: User, files: Optional[list[UploadFile]],
+    async def update_listing(self, listing_id: int, updated_data: dict, user: Principal, files: Optional[list[UploadFile]],
                              file_service: ImageServiceInterface) -> tuple[bool, Optional[Listing]]: pass
 
     @abstractmethod
-    async def delete_listing(self, listing_id: int, user: User, file_service: ImageServiceInterface): pass
+    async def delete_listing(self, listing_id: int, user: Principal, file_service: ImageServiceInterface): pass
 
     @abstractmethod
-    async def add_to_favorites(self, listing_id: int, user: User) -> bool: pass
+    async def add_to_favorites(self, listing_id: int, user: Principal) -> bool: pass
 
     @abstractmethod
-    async def remove_from_favorites(self, favorite_id: int, user: User): pass
+    async def remove_from_favorites(self, favorite_id: int, user: Principal) -> int: pass
 
     @abstractmethod
-    async def show_favorites_listings(self, offset: int, limit: int, user: User): pass
+    async def show_favorites_listings(self, offset: int, limit: int, user: Principal, cursor: Optional[tuple[datetime, int]] = None,
+                                      fields: Optional[tuple[str, ...]] = None): pass
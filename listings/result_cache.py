@@ -0,0 +1,52 @@
+import hashlib
+from typing import Callable, Awaitable, Optional
+import orjson
+from fastapi.responses import ORJSONResponse, Response
+from utils.cache_backend_interface import CacheBackendInterface
+from utils.conditional import body_etag
+from .serializers import dumps_listings
+
+
+def render_body(body: bytes, headers: Optional[dict] = None) -> Response:
+    return Response(content=body, media_type=ORJSONResponse.media_type, headers={**(headers or {}), 'ETag': body_etag(body)})
+
+
+def render_listings(listings: list, headers: Optional[dict] = None, fields: Optional[tuple[str, ...]] = None) -> Response:
+    return render_body(body=dumps_listings(listings, fields=fields), headers=headers)
+
+
+def pack_response(response: Response) -> bytes:
+    headers = {key: value for key, value in response.headers.items() if key.lower().startswith('x-') or key.lower() == 'etag'}
+    return orjson.dumps(headers) + b'\n' + response.body
+
+
+def unpack_response(value: bytes) -> Response:
+    headers, body = value.split(b'\n', 1)
+    return Response(content=body, media_type=ORJSONResponse.media_type, headers=orjson.loads(headers))
+
+
+class ListingsResultCache:
+    NAMESPACE = 'listings'
+
+    def __init__(self, backend: CacheBackendInterface, ttl: float):
+        self._backend = backend
+        self._ttl = ttl
+
+    @staticmethod
+    def canonical_key(params: dict) -> str:
+        return hashlib.sha1(orjson.dumps(params, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)).hexdigest()
+
+    async def get_or_load(self, params: dict, load: Callable[[], Awaitable[bytes]]) -> bytes:
+        generation = await self._backend.get_generation(self.NAMESPACE)
+        key = f'{self.NAMESPACE}:{generation}:{self.canonical_key(params)}'
+        if (cached := await self._backend.get(key)) is not None:
+            return cached
+        packed = await load()
+        await self._backend.set(key, packed, ttl=self._ttl)
+        return packed
+
+    async def invalidate(self):
+        await self._backend.bump_generation(self.NAMESPACE)
+
+    def stats(self) -> dict:
+        return self._backend.stats()
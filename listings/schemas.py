@@ -1,7 +1,7 @@
 from datetime import datetime
-from fastapi import Form, Query
-from pydantic import BaseModel, Field
-from typing import Optional
+from fastapi import Form, Query, HTTPException, status
+from pydantic import BaseModel, Field, validator
+from typing import Optional, Union
 from enum import Enum
 
 
@@ -22,6 +22,19 @@ class HouseType(str, Enum):
     SECONDARY_HOUSING = 'SECONDARY_HOUSING'
 
 
+class GeocodeStatus(str, Enum):
+    PENDING = 'PENDING'
+    IN_PROGRESS = 'IN_PROGRESS'
+    DONE = 'DONE'
+    FAILED = 'FAILED'
+
+
+class TotalCountKind(str, Enum):
+    EXACT = 'exact'
+    ESTIMATE = 'estimate'
+    AT_LEAST = 'at_least'
+
+
 class ImageSchema(BaseModel):
     id: int
     photo: str
@@ -111,6 +124,7 @@ class ListingSchema(CreateListingSchema, BaseAddressSchema):
     longitude: Optional[float]
     latitude: Optional[float]
     full_address: Optional[str]
+    geocode_status: Optional[GeocodeStatus]
     created: datetime
     updated: datetime
     is_published: bool = True
@@ -156,3 +170,115 @@ class PriceQuerySchema(BaseModel):
     @classmethod
     def as_query(cls, min_price: Optional[float] = Query(None), max_price: Optional[float] = Query(None)):
         return cls(min_price=min_price, max_price=max_price)
+
+
+class GeoSort(str, Enum):
+    DISTANCE = 'distance'
+
+
+class GeoQuerySchema(BaseModel):
+    lat: Optional[float] = Field(None, ge=-90, le=90)
+    lng: Optional[float] = Field(None, ge=-180, le=180)
+    radius_km: Optional[float] = Field(None, gt=0, le=500)
+    bbox: Optional[tuple[float, float, float, float]]
+    sort: Optional[GeoSort]
+
+    @classmethod
+    def as_query(cls, lat: Optional[float] = Query(None, ge=-90, le=90), lng: Optional[float] = Query(None, ge=-180, le=180),
+                 radius_km: Optional[float] = Query(None, gt=0, le=500),
+                 bbox: Optional[str] = Query(None, description='min_lng,min_lat,max_lng,max_lat'), sort: Optional[GeoSort] = Query(None)):
+        return cls(lat=lat, lng=lng, radius_km=radius_km, bbox=parse_bbox(bbox), sort=sort)
+
+
+MAX_BATCH_IDS = 500
+
+
+class ListingIdsSchema(BaseModel):
+    ids: list[int] = Field(..., min_items=1, max_items=MAX_BATCH_IDS)
+
+    @classmethod
+    def as_query(cls, ids: str = Query(..., description='comma-separated listing ids')):
+        try:
+            return cls(ids=[int(listing_id) for listing_id in ids.split(',') if listing_id.strip()])
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Invalid ids')
+
+
+class ListingBatchSchema(BaseModel):
+    listings: list[ListingSchema]
+    missing: list[int]
+
+
+class ClusterSchema(BaseModel):
+    latitude: float
+    longitude: float
+    count: int
+    min_price: Optional[float]
+    median_price: Optional[float]
+
+    class Config:
+        orm_mode = True
+
+
+class FacetValueSchema(BaseModel):
+    value: Optional[Union[int, str]]
+    count: int
+
+
+class PriceBucketSchema(BaseModel):
+    min_price: float
+    max_price: Optional[float]
+    count: int
+
+
+class FacetsSchema(BaseModel):
+    total: int
+    category_type: list[FacetValueSchema]
+    number_of_rooms: list[FacetValueSchema]
+    house_type: list[FacetValueSchema]
+    wall_type: list[FacetValueSchema]
+    price: list[PriceBucketSchema]
+
+
+class PolygonSearchSchema(BaseModel):
+    polygon: list[tuple[float, float]] = Field(..., min_items=3, max_items=5000, description='[[lng, lat], ...]')
+
+    @validator('polygon')
+    def check_coordinates(cls, polygon):
+        if not all(-180 <= lng <= 180 and -90 <= lat <= 90 for lng, lat in polygon):
+            raise ValueError('coordinates out of range')
+        return polygon
+
+
+def parse_bbox(bbox: Optional[str]) -> Optional[tuple[float, float, float, float]]:
+    if not bbox:
+        return None
+    try:
+        min_lng, min_lat, max_lng, max_lat = (float(value) for value in bbox.split(','))
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Invalid bbox')
+    if not (-180 <= min_lng <= 180 and -180 <= max_lng <= 180 and -90 <= min_lat <= max_lat <= 90):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Invalid bbox')
+    return min_lng, min_lat, max_lng, max_lat
+
+
+class ListingFieldsSchema(ListingSchema):
+    cover_image: Optional[ImageSchema]
+
+
+LISTING_FIELDS = tuple(ListingSchema.__fields__)
+PROJECTABLE_FIELDS = tuple(ListingFieldsSchema.__fields__)
+FIELD_PRESETS = {
+    'card': ('id', 'title', 'price', 'city', 'number_of_rooms', 'cover_image'),
+    'full': LISTING_FIELDS,
+}
+
+
+def parse_fields(fields: Optional[str]) -> Optional[tuple[str, ...]]:
+    if not fields:
+        return None
+    requested = set(FIELD_PRESETS.get(fields) or (name.strip() for name in fields.split(',') if name.strip()))
+    if not requested or requested - set(PROJECTABLE_FIELDS):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Invalid fields')
+    projection = tuple(name for name in PROJECTABLE_FIELDS if name in requested)
+    return None if projection == LISTING_FIELDS else projection
@@ -0,0 +1,64 @@
+from datetime import datetime
+from enum import Enum
+from functools import lru_cache
+from typing import Any, Callable, Iterable, Optional
+import orjson
+from pydantic import BaseModel
+from pydantic.fields import SHAPE_LIST
+from .schemas import ListingSchema, ListingFieldsSchema
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def _enum_value(value: Any) -> Any:
+    return value.value if isinstance(value, Enum) else value
+
+
+def _optional(convert: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    return lambda value: None if value is None else convert(value)
+
+
+def _converter(field, encoders: dict) -> Callable[[Any], Any]:
+    type_ = field.type_
+    if isinstance(type_, type) and issubclass(type_, BaseModel):
+        nested = compile_serializer(type_)
+        if field.shape == SHAPE_LIST:
+            return lambda values: [nested(value) for value in values or ()]
+        return _optional(nested)
+    if type_ is datetime:
+        return _optional(encoders.get(datetime, datetime.isoformat))
+    if issubclass(type_, Enum):
+        return _enum_value
+    if issubclass(type_, bool):
+        return _optional(bool)
+    if issubclass(type_, float):
+        return _optional(float)
+    if issubclass(type_, int):
+        return _optional(int)
+    return _identity
+
+
+def compile_serializer(model: type[BaseModel], only: Optional[tuple[str, ...]] = None) -> Callable[[Any], dict]:
+    """Builds a function that turns trusted ORM rows straight into the dict `jsonable_encoder(model.from_orm(row))` would produce."""
+    encoders = model.__config__.json_encoders
+    fields = [(field.alias, name, _converter(field, encoders)) for name, field in model.__fields__.items() if only is None or name in only]
+    return lambda obj: {alias: convert(getattr(obj, name)) for alias, name, convert in fields}
+
+
+serialize_listing = compile_serializer(ListingSchema)
+
+
+@lru_cache(maxsize=64)
+def listing_serializer(fields: Optional[tuple[str, ...]] = None) -> Callable[[Any], dict]:
+    return serialize_listing if fields is None else compile_serializer(ListingFieldsSchema, only=fields)
+
+
+def dumps_listing(listing) -> bytes:
+    return orjson.dumps(serialize_listing(listing))
+
+
+def dumps_listings(listings: Iterable, fields: Optional[tuple[str, ...]] = None) -> bytes:
+    serialize = listing_serializer(fields)
+    return orjson.dumps([serialize(listing) for listing in listings])
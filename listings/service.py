@@ -1,70 +1,252 @@
-from profile.models import User
+from auth.principal import Principal
 from .repository_interface import RepositoryInterface
-from .schemas import CreateListingSchema, UpdateListingSchema, BaseAddressSchema, PriceQuerySchema, BuildingQuerySchema, BaseBuildingSchema
+from .schemas import CreateListingSchema, UpdateListingSchema, BaseAddressSchema, PriceQuerySchema, BuildingQuerySchema, BaseBuildingSchema, \
+    GeocodeStatus, GeoQuerySchema, PolygonSearchSchema, TotalCountKind, parse_fields
 
-from typing import Optional
+import numpy as np
+import orjson
+from typing import Awaitable, Callable, Hashable, Optional
 from fastapi import UploadFile, status, HTTPException
 from fastapi.responses import JSONResponse, Response
 from image_service.image_service_interface import ImageServiceInterface
 from utils.create_slug import create_slug
 from .utils import GeoInterface
+from .pagination import decode_cursor, split_page, HAS_MORE_HEADER, SEARCH_WINDOW_HEADER, TOTAL_COUNT_HEADER, TOTAL_COUNT_KIND_HEADER
+from .clusters import cell_size
+from .facets import facet_counts
+from .result_cache import ListingsResultCache, render_body, render_listings, pack_response, unpack_response
+from .detail_cache import ListingDetailCache, listing_etag, render_listing, render_batch
+from utils.conditional import etag_matches, http_date, not_modified
+from utils.single_flight import SingleFlight
 
 
 class ListingsService:
-    def __init__(self, repository: RepositoryInterface):
+    def __init__(self, repository: RepositoryInterface, defer_geocoding: bool = False, result_cache: Optional[ListingsResultCache] = None,
+                 detail_cache: Optional[ListingDetailCache] = None, single_flight: Optional[SingleFlight] = None, exact_count_limit: int = 1000):
         self._repository = repository
+        self._defer_geocoding = defer_geocoding
+        self._result_cache = result_cache
+        self._detail_cache = detail_cache
+        self._single_flight = single_flight
+        self._exact_count_limit = exact_count_limit
+
+    async def _coalesce(self, key: Hashable, func: Callable[[], Awaitable]):
+        if self._single_flight:
+            return await self._single_flight.do(key, func)
+        return await func()
+
+    async def _invalidate_results(self):
+        if self._result_cache:
+            await self._result_cache.invalidate()
+
+    async def _invalidate_detail(self, listing_id: int):
+        if self._detail_cache:
+            await self._detail_cache.invalidate(listing_id)
+
+    @staticmethod
+    def _render_page(listings: list, limit: int, fields: Optional[tuple[str, ...]] = None) -> Response:
+        page, headers = split_page(listings=listings, limit=limit)
+        return render_listings(listings=page, headers=headers, fields=fields)
 
     async def get_all_listings(self, limit: int, offset: int, base_building_params: BaseBuildingSchema, advanced_building_params: BuildingQuerySchema,
-                               price_params: PriceQuerySchema, address_params: BaseAddressSchema):
+                               price_params: PriceQuerySchema, address_params: BaseAddressSchema, cursor: Optional[str] = None,
+                               geo_params: Optional[GeoQuerySchema] = None, if_none_match: Optional[str] = None, fields: Optional[str] = None,
+                               search: Optional[str] = None, total: bool = False):
+        projection = parse_fields(fields)
+        search = search.strip() if search else None
+        if search and cursor:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Cursor cannot be combined with text search')
         advanced_building_data = advanced_building_params.dict(exclude_none=True)
         base_building_data = base_building_params.dict(exclude_none=True)
         price_data = price_params.dict(exclude_none=True)
         address_data = address_params.dict(exclude_none=True)
-        return await self._repository.get_all_listings(limit=limit, offset=offset, base_building_params=base_building_data,
-                                                       advanced_building_params=advanced_building_data, address_params=address_data,
-                                                       price_params=price_data)
+        geo_data = self._validate_geo_params(geo_params=geo_params, cursor=cursor)
+        window = self._repository.SEARCH_CANDIDATES if search and not geo_data.get('sort') else None
+        if window and offset + limit > window:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f'Text search pages cannot go past the first {window} results')
+
+        async def load():
+            return await self._repository.get_all_listings(limit=limit + 1, offset=offset, base_building_params=base_building_data,
+                                                           advanced_building_params=advanced_building_data, address_params=address_data,
+                                                           price_params=price_data, cursor=decode_cursor(cursor), geo_params=geo_data,
+                                                           fields=projection, search=search)
+
+        async def render() -> bytes:
+            page, headers = split_page(listings=await load(), limit=limit, with_cursor=not (geo_data.get('sort') or search))
+            if window:
+                headers[SEARCH_WINDOW_HEADER] = str(window)
+            if total:
+                if headers[HAS_MORE_HEADER] == 'false' and (page or not offset) and not (cursor or search):
+                    count, kind = offset + len(page), TotalCountKind.EXACT
+                else:
+                    count, kind = await self._repository.count_listings(cap=self._exact_count_limit, base_building_params=base_building_data,
+                                                                        advanced_building_params=advanced_building_data, price_params=price_data,
+                                                                        address_params=address_data, geo_params=geo_data, search=search)
+                headers.update({TOTAL_COUNT_HEADER: str(count), TOTAL_COUNT_KIND_HEADER: kind.value})
+            return pack_response(render_listings(listings=page, headers=headers, fields=projection))
+
+        params = {'limit': limit, 'offset': offset, 'cursor': cursor, 'base_building': base_building_data,
+                  'advanced_building': advanced_building_data, 'price': price_data, 'address': address_data, 'geo': geo_data,
+                  'fields': projection, 'search': search, 'total': total}
+        return await self._cached_response(kind='listings', params=params, render=render, if_none_match=if_none_match)
+
+    async def _cached_response(self, kind: str, params: dict, render: Callable[[], Awaitable[bytes]], if_none_match: Optional[str]) -> Response:
+        async def fetch() -> bytes:
+            if self._result_cache:
+                return await self._result_cache.get_or_load(params=params, load=render)
+            return await render()
+
+        response = unpack_response(await self._coalesce(key=(kind, ListingsResultCache.canonical_key(params)), func=fetch))
+        if etag_matches(if_none_match=if_none_match, etag=response.headers['ETag']):
+            return not_modified(headers={'ETag': response.headers['ETag']})
+        return response
 
-    async def get_user_listings(self, user_id: int, limit: int, offset: int):
-        return await self._repository.get_user_listings(user_id=user_id, limit=limit, offset=offset)
+    async def get_listing_facets(self, base_building_params: BaseBuildingSchema, advanced_building_params: BuildingQuerySchema,
+                                 price_params: PriceQuerySchema, address_params: BaseAddressSchema, geo_params: Optional[GeoQuerySchema] = None,
+                                 search: Optional[str] = None, if_none_match: Optional[str] = None):
+        search = search.strip() if search else None
+        geo_data = self._validate_geo_params(geo_params=geo_params, cursor=None)
+        geo_data.pop('sort', None)
+        filters = {'base_building_params': base_building_params.dict(exclude_none=True), 'price_params': price_params.dict(exclude_none=True),
+                   'advanced_building_params': advanced_building_params.dict(exclude_none=True),
+                   'address_params': address_params.dict(exclude_none=True), 'geo_params': geo_data}
 
-    async def detail_listing(self, listing_id: int):
-        return await self._repository.get_detail_listing(listing_id=listing_id)
+        async def render() -> bytes:
+            rows = await self._repository.get_listing_facets(search=search, **filters)
+            return pack_response(render_body(body=orjson.dumps(facet_counts(rows))))
+
+        return await self._cached_response(kind='facets', params={'kind': 'facets', 'search': search, **filters}, render=render,
+                                           if_none_match=if_none_match)
 
     @staticmethod
-    async def _listing_address_update(listing: dict, address: BaseAddressSchema, geo: GeoInterface):
+    def _validate_geo_params(geo_params: Optional[GeoQuerySchema], cursor: Optional[str]) -> dict:
+        geo_data = geo_params.dict(exclude_none=True) if geo_params else {}
+        has_point = 'lat' in geo_data and 'lng' in geo_data
+        if ('lat' in geo_data) != ('lng' in geo_data) or ('radius_km' in geo_data and not has_point):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='lat and lng are required together')
+        if geo_data.get('sort') and not has_point:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Sorting by distance requires lat and lng')
+        if geo_data.get('sort') and cursor:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Cursor cannot be combined with sorting by distance')
+        return geo_data
+
+    async def get_listing_clusters(self, zoom: int, base_building_params: BaseBuildingSchema, advanced_building_params: BuildingQuerySchema,
+                                   price_params: PriceQuerySchema, address_params: BaseAddressSchema, geo_params: GeoQuerySchema):
+        geo_data = self._validate_geo_params(geo_params=geo_params, cursor=None)
+        if not geo_data.get('bbox'):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='bbox is required')
+        geo_data.pop('sort', None)
+        return await self._repository.get_listing_clusters(cell_size=cell_size(zoom=zoom, bbox=geo_data['bbox']), geo_params=geo_data,
+                                                           base_building_params=base_building_params.dict(exclude_none=True),
+                                                           advanced_building_params=advanced_building_params.dict(exclude_none=True),
+                                                           price_params=price_params.dict(exclude_none=True),
+                                                           address_params=address_params.dict(exclude_none=True))
+
+    async def search_in_polygon(self, search: PolygonSearchSchema, limit: int, offset: int, base_building_params: BaseBuildingSchema,
+                                advanced_building_params: BuildingQuerySchema, price_params: PriceQuerySchema, address_params: BaseAddressSchema):
+        listings = await self._repository.get_listings_in_polygon(polygon=np.array(search.polygon, dtype=np.float64), offset=offset, limit=limit + 1,
+                                                                  base_building_params=base_building_params.dict(exclude_none=True),
+                                                                  advanced_building_params=advanced_building_params.dict(exclude_none=True),
+                                                                  price_params=price_params.dict(exclude_none=True),
+                                                                  address_params=address_params.dict(exclude_none=True))
+        page, headers = split_page(listings=listings, limit=limit, with_cursor=False)
+        return render_listings(listings=page, headers=headers)
+
+    async def get_user_listings(self, user_id: int, limit: int, offset: int, cursor: Optional[str] = None, fields: Optional[str] = None):
+        projection = parse_fields(fields)
+        listings = await self._repository.get_user_listings(user_id=user_id, limit=limit + 1, offset=offset, cursor=decode_cursor(cursor),
+                                                            fields=projection)
+        return self._render_page(listings=listings, limit=limit, fields=projection)
+
+    async def _load_detail(self, listing_id: int):
+        async def load():
+            return await self._repository.get_detail_listing(listing_id=listing_id)
+
+        if self._detail_cache:
+            return await self._detail_cache.load(listing_id=listing_id, load=load)
+        return render_listing(await load())
+
+    async def detail_listing(self, listing_id: int, if_none_match: Optional[str] = None):
+        rendered = await self._detail_cache.get(listing_id=listing_id) if self._detail_cache else None
+        if rendered is None and if_none_match:
+            updated, image_ids, geocode_status = await self._coalesce(key=('listing_version', listing_id),
+                                                                      func=lambda: self._repository.get_listing_version(listing_id=listing_id))
+            etag = listing_etag(listing_id=listing_id, updated=updated, image_ids=image_ids, geocode_status=geocode_status)
+            if etag_matches(if_none_match=if_none_match, etag=etag):
+                return not_modified(headers={'ETag': etag, 'Last-Modified': http_date(updated)})
+        if rendered is None:
+            rendered = await self._coalesce(key=('listing', listing_id), func=lambda: self._load_detail(listing_id=listing_id))
+        if etag_matches(if_none_match=if_none_match, etag=rendered.etag):
+            return not_modified(headers=rendered.headers)
+        return rendered.response()
+
+    async def get_listings_batch(self, listing_ids: list[int], if_none_match: Optional[str] = None):
+        listing_ids = list(dict.fromkeys(listing_ids))
+        rendered = await self._detail_cache.get_many(listing_ids=listing_ids) if self._detail_cache else {}
+        if missing := [listing_id for listing_id in listing_ids if listing_id not in rendered]:
+            async def load():
+                return await self._repository.get_listings_by_ids(listing_ids=missing)
+
+            if self._detail_cache:
+                rendered.update(await self._detail_cache.load_many(listing_ids=missing, load=load))
+            else:
+                rendered.update({listing.id: render_listing(listing) for listing in await load()})
+        response = render_batch(listing_ids=listing_ids, rendered=rendered)
+        if etag_matches(if_none_match=if_none_match, etag=response.headers['ETag']):
+            return not_modified(headers={'ETag': response.headers['ETag']})
+        return response
+
+    async def _listing_address_update(self, listing: dict, address: BaseAddressSchema, geo: GeoInterface):
         if listing.get('title'):
             slug = create_slug(text=listing.get('title'))
             listing.update({'slug': slug})
-        lat, lng, full_address = await geo.get_longitude_and_latitude(**address.dict(exclude={'region', 'district'}))
-        listing.update({'latitude': lat, 'longitude': lng, 'full_address': full_address, **address.dict(exclude_none=True)})
+        if address.dict(exclude={'region', 'district'}, exclude_none=True):
+            if self._defer_geocoding:
+                listing.update({'latitude': None, 'longitude': None, 'full_address': None, 'geocode_status': GeocodeStatus.PENDING.value})
+            else:
+                lat, lng, full_address = await geo.get_longitude_and_latitude(**address.dict(exclude={'region', 'district'}))
+                listing.update({'latitude': lat, 'longitude': lng, 'full_address': full_address, 'geocode_status': GeocodeStatus.DONE.value})
+        listing.update(address.dict(exclude_none=True))
 
-    async def add_listing(self, listing: CreateListingSchema, address: BaseAddressSchema, user: User, files: Optional[list[UploadFile]],
+    async def add_listing(self, listing: CreateListingSchema, address: BaseAddressSchema, user: Principal, files: Optional[list[UploadFile]],
                           file_service: ImageServiceInterface, geo: GeoInterface):
         listing_data_ = listing.dict()
         await self._listing_address_update(listing=listing_data_, address=address, geo=geo)
-        return await self._repository.add_listing(listing_data=listing_data_, user=user, files=files, file_service=file_service)
+        new_listing = await self._repository.add_listing(listing_data=listing_data_, user=user, files=files, file_service=file_service)
+        await self._invalidate_detail(listing_id=new_listing.id)
+        await self._invalidate_results()
+        return new_listing
 
-    async def update_listing(self, listing_id: int, listing: UpdateListingSchema, address: BaseAddressSchema, user: User,
+    async def update_listing(self, listing_id: int, listing: UpdateListingSchema, address: BaseAddressSchema, user: Principal,
                              files: Optional[list[UploadFile]], file_service: ImageServiceInterface, geo: GeoInterface):
         listing_data_ = listing.dict(exclude_none=True)
         await self._listing_address_update(listing=listing_data_, address=address, geo=geo)
         result, listing = await self._repository.update_listing(listing_id=listing_id, updated_data=listing_data_, user=user, files=files,
                                                                 file_service=file_service)
+        await self._invalidate_detail(listing_id=listing_id)
         if not result:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='You cannot update this listing')
+        await self._invalidate_results()
         return listing
 
-    async def delete_listing(self, listing_id: int, user: User, file_service: ImageServiceInterface):
+    async def delete_listing(self, listing_id: int, user: Principal, file_service: ImageServiceInterface):
         await self._repository.delete_listing(listing_id=listing_id, user=user, file_service=file_service)
+        await self._invalidate_detail(listing_id=listing_id)
+        await self._invalidate_results()
         return Response(status_code=status.HTTP_204_NO_CONTENT)
 
-    async def add_to_favorites(self, listing_id: int, user: User):
+    async def add_to_favorites(self, listing_id: int, user: Principal):
         _: bool = await self._repository.add_to_favorites(listing_id=listing_id, user=user)
+        await self._invalidate_detail(listing_id=listing_id)
         return JSONResponse(content='added to favorites', status_code=status.HTTP_201_CREATED)
 
-    async def remove_from_favorites(self, favorite_id: int, user: User):
-        await self._repository.remove_from_favorites(favorite_id=favorite_id, user=user)
+    async def remove_from_favorites(self, favorite_id: int, user: Principal):
+        listing_id = await self._repository.remove_from_favorites(favorite_id=favorite_id, user=user)
+        await self._invalidate_detail(listing_id=listing_id)
         return Response(status_code=status.HTTP_204_NO_CONTENT)
 
-    async def show_favorites_listings(self, offset: int, limit: int, user: User):
-        return await self._repository.show_favorites_listings(offset=offset, limit=limit, user=user)
+    async def show_favorites_listings(self, offset: int, limit: int, user: Principal, cursor: Optional[str] = None, fields: Optional[str] = None):
+        projection = parse_fields(fields)
+        listings = await self._repository.show_favorites_listings(offset=offset, limit=limit + 1, user=user, cursor=decode_cursor(cursor),
+                                                                  fields=projection)
+        return self._render_page(listings=listings, limit=limit, fields=projection)
@@ -0,0 +1,19 @@
+import asyncio
+from typing import Optional
+from ..utils import GeoInterface
+
+
+class FakeGeo(GeoInterface):
+    def __init__(self, delay: float = 0):
+        self._delay = delay
+        self.calls = 0
+
+    async def get_longitude_and_latitude(self, country: str, city: str, street: str, house_number: Optional[str] = None):
+        self.calls += 1
+        await asyncio.sleep(self._delay)
+        address = ', '.join(str(part) for part in (house_number, street, city, country) if part)
+        return 40.706173050000004, -74.00851619618786, address
+
+    async def get_address_from_latitude_longitude(self, latitude: float, longitude: float):
+        self.calls += 1
+        return f'{latitude}, {longitude}'
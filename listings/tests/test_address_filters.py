@@ -0,0 +1,54 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select, text
+from sqlalchemy.dialects import postgresql
+from conftest import async_test_session, save_listings
+from ..models import Listing
+from ..query_filter_service import QueryListingParamsService
+
+ADDRESSES = {
+    'addr manhattan': ('USA', 'New York', 'Wall Street', 'Manhattan'),
+    'addr brooklyn': ('USA', 'NEW YORK', 'Atlantic Avenue', 'Brooklyn'),
+    'addr newark': ('USA', 'Newark', 'Broad Street', None),
+    'addr york': ('UK', 'York', 'Stonegate', None),
+}
+
+
+class TestAddressFilters:
+    @pytest.fixture(scope='class')
+    async def listings(self, first_user) -> dict[str, int]:
+        return await save_listings([Listing(title=title, price=1000, user_id=first_user['id'], country=country, city=city, street=street,
+                                            district=district) for title, (country, city, street, district) in ADDRESSES.items()])
+
+    @pytest.mark.parametrize('query, expected_titles', [
+        ('city=new york', {'addr manhattan', 'addr brooklyn'}),
+        ('city=New York&district=BROOKLYN', {'addr brooklyn'}),
+        ('city=new%25', {'addr manhattan', 'addr brooklyn', 'addr newark'}),
+        ('city=%25york', {'addr manhattan', 'addr brooklyn', 'addr york'}),
+        ('country=uk&city=york', {'addr york'}),
+        ('street=%25street', {'addr manhattan', 'addr newark'}),
+        ('city=york%25', {'addr york'}),
+    ])
+    @pytest.mark.asyncio
+    async def test_case_insensitive_filters(self, client_without_jwt: AsyncClient, listings, query: str, expected_titles: set[str]):
+        response = await client_without_jwt.get(f'/listings/?{query}')
+        assert response.status_code == 200
+        assert {listing['title'] for listing in response.json() if listing['title'].startswith('addr ')} == expected_titles
+
+    @pytest.mark.parametrize('address_params, index', [
+        ({'city': 'New York'}, 'ix_listings_lower_city'),
+        ({'city': 'new%'}, 'ix_listings_lower_city'),
+        ({'street': 'Wall Street'}, 'ix_listings_lower_street'),
+        ({'country': 'USA'}, 'ix_listings_lower_country'),
+        ({'region': 'ny'}, 'ix_listings_lower_region'),
+        ({'district': 'Brook%'}, 'ix_listings_lower_district'),
+        ({'house_number': '12A'}, 'ix_listings_lower_house_number'),
+    ])
+    @pytest.mark.asyncio
+    async def test_filters_use_lower_indexes(self, listings, address_params: dict, index: str):
+        stmt = await QueryListingParamsService().common_address_params(stm=select(Listing.id), address_params=address_params)
+        sql = str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={'literal_binds': True}))
+        async with async_test_session() as session:
+            await session.execute(text('SET LOCAL enable_seqscan = off'))
+            plan = '\n'.join((await session.execute(text(f'EXPLAIN {sql}'))).scalars())
+        assert index in plan
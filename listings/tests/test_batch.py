@@ -0,0 +1,70 @@
+import pytest
+from httpx import AsyncClient
+from conftest import save_listings
+from main import app
+from ..models import Listing, Image
+from ..schemas import MAX_BATCH_IDS
+
+MISSING_ID = 10 ** 6
+
+
+class TestListingsBatch:
+    @pytest.fixture(scope='class')
+    async def listing_ids(self, first_user) -> list[int]:
+        listings = [Listing(title=f'batch {i}', price=1000 + i, user_id=first_user['id'],
+                            images=[Image(photo=f'batch-{i}-{j}.jpg') for j in range(i)]) for i in range(6)]
+        return list((await save_listings(listings)).values())
+
+    @pytest.fixture(autouse=True)
+    def empty_detail_cache(self):
+        app.state.container.listing_detail_cache.clear()
+
+    @pytest.mark.asyncio
+    async def test_preserves_order_and_reports_missing(self, client_without_jwt: AsyncClient, listing_ids: list[int], read_path: str):
+        ids = [listing_ids[3], MISSING_ID, listing_ids[0], listing_ids[3], listing_ids[5]]
+        response = await client_without_jwt.get(f'/listings/batch?ids={",".join(map(str, ids))}')
+        assert response.status_code == 200
+        assert [listing['id'] for listing in response.json()['listings']] == [listing_ids[3], listing_ids[0], listing_ids[5]]
+        assert [len(listing['images']) for listing in response.json()['listings']] == [3, 0, 5]
+        assert response.json()['missing'] == [MISSING_ID]
+
+    @pytest.mark.asyncio
+    async def test_matches_detail_responses(self, client_without_jwt: AsyncClient, listing_ids: list[int]):
+        response = await client_without_jwt.post('/listings/batch', json={'ids': listing_ids})
+        details = [(await client_without_jwt.get(f'/listings/{listing_id}')).json() for listing_id in listing_ids]
+        assert response.json() == {'listings': details, 'missing': []}
+
+    @pytest.mark.parametrize('count', [1, 6])
+    @pytest.mark.asyncio
+    async def test_constant_number_of_queries(self, client_without_jwt: AsyncClient, listing_ids: list[int], query_counter, count: int):
+        response = await client_without_jwt.post('/listings/batch', json={'ids': listing_ids[:count] + [MISSING_ID]})
+        assert len(response.json()['listings']) == count
+        assert len(query_counter) == 2
+
+    @pytest.mark.asyncio
+    async def test_served_from_detail_cache(self, client_without_jwt: AsyncClient, listing_ids: list[int], query_counter):
+        await client_without_jwt.get(f'/listings/{listing_ids[1]}')
+        await client_without_jwt.get(f'/listings/{MISSING_ID}')
+        statements = len(query_counter)
+        response = await client_without_jwt.get(f'/listings/batch?ids={listing_ids[1]},{MISSING_ID}')
+        assert len(query_counter) == statements
+        assert response.json()['missing'] == [MISSING_ID]
+        cached = await client_without_jwt.get(f'/listings/batch?ids={listing_ids[2]},{listing_ids[1]}')
+        assert len(query_counter) == statements + 2
+        await client_without_jwt.get(f'/listings/batch?ids={listing_ids[2]},{listing_ids[1]}')
+        assert len(query_counter) == statements + 2
+        not_modified = await client_without_jwt.get(f'/listings/batch?ids={listing_ids[2]},{listing_ids[1]}',
+                                                     headers={'If-None-Match': cached.headers['ETag']})
+        assert not_modified.status_code == 304
+
+    @pytest.mark.parametrize('method, kwargs, status_code', [
+        ('get', {'url': '/listings/batch?ids=1,abc'}, 400),
+        ('get', {'url': '/listings/batch?ids='}, 400),
+        ('get', {'url': f'/listings/batch?ids={",".join(map(str, range(1, MAX_BATCH_IDS + 2)))}'}, 400),
+        ('post', {'url': '/listings/batch', 'json': {'ids': []}}, 422),
+        ('post', {'url': '/listings/batch', 'json': {'ids': list(range(1, MAX_BATCH_IDS + 2))}}, 422),
+    ])
+    @pytest.mark.asyncio
+    async def test_invalid_ids(self, client_without_jwt: AsyncClient, method: str, kwargs: dict, status_code: int):
+        response = await getattr(client_without_jwt, method)(**kwargs)
+        assert response.status_code == status_code
@@ -3,7 +3,10 @@ import aiofiles
 import pytest
 from httpx import AsyncClient
 from collections import namedtuple
+from sqlalchemy import delete
+from conftest import async_test_session
 from settings import get_settings, LISTINGS_IMAGES_DIR
+from ..models import Favorite
 
 
 class TestListingsControllers:
@@ -114,6 +117,36 @@ class TestListingsControllers:
         assert response.status_code == 200
         assert len(response.json()) == 3
 
+    @pytest.mark.asyncio
+    async def test_get_listings_with_cursor(self, client_without_jwt: AsyncClient):
+        first_page = await client_without_jwt.get('/listings/?limit=2')
+        assert [listing['id'] for listing in first_page.json()] == [3, 2]
+        cursor = first_page.headers['X-Next-Cursor']
+        second_page = await client_without_jwt.get(f'/listings/?limit=2&cursor={cursor}')
+        assert second_page.status_code == 200
+        assert [listing['id'] for listing in second_page.json()] == [1]
+        assert 'X-Next-Cursor' not in second_page.headers
+
+    @pytest.mark.asyncio
+    async def test_get_user_listings_with_cursor(self, client_without_jwt: AsyncClient):
+        first_page = await client_without_jwt.get('/listings/user/1?limit=1')
+        cursor = first_page.headers['X-Next-Cursor']
+        second_page = await client_without_jwt.get(f'/listings/user/1?limit=1&cursor={cursor}')
+        assert [listing['id'] for listing in second_page.json()] == [2]
+
+    @pytest.mark.asyncio
+    async def test_get_listings_with_invalid_cursor(self, client_without_jwt: AsyncClient):
+        response = await client_without_jwt.get('/listings/?cursor=not-a-cursor')
+        assert response.status_code == 400
+        assert response.json()['detail'] == 'Invalid cursor'
+
+    @pytest.mark.parametrize('url', ['/listings/?limit=0', '/listings/?limit=0&q=flat', '/listings/?offset=-1', '/listings/?limit=101',
+                                     '/listings/user/1?limit=0', '/listings/favorites?limit=0', '/listings/favorites?offset=-1'])
+    @pytest.mark.asyncio
+    async def test_get_listings_with_invalid_page(self, first_user_client_with_jwt: AsyncClient, url: str):
+        response = await first_user_client_with_jwt.get(url)
+        assert response.status_code == 422
+
     @pytest.mark.parametrize('house_type, country, min_price, max_price, count_of_listings', [
         ('SECONDARY_HOUSING', 'italy', 5000.0, 8000.0, 1),
         ('NEW_BUILDING', '', 0.0, 5000.0, 2),
@@ -155,6 +188,15 @@ class TestListingsControllers:
         assert response.json()[key] == value
         assert response.status_code == status_code
 
+    @pytest.mark.asyncio
+    async def test_update_listing_without_address_skips_geocoding(self, first_user_client_with_jwt: AsyncClient, fake_geo):
+        calls = fake_geo.calls
+        response = await first_user_client_with_jwt.put(url='/listings/2', data={'price': 3500})
+        assert response.status_code == 200
+        assert response.json()['price'] == 3500
+        assert response.json()['city'] == self.london_listing.city
+        assert fake_geo.calls == calls
+
     @pytest.mark.asyncio
     async def test_add_to_favorites(self, first_user_client_with_jwt: AsyncClient):
         response = await first_user_client_with_jwt.post(url='/listings/favorites/1')
@@ -168,6 +210,17 @@ class TestListingsControllers:
         assert len(response.json()) == 1
         assert response.json()[0].get('id') == 1
 
+    @pytest.mark.parametrize('url', ['/listings/', '/listings/user/1', '/listings/1'])
+    @pytest.mark.asyncio
+    async def test_listings_load_images_without_joins(self, client_without_jwt: AsyncClient, query_counter, url: str):
+        response = await client_without_jwt.get(url)
+        assert response.status_code == 200
+        assert len(query_counter) == 2
+        listings_stmt, images_stmt = query_counter.statements
+        assert 'JOIN' not in listings_stmt
+        assert 'FROM images' in images_stmt and 'IN' in images_stmt
+        assert not any('favorites' in stmt for stmt in query_counter.statements)
+
     @pytest.mark.parametrize('id_, status_code', [(1, 204), (100, 404)])
     @pytest.mark.asyncio
     async def test_remove_from_favorites_or_not_found(self, first_user_client_with_jwt, id_: int, status_code: int):
@@ -180,6 +233,16 @@ class TestListingsControllers:
         assert response.status_code == 200
         assert response.json() == []
 
+    @pytest.mark.asyncio
+    async def test_listing_favorited_twice_is_listed_once(self, first_user_client_with_jwt: AsyncClient):
+        for _ in range(2):
+            await first_user_client_with_jwt.post(url='/listings/favorites/2')
+        response = await first_user_client_with_jwt.get(url='/listings/favorites')
+        assert [listing['id'] for listing in response.json()] == [2]
+        async with async_test_session() as session:
+            await session.execute(delete(Favorite).where(Favorite.listing_id == 2))
+            await session.commit()
+
     @pytest.mark.parametrize('listing_id, status_code', [(1, 204), (4, 404)])
     @pytest.mark.asyncio
     async def test_delete_listing_or_not_found(self, first_user_client_with_jwt: AsyncClient, listing_id: int, status_code: int):
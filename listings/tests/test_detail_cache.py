@@ -0,0 +1,77 @@
+import pytest
+from fastapi import HTTPException
+from httpx import AsyncClient
+from main import app
+from conftest import async_test_session, LISTING_DATA
+from utils.cache_backends import MemoryCacheBackend
+from ..detail_cache import ListingDetailCache
+from ..repositories import RepositoryListing
+
+
+class TestListingDetailCache:
+    @pytest.fixture
+    def detail_cache(self) -> ListingDetailCache:
+        return app.state.container.listing_detail_cache
+
+    @pytest.mark.asyncio
+    async def test_cached_detail_skips_database(self, client_without_jwt: AsyncClient, listing_id: int, detail_cache: ListingDetailCache,
+                                                query_counter, monkeypatch):
+        miss = await client_without_jwt.get(f'/listings/{listing_id}')
+        statements, hits = len(query_counter), detail_cache.stats()['hits']
+        hit = await client_without_jwt.get(f'/listings/{listing_id}')
+        assert len(query_counter) == statements
+        assert detail_cache.stats()['hits'] == hits + 1
+        assert detail_cache.stats()['bytes'] >= len(hit.content)
+        monkeypatch.setattr(app.state.container, 'listing_detail_cache', None)
+        uncached = await client_without_jwt.get(f'/listings/{listing_id}')
+        assert miss.content == hit.content == uncached.content
+
+    @pytest.mark.asyncio
+    async def test_missing_listing_is_negatively_cached(self, client_without_jwt: AsyncClient, query_counter):
+        assert (await client_without_jwt.get('/listings/9999')).status_code == 404
+        statements = len(query_counter)
+        response = await client_without_jwt.get('/listings/9999')
+        assert response.status_code == 404
+        assert response.json() == {'detail': 'Listing not found'}
+        assert len(query_counter) == statements
+
+    @pytest.mark.asyncio
+    async def test_update_invalidates_detail(self, first_user_client_with_jwt: AsyncClient, listing_id: int):
+        await first_user_client_with_jwt.get(f'/listings/{listing_id}')
+        await first_user_client_with_jwt.put(f'/listings/{listing_id}', data={'title': 'renamed listing'})
+        assert (await first_user_client_with_jwt.get(f'/listings/{listing_id}')).json()['title'] == 'renamed listing'
+
+    @pytest.mark.asyncio
+    async def test_invalidation_reaches_caches_sharing_a_backend(self, listing_id: int):
+        backend = MemoryCacheBackend(maxsize=10, maxbytes=1024, ttl=60)
+        reader, writer = (ListingDetailCache(maxsize=10, maxbytes=64 * 1024, ttl=60, negative_ttl=60, backend=backend) for _ in range(2))
+        async with async_test_session() as session:
+            await reader.load(listing_id=listing_id, load=lambda: RepositoryListing(session).get_detail_listing(listing_id=listing_id))
+        assert await reader.get(listing_id=listing_id) is not None
+        await writer.invalidate(listing_id)
+        assert await reader.get(listing_id=listing_id) is None
+
+    @pytest.mark.asyncio
+    async def test_created_listing_replaces_negative_entry(self, first_user_client_with_jwt: AsyncClient, listing_id: int):
+        assert (await first_user_client_with_jwt.get(f'/listings/{listing_id + 1}')).status_code == 404
+        created = (await first_user_client_with_jwt.post('/listings/', data=LISTING_DATA)).json()
+        assert created['id'] == listing_id + 1
+        assert (await first_user_client_with_jwt.get(f'/listings/{listing_id + 1}')).status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_delete_invalidates_detail(self, first_user_client_with_jwt: AsyncClient, listing_id: int):
+        await first_user_client_with_jwt.get(f'/listings/{listing_id}')
+        await first_user_client_with_jwt.delete(f'/listings/{listing_id}')
+        assert (await first_user_client_with_jwt.get(f'/listings/{listing_id}')).status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_invalidation_during_load_is_not_cached(self):
+        cache = ListingDetailCache(maxsize=10, maxbytes=1024, ttl=60, negative_ttl=60)
+
+        async def load():
+            await cache.invalidate(1)
+            raise HTTPException(status_code=404)
+
+        with pytest.raises(HTTPException):
+            await cache.load(listing_id=1, load=load)
+        assert await cache.get(listing_id=1) is None
@@ -0,0 +1,52 @@
+import pytest
+from httpx import AsyncClient
+from main import app
+
+
+class TestListingEtags:
+    @pytest.mark.parametrize('detail_cache', [True, False])
+    @pytest.mark.asyncio
+    async def test_detail_not_modified(self, client_without_jwt: AsyncClient, listing_id: int, detail_cache: bool, monkeypatch):
+        if not detail_cache:
+            monkeypatch.setattr(app.state.container, 'listing_detail_cache', None)
+        response = await client_without_jwt.get(f'/listings/{listing_id}')
+        etag = response.headers['ETag']
+        assert not etag.startswith('W/')
+        assert response.headers['Last-Modified'].endswith('GMT')
+        not_modified = await client_without_jwt.get(f'/listings/{listing_id}', headers={'If-None-Match': etag})
+        assert not_modified.status_code == 304
+        assert not_modified.content == b''
+        assert not_modified.headers['ETag'] == etag
+        assert (await client_without_jwt.get(f'/listings/{listing_id}', headers={'If-None-Match': '"stale"'})).status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_not_modified_uses_version_lookup(self, client_without_jwt: AsyncClient, listing_id: int, query_counter, monkeypatch):
+        etag = (await client_without_jwt.get(f'/listings/{listing_id}')).headers['ETag']
+        monkeypatch.setattr(app.state.container, 'listing_detail_cache', None)
+        response = await client_without_jwt.get(f'/listings/{listing_id}', headers={'If-None-Match': etag})
+        assert response.status_code == 304
+        assert len(query_counter.statements) == 1
+        assert 'array_agg' in query_counter.statements[0]
+
+    @pytest.mark.asyncio
+    async def test_update_changes_etag(self, first_user_client_with_jwt: AsyncClient, listing_id: int):
+        etag = (await first_user_client_with_jwt.get(f'/listings/{listing_id}')).headers['ETag']
+        await first_user_client_with_jwt.put(f'/listings/{listing_id}', data={'title': 'changed etag listing'})
+        response = await first_user_client_with_jwt.get(f'/listings/{listing_id}', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+
+    @pytest.mark.asyncio
+    async def test_missing_listing_with_if_none_match(self, client_without_jwt: AsyncClient):
+        assert (await client_without_jwt.get('/listings/9999', headers={'If-None-Match': '"a"'})).status_code == 404
+
+    @pytest.mark.parametrize('result_cache', [True, False])
+    @pytest.mark.asyncio
+    async def test_search_page_weak_etag(self, client_without_jwt: AsyncClient, listing_id: int, result_cache: bool, monkeypatch):
+        if not result_cache:
+            monkeypatch.setattr(app.state.container, 'listings_cache', None)
+        response = await client_without_jwt.get('/listings/?country=usa')
+        etag = response.headers['ETag']
+        assert etag.startswith('W/"')
+        assert (await client_without_jwt.get('/listings/?country=usa', headers={'If-None-Match': etag})).status_code == 304
+        assert (await client_without_jwt.get('/listings/?country=gb', headers={'If-None-Match': etag})).status_code == 200
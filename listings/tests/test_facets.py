@@ -0,0 +1,96 @@
+from collections import Counter
+import pytest
+from httpx import AsyncClient
+from conftest import save_listings
+from ..models import Listing
+from ..facets import facet_counts, grouping_masks
+from ..repositories import RepositoryListing
+
+CITY = 'facetville'
+LISTINGS = [
+    ('SELL', 1, 'NEW_BUILDING', 'BRICK', 40000),
+    ('SELL', 2, 'NEW_BUILDING', 'PANEL', 150000),
+    ('SELL', 2, 'SECONDARY_HOUSING', 'BRICK', 150000),
+    ('RENT', 3, 'SECONDARY_HOUSING', 'WOOD', 1500),
+    ('RENT', 2, 'NEW_BUILDING', 'PANEL', 2500000),
+]
+
+
+class TestFacetCounts:
+    def test_rows_are_mapped_by_grouping_mask(self):
+        masks = {name: mask for mask, name in grouping_masks().items()}
+        rows = [
+            {'grouping': masks['total'], 'count': 3},
+            {'grouping': masks['category_type'], 'category_type': 'SELL', 'count': 2},
+            {'grouping': masks['category_type'], 'category_type': 'RENT', 'count': 1},
+            {'grouping': masks['wall_type'], 'wall_type': None, 'count': 3},
+            {'grouping': masks['price'], 'price_bucket': 6, 'count': 1},
+            {'grouping': masks['price'], 'price_bucket': 1, 'count': 1},
+            {'grouping': masks['price'], 'price_bucket': None, 'count': 1},
+        ]
+        facets = facet_counts([type('Row', (), {'category_type': None, 'price_bucket': None, **row}) for row in rows])
+        assert facets == {'total': 3, 'category_type': [{'value': 'RENT', 'count': 1}, {'value': 'SELL', 'count': 2}],
+                          'number_of_rooms': [], 'house_type': [], 'wall_type': [{'value': None, 'count': 3}],
+                          'price': [{'min_price': 0, 'max_price': 50000, 'count': 1}, {'min_price': 1000000, 'max_price': None, 'count': 1}]}
+
+
+class TestListingFacets:
+    @pytest.fixture(scope='class')
+    async def listings(self, first_user) -> list[int]:
+        listings = [Listing(title=f'facet {i}', city=CITY, category_type=category, number_of_rooms=rooms, house_type=house, wall_type=wall,
+                            price=price, user_id=first_user['id']) for i, (category, rooms, house, wall, price) in enumerate(LISTINGS)]
+        return list((await save_listings(listings)).values())
+
+    @pytest.mark.asyncio
+    async def test_counts_in_single_query(self, client_without_jwt: AsyncClient, listings, query_counter):
+        response = await client_without_jwt.get(f'/listings/facets?city={CITY}')
+        assert response.status_code == 200
+        assert response.json() == {
+            'total': 5,
+            'category_type': [{'value': 'RENT', 'count': 2}, {'value': 'SELL', 'count': 3}],
+            'number_of_rooms': [{'value': 1, 'count': 1}, {'value': 2, 'count': 3}, {'value': 3, 'count': 1}],
+            'house_type': [{'value': 'NEW_BUILDING', 'count': 3}, {'value': 'SECONDARY_HOUSING', 'count': 2}],
+            'wall_type': [{'value': 'BRICK', 'count': 2}, {'value': 'PANEL', 'count': 2}, {'value': 'WOOD', 'count': 1}],
+            'price': [{'min_price': 0, 'max_price': 50000, 'count': 2}, {'min_price': 100000, 'max_price': 200000, 'count': 2},
+                      {'min_price': 1000000, 'max_price': None, 'count': 1}],
+        }
+        assert len(query_counter) == 1
+        assert 'GROUPING SETS' in query_counter.statements[0]
+
+    @pytest.mark.parametrize('query, total, rooms', [
+        ('category_type=SELL', 3, [{'value': 1, 'count': 1}, {'value': 2, 'count': 2}]),
+        ('category_type=RENT&min_price=2000', 1, [{'value': 2, 'count': 1}]),
+        ('number_of_rooms=2&max_price=200000', 2, [{'value': 2, 'count': 2}]),
+        ('category_type=DAILY_RENT', 0, []),
+    ])
+    @pytest.mark.asyncio
+    async def test_filters_narrow_counts(self, client_without_jwt: AsyncClient, listings, query: str, total: int, rooms: list[dict]):
+        response = await client_without_jwt.get(f'/listings/facets?city={CITY}&{query}')
+        assert response.json()['total'] == total
+        assert response.json()['number_of_rooms'] == rooms
+
+    @pytest.mark.asyncio
+    async def test_search_counts_only_the_candidate_window(self, client_without_jwt: AsyncClient, listings, monkeypatch):
+        monkeypatch.setattr(RepositoryListing, 'SEARCH_CANDIDATES', 2)
+        page = await client_without_jwt.get(f'/listings/?city={CITY}&q=facet&total=true&limit=2&fields=id,category_type')
+        facets = (await client_without_jwt.get(f'/listings/facets?city={CITY}&q=facet')).json()
+        assert facets['total'] == int(page.headers['X-Total-Count']) == 2
+        assert facets['category_type'] == [{'value': value, 'count': count}
+                                           for value, count in sorted(Counter(listing['category_type'] for listing in page.json()).items())]
+
+    @pytest.mark.asyncio
+    async def test_cached_until_listing_write(self, first_user_client_with_jwt: AsyncClient, listings, query_counter):
+        url = f'/listings/facets?city={CITY}&number_of_rooms=1'
+        cached = await first_user_client_with_jwt.get(url)
+        statements = len(query_counter)
+        assert (await first_user_client_with_jwt.get(url)).json() == cached.json()
+        not_modified = await first_user_client_with_jwt.get(url, headers={'If-None-Match': cached.headers['ETag']})
+        assert not_modified.status_code == 304
+        assert len(query_counter) == statements
+        await first_user_client_with_jwt.put(f'/listings/{listings[0]}', data={'number_of_rooms': 4})
+        assert (await first_user_client_with_jwt.get(url)).json()['total'] == cached.json()['total'] - 1
+
+    @pytest.mark.asyncio
+    async def test_invalid_geo_params(self, client_without_jwt: AsyncClient):
+        response = await client_without_jwt.get('/listings/facets?lat=1')
+        assert response.status_code == 400
@@ -0,0 +1,20 @@
+import pytest
+from httpx import AsyncClient
+from settings import get_settings
+from . import test_controllers
+
+FAST_ROUTES = {'get_listings', 'detail_listing', 'show_favorites_listings'}
+
+
+class TestFastReadListingsControllers(test_controllers.TestListingsControllers):
+    @pytest.fixture(autouse=True)
+    def fast_read_routes(self, monkeypatch):
+        monkeypatch.setattr(get_settings(), 'listings_fast_read_routes', FAST_ROUTES)
+
+    @pytest.mark.parametrize('url, orm_statements', [('/listings/', 0), ('/listings/user/1', 2), ('/listings/2', 0)])
+    @pytest.mark.asyncio
+    async def test_listings_load_images_without_joins(self, client_without_jwt: AsyncClient, query_counter, url: str, orm_statements: int):
+        response = await client_without_jwt.get(url)
+        assert response.status_code == 200
+        assert len(response.json()) > 0
+        assert len(query_counter) == orm_statements
@@ -0,0 +1,78 @@
+import pytest
+from fastapi import HTTPException
+from httpx import AsyncClient
+from conftest import save_listings
+from ..models import Listing, Image
+from ..schemas import parse_fields, FIELD_PRESETS, LISTING_FIELDS, PROJECTABLE_FIELDS
+
+CITY = 'fieldsville'
+
+
+class TestParseFields:
+    @pytest.mark.parametrize('fields, expected', [
+        (None, None),
+        ('', None),
+        ('full', None),
+        (','.join(LISTING_FIELDS), None),
+        ('card', tuple(name for name in PROJECTABLE_FIELDS if name in FIELD_PRESETS['card'])),
+        ('price,title', ('price', 'title')),
+        (' title , id,title', ('title', 'id')),
+        ('id,title', ('title', 'id')),
+    ])
+    def test_parse_fields(self, fields, expected):
+        assert parse_fields(fields) == expected
+
+    @pytest.mark.parametrize('fields', ['password', 'title,user', ',', 'cards'])
+    def test_invalid_fields(self, fields):
+        with pytest.raises(HTTPException) as error:
+            parse_fields(fields)
+        assert error.value.status_code == 400
+
+
+class TestSparseFieldsets:
+    @pytest.fixture(scope='class')
+    async def listings(self, first_user) -> list[int]:
+        listings = [Listing(title=f'fields {i}', price=1000 + i, city=CITY, number_of_rooms=2, description='long description',
+                            full_address='1 Main Street, Fieldsville', user_id=first_user['id'],
+                            images=[Image(photo=f'fields-{i}-{j}.jpg') for j in range(2)]) for i in range(3)]
+        return list((await save_listings(listings)).values())
+
+    @pytest.mark.asyncio
+    async def test_card_preset(self, client_without_jwt: AsyncClient, listings, read_path: str):
+        response = await client_without_jwt.get(f'/listings/?city={CITY}&fields=card')
+        assert response.status_code == 200
+        assert [set(listing) for listing in response.json()] == [set(FIELD_PRESETS['card'])] * 3
+        assert [listing['cover_image']['photo'] for listing in response.json()] == [f'fields-{i}-0.jpg' for i in (2, 1, 0)]
+
+    @pytest.mark.asyncio
+    async def test_cover_image_without_images(self, client_without_jwt: AsyncClient, first_user, listings, read_path: str):
+        response = await client_without_jwt.get(f'/listings/user/{first_user["id"]}?fields=id,cover_image,images')
+        assert all(listing['cover_image'] == (listing['images'][0] if listing['images'] else None) for listing in response.json())
+
+    @pytest.mark.asyncio
+    async def test_projection_narrows_select_and_skips_images(self, client_without_jwt: AsyncClient, listings, query_counter):
+        response = await client_without_jwt.get(f'/listings/?city={CITY}&fields=title,price&limit=2')
+        assert [listing for listing in response.json()] == [{'title': 'fields 2', 'price': 1002.0}, {'title': 'fields 1', 'price': 1001.0}]
+        assert 'X-Next-Cursor' in response.headers
+        assert len(query_counter) == 1
+        assert 'description' not in query_counter.statements[0] and 'images' not in query_counter.statements[0]
+
+    @pytest.mark.asyncio
+    async def test_projection_is_part_of_cache_key(self, client_without_jwt: AsyncClient, listings):
+        card = await client_without_jwt.get(f'/listings/?city={CITY}&fields=card')
+        full = await client_without_jwt.get(f'/listings/?city={CITY}')
+        assert card.headers['ETag'] != full.headers['ETag']
+        assert 'description' not in card.json()[0]
+        assert full.json()[0]['description'] == 'long description'
+
+    @pytest.mark.asyncio
+    async def test_user_listings_fields(self, client_without_jwt: AsyncClient, first_user, listings):
+        response = await client_without_jwt.get(f'/listings/user/{first_user["id"]}?fields=id,city')
+        assert response.status_code == 200
+        assert {listing['id'] for listing in response.json()} >= set(listings)
+        assert all(set(listing) == {'id', 'city'} for listing in response.json())
+
+    @pytest.mark.asyncio
+    async def test_invalid_fields(self, client_without_jwt: AsyncClient):
+        response = await client_without_jwt.get('/listings/?fields=title,secret')
+        assert response.status_code == 400
@@ -0,0 +1,116 @@
+import math
+import pytest
+from httpx import AsyncClient
+from conftest import save_listings
+from ..models import Listing
+from ..clusters import cell_size, grid_cells, MAX_CLUSTER_CELLS
+from ..query_filter_service import QueryListingParamsService
+
+PLACES = {
+    'wall street': (40.70617, -74.00851),
+    'times square': (40.75800, -73.98551),
+    'brooklyn': (40.67818, -73.94416),
+    'newark': (40.73566, -74.17237),
+    'philadelphia': (39.95258, -75.16522),
+    'fiji east': (-17.0, 179.9),
+    'fiji west': (-17.0, -179.9),
+}
+
+
+class TestGeoSearch:
+    @pytest.fixture(scope='class')
+    async def listings(self, first_user) -> dict[str, int]:
+        return await save_listings([Listing(title=title, price=1000, user_id=first_user['id'], latitude=lat, longitude=lng)
+                                    for title, (lat, lng) in PLACES.items()])
+
+    @pytest.mark.parametrize('query, expected_titles', [
+        ('lat=40.70617&lng=-74.00851&radius_km=10', {'wall street', 'times square', 'brooklyn'}),
+        ('lat=40.70617&lng=-74.00851&radius_km=20', {'wall street', 'times square', 'brooklyn', 'newark'}),
+        ('lat=40.70617&lng=-74.00851&radius_km=0.5', {'wall street'}),
+        ('bbox=-74.05,40.6,-73.9,40.8', {'wall street', 'times square', 'brooklyn'}),
+        ('bbox=-75.5,39.0,-74.1,41.0', {'newark', 'philadelphia'}),
+        ('bbox=179.0,-18.0,-179.0,-16.0', {'fiji east', 'fiji west'}),
+        ('lat=-17.0&lng=179.95&radius_km=20', {'fiji east', 'fiji west'}),
+    ])
+    @pytest.mark.asyncio
+    async def test_filter_by_radius_and_bbox(self, client_without_jwt: AsyncClient, listings, query: str, expected_titles: set[str]):
+        response = await client_without_jwt.get(f'/listings/?{query}')
+        assert response.status_code == 200
+        assert {listing['title'] for listing in response.json()} == expected_titles
+
+    @pytest.mark.asyncio
+    async def test_sort_by_distance(self, client_without_jwt: AsyncClient, listings):
+        url = '/listings/?lat=40.70617&lng=-74.00851&radius_km=150&sort=distance&limit=3'
+        first_page = await client_without_jwt.get(url)
+        second_page = await client_without_jwt.get(f'{url}&offset=3')
+        assert [listing['title'] for listing in first_page.json()] == ['wall street', 'times square', 'brooklyn']
+        assert [listing['title'] for listing in second_page.json()] == ['newark', 'philadelphia']
+        assert 'X-Next-Cursor' not in first_page.headers
+
+    @pytest.mark.parametrize('query', [
+        'lat=40.7&radius_km=10', 'radius_km=10', 'sort=distance', 'lat=40.7&lng=-74.0&sort=distance&cursor=abc', 'bbox=1,2,3', 'bbox=0,50,1,40',
+    ])
+    @pytest.mark.asyncio
+    async def test_invalid_geo_params(self, client_without_jwt: AsyncClient, query: str):
+        response = await client_without_jwt.get(f'/listings/?{query}')
+        assert response.status_code == 400
+
+    @pytest.mark.parametrize('lat, lng, radius_km', [(40.7, -74.0, 10), (89.95, 0.0, 20), (0.0, 179.95, 50)])
+    def test_radius_bbox_contains_circle(self, lat: float, lng: float, radius_km: float):
+        min_lng, min_lat, max_lng, max_lat = QueryListingParamsService.radius_bbox(lat=lat, lng=lng, radius_km=radius_km)
+        assert min_lat < lat < max_lat
+        assert (min_lng <= lng <= max_lng) if min_lng <= max_lng else (lng >= min_lng or lng <= max_lng)
+
+    @pytest.mark.asyncio
+    async def test_clusters_merge_nearby_listings(self, client_without_jwt: AsyncClient, listings):
+        response = await client_without_jwt.get('/listings/clusters?bbox=-80,35,-70,45&zoom=4')
+        assert response.status_code == 200
+        assert response.json() == [{'latitude': pytest.approx(40.56612), 'longitude': pytest.approx(-74.255154), 'count': 5,
+                                    'min_price': 1000.0, 'median_price': 1000.0}]
+
+    @pytest.mark.parametrize('query, expected_count, max_clusters', [
+        ('bbox=-74.05,40.6,-73.9,40.8&zoom=14', 3, 3),
+        ('bbox=-180,-90,180,90&zoom=22', 7, 7),
+        ('bbox=-74.05,40.6,-73.9,40.8&zoom=14&min_price=2000', 0, 0),
+    ])
+    @pytest.mark.asyncio
+    async def test_clusters(self, client_without_jwt: AsyncClient, listings, query: str, expected_count: int, max_clusters: int):
+        response = await client_without_jwt.get(f'/listings/clusters?{query}')
+        assert response.status_code == 200
+        assert sum(cluster['count'] for cluster in response.json()) == expected_count
+        assert len(response.json()) <= max_clusters
+
+    @pytest.mark.parametrize('query, status_code', [('zoom=4', 400), ('bbox=-80,35,-70,45', 422), ('bbox=-80,35,-70,45&zoom=30', 422)])
+    @pytest.mark.asyncio
+    async def test_clusters_invalid_params(self, client_without_jwt: AsyncClient, query: str, status_code: int):
+        response = await client_without_jwt.get(f'/listings/clusters?{query}')
+        assert response.status_code == status_code
+
+    @pytest.mark.parametrize('zoom, bbox', [(0, (-180, -90, 180, 90)), (22, (-180, -90, 180, 90)), (12, (179.0, -18.0, -179.0, -16.0)),
+                                            (16, (-74.0013, 40.7005, -73.9001, 40.7999)), (22, (-0.0001, -0.0001, 0.0001, 0.0001))])
+    def test_cell_size_bounds_aligned_grid(self, zoom: int, bbox):
+        size = cell_size(zoom=zoom, bbox=bbox)
+        min_lng, min_lat, max_lng, max_lat = bbox
+        span = lambda low, high: math.floor(high / size) - math.floor(low / size) + 1
+        cols = span(min_lng, max_lng) if min_lng <= max_lng else span(min_lng, 180) + span(-180, max_lng)
+        assert cols * span(min_lat, max_lat) <= grid_cells(size=size, bbox=bbox) <= MAX_CLUSTER_CELLS
+
+    MANHATTAN = [[-74.02, 40.70], [-73.97, 40.70], [-73.97, 40.77], [-74.02, 40.77]]
+
+    @pytest.mark.parametrize('query, polygon, expected_titles', [
+        ('', MANHATTAN, ['times square', 'wall street']),
+        ('limit=1&offset=1', MANHATTAN, ['wall street']),
+        ('min_price=2000', MANHATTAN, []),
+        ('', [[-75.5, 39.5], [-75.5, 41], [-74.1, 41], [-74.1, 40.5], [-74.9, 40.2], [-74.1, 39.5]], ['philadelphia', 'newark']),
+    ])
+    @pytest.mark.asyncio
+    async def test_search_in_polygon(self, client_without_jwt: AsyncClient, listings, query: str, polygon, expected_titles):
+        response = await client_without_jwt.post(f'/listings/search/polygon?{query}', json={'polygon': polygon})
+        assert response.status_code == 200
+        assert [listing['title'] for listing in response.json()] == expected_titles
+
+    @pytest.mark.parametrize('polygon', [[[0, 0], [1, 1]], [[0, 0], [1, 1], [200, 0]]])
+    @pytest.mark.asyncio
+    async def test_search_in_invalid_polygon(self, client_without_jwt: AsyncClient, polygon):
+        response = await client_without_jwt.post('/listings/search/polygon', json={'polygon': polygon})
+        assert response.status_code == 422
@@ -0,0 +1,59 @@
+import asyncio
+import pytest
+from conftest import get_test_db
+from ..geocode_cache import CachedGeo, GeocodeCache, GeocodeCacheRepository, normalize_address
+from ..repositories import RepositoryListing
+from .fake_geo import FakeGeo
+
+
+class TestCachedGeo:
+    ADDRESS = {'country': 'USA', 'city': 'New York', 'street': 'Wall Street', 'house_number': '60'}
+
+    @pytest.fixture
+    async def repository(self, db_session):
+        async for session in get_test_db():
+            yield GeocodeCacheRepository(session=session)
+
+    @pytest.mark.parametrize('country, city, street, house_number, expected_value', [
+        ('USA', ' New  York ', 'Wall Street', '60', 'usa|new york|wall street|60'),
+        ('usa', 'new york', 'WALL STREET', None, 'usa|new york|wall street|'),
+    ])
+    def test_normalize_address(self, country, city, street, house_number, expected_value):
+        assert normalize_address(country=country, city=city, street=street, house_number=house_number) == expected_value
+
+    @pytest.mark.asyncio
+    async def test_memory_and_table_hits_skip_upstream(self, repository: GeocodeCacheRepository):
+        geo = FakeGeo()
+        point = await CachedGeo(geo=geo, cache=GeocodeCache(maxsize=10, ttl=60), repository=repository).get_longitude_and_latitude(**self.ADDRESS)
+        cache = GeocodeCache(maxsize=10, ttl=60)
+        cached_geo = CachedGeo(geo=geo, cache=cache, repository=repository)
+        assert await cached_geo.get_longitude_and_latitude(**{**self.ADDRESS, 'city': 'NEW YORK'}) == point
+        assert await cached_geo.get_longitude_and_latitude(**self.ADDRESS) == point
+        assert geo.calls == 1
+        assert cache.memory.hits == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_lookups_share_one_upstream_call(self, repository: GeocodeCacheRepository):
+        geo = FakeGeo(delay=0.05)
+        cache = GeocodeCache(maxsize=10, ttl=60)
+        cached_geo = CachedGeo(geo=geo, cache=cache, repository=repository)
+        address = {**self.ADDRESS, 'house_number': '61'}
+        points = await asyncio.gather(*(cached_geo.get_longitude_and_latitude(**address) for _ in range(5)))
+        assert len(set(points)) == 1
+        assert geo.calls == 1
+        assert cache.single_flight.coalesced == 4
+
+    @pytest.mark.asyncio
+    async def test_request_cache_writes_use_own_session(self, first_user_client_with_jwt, monkeypatch):
+        sessions = {'cache': [], 'listings': []}
+        for name, cls in (('cache', GeocodeCacheRepository), ('listings', RepositoryListing)):
+            def init(self, session, _name=name, _init=cls.__init__):
+                sessions[_name].append(session)
+                _init(self, session=session)
+
+            monkeypatch.setattr(cls, '__init__', init)
+        data = {'title': 'geocoded listing', 'price': 1000, 'country': 'usa', 'city': 'geocache city', 'street': 'own session street'}
+        response = await first_user_client_with_jwt.post('/listings/', data=data)
+        assert response.status_code == 201
+        assert sessions['cache'] and sessions['listings']
+        assert not {id(session) for session in sessions['cache']} & {id(session) for session in sessions['listings']}
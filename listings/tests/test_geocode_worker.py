@@ -0,0 +1,128 @@
+import time
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import select, text, update
+from conftest import async_test_session
+from ..geocode_cache import GeocodeCache
+from ..geocode_worker import GeocodeWorker, RateLimiter
+from ..models import Listing
+from ..schemas import GeocodeStatus
+from .fake_geo import FakeGeo
+
+
+class FailingGeo(FakeGeo):
+    async def get_longitude_and_latitude(self, country: str, city: str, street: str, house_number=None):
+        self.calls += 1
+        raise ValueError('no results')
+
+
+class TestGeocodeWorker:
+    @pytest.fixture
+    async def pending_listings(self, db_session, request):
+        async with async_test_session() as session:
+            listings = [Listing(title=f'listing {i}', country='USA', city='New York', street=request.node.name, house_number=str(i),
+                                geocode_status=GeocodeStatus.PENDING.value) for i in range(3)]
+            session.add_all(listings)
+            await session.commit()
+            yield [listing.id for listing in listings]
+
+    @staticmethod
+    def make_worker(geo: FakeGeo, batch_size: int = 10) -> GeocodeWorker:
+        return GeocodeWorker(session_factory=async_test_session, geo=geo, cache=GeocodeCache(maxsize=10, ttl=60), requests_per_second=1000,
+                             batch_size=batch_size, poll_interval=0.01)
+
+    @staticmethod
+    async def fetch(ids: list[int]) -> list:
+        async with async_test_session() as session:
+            result = await session.execute(select(Listing).where(Listing.id.in_(ids)).order_by(Listing.id))
+            return result.scalars().all()
+
+    @pytest.mark.asyncio
+    async def test_pending_listings_are_geocoded_in_batches(self, pending_listings: list[int]):
+        before = await self.fetch(pending_listings)
+        geo = FakeGeo()
+        worker = self.make_worker(geo=geo, batch_size=2)
+        assert await worker.run_once() == 2
+        assert await worker.run_until_empty() == 1
+        after = await self.fetch(pending_listings)
+        assert geo.calls == 3
+        assert all(listing.geocode_status == GeocodeStatus.DONE.value and listing.latitude is not None for listing in after)
+        assert [listing.updated for listing in after] == [listing.updated for listing in before]
+
+    @pytest.mark.asyncio
+    async def test_failed_geocoding_is_marked(self, pending_listings: list[int]):
+        assert await self.make_worker(geo=FailingGeo()).run_until_empty() == 3
+        after = await self.fetch(pending_listings)
+        assert all(listing.geocode_status == GeocodeStatus.FAILED.value and listing.latitude is None for listing in after)
+
+
+class EditingGeo(FakeGeo):
+    def __init__(self, listing_id: int):
+        super().__init__()
+        self.listing_id = listing_id
+
+    async def get_longitude_and_latitude(self, country: str, city: str, street: str, house_number=None):
+        async with async_test_session() as session:
+            await session.execute(text("SET LOCAL lock_timeout = '1s'"))
+            await session.execute(update(Listing).where(Listing.id == self.listing_id)
+                                  .values(street='Broadway', latitude=None, geocode_status=GeocodeStatus.PENDING.value))
+            await session.commit()
+        return await super().get_longitude_and_latitude(country=country, city=city, street=street, house_number=house_number)
+
+
+class TestGeocodeWorkerClaims:
+    @pytest.fixture
+    async def listing_id(self, db_session, request) -> int:
+        async with async_test_session() as session:
+            listing = Listing(title='claimed listing', country='USA', city='New York', street=request.node.name,
+                              geocode_status=GeocodeStatus.PENDING.value)
+            session.add(listing)
+            await session.commit()
+            return listing.id
+
+    @staticmethod
+    def make_worker(geo: FakeGeo, committed: list) -> GeocodeWorker:
+        async def on_commit(listing_ids: list[int]):
+            committed.extend(listing_ids)
+
+        return GeocodeWorker(session_factory=async_test_session, geo=geo, cache=GeocodeCache(maxsize=10, ttl=60), requests_per_second=1000,
+                             batch_size=10, poll_interval=0.01, claim_timeout=60, on_commit=on_commit)
+
+    @pytest.mark.asyncio
+    async def test_owner_edit_during_geocoding_is_not_blocked_or_overwritten(self, listing_id: int):
+        committed = []
+        assert await self.make_worker(geo=EditingGeo(listing_id=listing_id), committed=committed).run_once() == 1
+        listing = (await TestGeocodeWorker.fetch([listing_id]))[0]
+        assert (listing.street, listing.geocode_status, listing.latitude) == ('Broadway', GeocodeStatus.PENDING.value, None)
+        assert committed == []
+
+    @pytest.mark.parametrize('claimed_seconds_ago, reclaimed', [(10, False), (120, True)])
+    @pytest.mark.asyncio
+    async def test_expired_claims_are_retried(self, listing_id: int, claimed_seconds_ago: int, reclaimed: bool):
+        async with async_test_session() as session:
+            await session.execute(update(Listing).where(Listing.id == listing_id).values(
+                geocode_status=GeocodeStatus.IN_PROGRESS.value, geocode_claimed_at=datetime.now() - timedelta(seconds=claimed_seconds_ago)))
+            await session.commit()
+        committed = []
+        await self.make_worker(geo=FakeGeo(), committed=committed).run_until_empty()
+        listing = (await TestGeocodeWorker.fetch([listing_id]))[0]
+        assert (listing.geocode_status == GeocodeStatus.DONE.value) == reclaimed
+        assert (listing_id in committed) == reclaimed
+
+    @pytest.mark.asyncio
+    async def test_single_leader_per_database(self, db_session):
+        first, second = self.make_worker(geo=FakeGeo(), committed=[]), self.make_worker(geo=FakeGeo(), committed=[])
+        async with first.leadership() as first_leader, second.leadership() as second_leader:
+            assert (first_leader, second_leader) == (True, False)
+        async with second.leadership() as second_leader:
+            assert second_leader
+
+
+class TestRateLimiter:
+    @pytest.mark.asyncio
+    async def test_acquire_spaces_out_calls(self):
+        limiter = RateLimiter(requests_per_second=50)
+        start = time.monotonic()
+        for _ in range(5):
+            await limiter.acquire()
+        assert time.monotonic() - start >= 4 / 50 * 0.9
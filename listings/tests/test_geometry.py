@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+from ..geometry import points_in_polygon, polygon_bbox
+
+SQUARE = np.array([(0, 0), (10, 0), (10, 10), (0, 10)], dtype=np.float64)
+U_SHAPE = np.array([(0, 0), (9, 0), (9, 9), (6, 9), (6, 3), (3, 3), (3, 9), (0, 9)], dtype=np.float64)
+
+
+class TestGeometry:
+    @pytest.mark.parametrize('polygon, points, expected_value', [
+        (SQUARE, [(5, 5), (-1, 5), (5, 11), (9.99, 0.01)], [True, False, False, True]),
+        (U_SHAPE, [(1.5, 6), (4.5, 6), (7.5, 6), (4.5, 1.5), (10, 1)], [True, False, True, True, False]),
+    ])
+    def test_points_in_polygon(self, polygon: np.ndarray, points, expected_value):
+        lngs, lats = np.array(points, dtype=np.float64).T
+        assert points_in_polygon(latitudes=lats, longitudes=lngs, polygon=polygon).tolist() == expected_value
+
+    def test_points_in_circle_approximation(self):
+        angles = np.linspace(0, 2 * np.pi, 720, endpoint=False)
+        circle = np.column_stack((np.cos(angles), np.sin(angles)))
+        rng = np.random.default_rng(0)
+        lngs, lats = rng.uniform(-1.2, 1.2, size=(2, 10_000))
+        radius = np.hypot(lngs, lats)
+        mask = points_in_polygon(latitudes=lats, longitudes=lngs, polygon=circle)
+        assert mask[radius < 0.999].all()
+        assert not mask[radius > 1].any()
+
+    def test_polygon_bbox(self):
+        assert polygon_bbox(U_SHAPE) == (0.0, 0.0, 9.0, 9.0)
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+from fastapi import HTTPException
+from ..offline_geo import Gazetteer, OfflineGeo, build_gazetteer
+from .fake_geo import FakeGeo
+
+PLACES = [
+    (5128581, 'New York City', 40.71427, -74.00597, 'US', 'NY'),
+    (4140963, 'Washington', 38.89511, -77.03637, 'US', 'DC'),
+    (2643743, 'London', 51.50853, -0.12574, 'GB', 'ENG'),
+    (2147714, 'Sydney', -33.86785, 151.20732, 'AU', '02'),
+    (5856195, 'Honolulu', 21.30694, -157.85833, 'US', 'HI'),
+]
+
+
+class TestOfflineGeo:
+    @pytest.fixture(scope='class')
+    def gazetteer_dir(self, tmp_path_factory):
+        directory = tmp_path_factory.mktemp('gazetteer')
+        tsv = directory / 'cities.txt'
+        rows = [[str(geoname_id), name, name, '', str(lat), str(lng), 'P', 'PPL', country, '', admin1, '', '', '', '0', '', '0', 'UTC', '2024-01-01']
+                for geoname_id, name, lat, lng, country, admin1 in PLACES]
+        tsv.write_text('\n'.join('\t'.join(row) for row in rows) + '\n', encoding='utf-8')
+        assert build_gazetteer(tsv_path=tsv, directory=directory) == len(PLACES)
+        return directory
+
+    @pytest.fixture
+    def gazetteer(self, gazetteer_dir) -> Gazetteer:
+        return Gazetteer.load(gazetteer_dir)
+
+    def test_load_is_memory_mapped(self, gazetteer_dir):
+        assert isinstance(np.load(gazetteer_dir / 'points.npy', mmap_mode='r'), np.memmap)
+        assert len(Gazetteer.load(gazetteer_dir)) == len(PLACES)
+
+    @pytest.mark.parametrize('latitude, longitude, expected_value', [
+        ('40.70606047881325', '-74.00880414434951', 'New York City, NY, US'),
+        (38.87656716217848, -77.00359788800425, 'Washington, DC, US'),
+        (51.5, 0.1, 'London, ENG, GB'),
+        (-33.9, 151.2, 'Sydney, 02, AU'),
+    ])
+    @pytest.mark.asyncio
+    async def test_get_address_from_latitude_longitude(self, gazetteer: Gazetteer, latitude, longitude, expected_value):
+        address = await OfflineGeo(gazetteer=gazetteer).get_address_from_latitude_longitude(latitude=latitude, longitude=longitude)
+        assert address == expected_value
+
+    def test_reverse_many(self, gazetteer: Gazetteer):
+        latitudes = np.repeat([40.7, -33.8, 21.3, 0.0], 1000)
+        longitudes = np.repeat([-74.0, 151.2, -157.8, 0.0], 1000)
+        addresses = OfflineGeo(gazetteer=gazetteer, max_distance_km=100).reverse_many(latitudes=latitudes, longitudes=longitudes)
+        assert len(addresses) == 4000
+        assert addresses[::1000] == ['New York City, NY, US', 'Sydney, 02, AU', 'Honolulu, HI, US', None]
+
+    @pytest.mark.asyncio
+    async def test_forward_lookup_uses_fallback(self, gazetteer: Gazetteer):
+        fallback = FakeGeo()
+        point = await OfflineGeo(gazetteer=gazetteer, fallback=fallback).get_longitude_and_latitude(
+            country='USA', city='New York', street='Wall Street', house_number='60')
+        assert point[:2] == (40.706173050000004, -74.00851619618786)
+        assert fallback.calls == 1
+        with pytest.raises(HTTPException):
+            await OfflineGeo(gazetteer=gazetteer).get_longitude_and_latitude(country='USA', city='New York', street='Wall Street')
@@ -0,0 +1,41 @@
+from datetime import datetime
+from collections import namedtuple
+import pytest
+from fastapi import HTTPException
+from ..pagination import encode_cursor, decode_cursor, next_cursor, split_page
+
+
+class TestPagination:
+    Row = namedtuple('Row', 'id updated')
+
+    @pytest.mark.parametrize('updated, listing_id', [(datetime(2022, 2, 14, 12, 58, 52, 351265), 1), (datetime(2021, 1, 1), 2_000_000)])
+    def test_encode_decode_cursor(self, updated: datetime, listing_id: int):
+        assert decode_cursor(encode_cursor(updated=updated, listing_id=listing_id)) == (updated, listing_id)
+
+    @pytest.mark.parametrize('cursor', ['not-a-cursor', '!!!', encode_cursor(datetime(2022, 1, 1), 1)[:-4]])
+    def test_decode_invalid_cursor(self, cursor: str):
+        with pytest.raises(HTTPException) as exc:
+            decode_cursor(cursor)
+        assert exc.value.status_code == 400
+
+    @pytest.mark.parametrize('rows, limit, has_cursor', [
+        ([], 20, False),
+        ([Row(id=1, updated=datetime(2022, 1, 1))], 20, False),
+        ([Row(id=2, updated=datetime(2022, 1, 2)), Row(id=1, updated=datetime(2022, 1, 1))], 2, True)
+    ])
+    def test_next_cursor(self, rows: list, limit: int, has_cursor: bool):
+        assert (next_cursor(listings=rows, limit=limit) is not None) == has_cursor
+
+    @pytest.mark.parametrize('fetched, limit, with_cursor, page_size, headers', [
+        (0, 2, True, 0, {'X-Has-More'}),
+        (2, 2, True, 2, {'X-Has-More'}),
+        (3, 2, True, 2, {'X-Has-More', 'X-Next-Cursor'}),
+        (3, 2, False, 2, {'X-Has-More'}),
+        (1, 0, True, 0, {'X-Has-More'}),
+    ])
+    def test_split_page(self, fetched: int, limit: int, with_cursor: bool, page_size: int, headers: set[str]):
+        rows = [self.Row(id=i, updated=datetime(2022, 1, 1)) for i in range(fetched, 0, -1)]
+        page, page_headers = split_page(listings=rows, limit=limit, with_cursor=with_cursor)
+        assert page == rows[:page_size]
+        assert set(page_headers) == headers
+        assert page_headers['X-Has-More'] == ('true' if fetched > limit else 'false')
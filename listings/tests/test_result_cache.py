@@ -0,0 +1,46 @@
+import pytest
+from httpx import AsyncClient
+from main import app
+from ..result_cache import ListingsResultCache
+
+
+class TestListingsResultCache:
+    DATA = {'title': 'cached listing', 'price': 1000, 'country': 'usa', 'city': 'new york', 'street': 'wall street'}
+
+    @pytest.fixture
+    def listings_cache(self) -> ListingsResultCache:
+        return app.state.container.listings_cache
+
+    @pytest.mark.parametrize('first, second', [
+        ({'city': 'LA', 'country': 'usa'}, {'country': 'usa', 'city': 'LA'}),
+        ({'geo': {'bbox': (1.0, 2.0, 3.0, 4.0)}, 'limit': 20}, {'limit': 20, 'geo': {'bbox': [1.0, 2.0, 3.0, 4.0]}}),
+    ])
+    def test_canonical_key(self, first: dict, second: dict):
+        assert ListingsResultCache.canonical_key(first) == ListingsResultCache.canonical_key(second)
+
+    @pytest.mark.asyncio
+    async def test_cached_response_matches_uncached(self, first_user_client_with_jwt: AsyncClient, listings_cache: ListingsResultCache,
+                                                    monkeypatch):
+        for _ in range(3):
+            await first_user_client_with_jwt.post('/listings/', data=self.DATA)
+        url = '/listings/?limit=2&country=usa'
+        miss = await first_user_client_with_jwt.get(url)
+        hits = listings_cache.stats()['hits']
+        hit = await first_user_client_with_jwt.get(url)
+        assert listings_cache.stats()['hits'] == hits + 1
+        monkeypatch.setattr(app.state.container, 'listings_cache', None)
+        uncached = await first_user_client_with_jwt.get(url)
+        assert miss.content == hit.content == uncached.content
+        assert miss.headers['X-Next-Cursor'] == hit.headers['X-Next-Cursor'] == uncached.headers['X-Next-Cursor']
+        assert hit.headers['content-type'] == uncached.headers['content-type']
+
+    @pytest.mark.asyncio
+    async def test_writes_invalidate_results(self, first_user_client_with_jwt: AsyncClient):
+        url = '/listings/?limit=20&country=usa'
+        before = (await first_user_client_with_jwt.get(url)).json()
+        created = (await first_user_client_with_jwt.post('/listings/', data=self.DATA)).json()
+        assert len((await first_user_client_with_jwt.get(url)).json()) == len(before) + 1
+        await first_user_client_with_jwt.put(f'/listings/{created["id"]}', data={'country': 'gb'})
+        assert len((await first_user_client_with_jwt.get(url)).json()) == len(before)
+        await first_user_client_with_jwt.delete(f'/listings/{before[0]["id"]}')
+        assert [listing['id'] for listing in (await first_user_client_with_jwt.get(url)).json()] == [listing['id'] for listing in before[1:]]
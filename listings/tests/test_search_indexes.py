@@ -0,0 +1,50 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select, text, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects import postgresql
+from conftest import async_test_session, save_listings
+from ..models import Listing
+from ..repositories import RepositoryListing
+
+
+class TestSearchIndexes:
+    @pytest.fixture(scope='class')
+    async def listings(self, first_user) -> dict[str, int]:
+        return await save_listings([Listing(title='published', price=1000, city='Indexville', user_id=first_user['id']),
+                                    Listing(title='draft', price=1000, city='Indexville', user_id=first_user['id'], is_published=False)])
+
+    @pytest.mark.asyncio
+    async def test_unpublished_listings_are_not_searchable(self, client_without_jwt: AsyncClient, first_user, listings):
+        search = await client_without_jwt.get('/listings/?city=indexville')
+        own = await client_without_jwt.get(f'/listings/user/{first_user["id"]}?limit=100')
+        assert [listing['id'] for listing in search.json()] == [listings['published']]
+        assert {listings['published'], listings['draft']} <= {listing['id'] for listing in own.json()}
+
+    @pytest.mark.asyncio
+    async def test_is_published_defaults_to_true_and_rejects_null(self, first_user, listings):
+        async with async_test_session() as session:
+            insert = text("INSERT INTO listings (title, category_type, user_id) VALUES ('indexes raw', 'SELL', :user_id) RETURNING id")
+            listing_id = (await session.execute(insert, {'user_id': first_user['id']})).scalar_one()
+            assert (await session.execute(select(Listing.is_published).where(Listing.id == listing_id))).scalar_one() is True
+            with pytest.raises(IntegrityError):
+                await session.execute(update(Listing).where(Listing.id == listing_id).values(is_published=None))
+
+    @pytest.mark.parametrize('filters, index', [
+        ({}, 'ix_listings_published_updated_id'),
+        ({'address_params': {'city': 'Indexville'}, 'base_building_params': {'category_type': 'SELL'}},
+         'ix_listings_published_city_category_updated_id'),
+        ({'base_building_params': {'category_type': 'SELL', 'number_of_rooms': 2}}, 'ix_listings_published_category_rooms_updated_id'),
+    ])
+    @pytest.mark.asyncio
+    async def test_filter_shapes_use_search_indexes(self, listings, filters: dict, index: str):
+        stmt = await RepositoryListing(session=None)._all_listings_stmt(
+            stmt=select(Listing.id), offset=0, limit=20, base_building_params=filters.get('base_building_params', {}),
+            advanced_building_params={}, price_params=filters.get('price_params', {}), address_params=filters.get('address_params', {}),
+            cursor=None, geo_params={})
+        sql = str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={'literal_binds': True}))
+        async with async_test_session() as session:
+            await session.execute(text('SET LOCAL enable_seqscan = off'))
+            await session.execute(text('SET LOCAL enable_bitmapscan = off'))
+            plan = '\n'.join((await session.execute(text(f'EXPLAIN {sql}'))).scalars())
+        assert index in plan
@@ -0,0 +1,50 @@
+from datetime import datetime
+from decimal import Decimal
+import pytest
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse
+from pydantic import parse_obj_as
+from sqlalchemy import select
+from conftest import async_test_session
+from ..models import Listing, Image
+from ..schemas import ListingSchema
+from ..serializers import dumps_listing, dumps_listings
+
+
+def validated_body(listings) -> bytes:
+    return ORJSONResponse(content=jsonable_encoder(parse_obj_as(list[ListingSchema], listings))).body
+
+
+def make_listing(listing_id: int, **kwargs) -> Listing:
+    values = {'id': listing_id, 'user_id': 1, 'title': f'listing {listing_id}', 'price': Decimal('1000.50'),
+              'created': datetime(2021, 12, 1, 10, 30, 15), 'updated': datetime(2021, 12, 2, 11, 45, 59, 999), 'is_published': True,
+              'category_type': 'SELL', 'house_type': 'NEW_BUILDING', 'wall_type': 'BRICK', 'elevator': True, 'number_of_floors': 1}
+    return Listing(**{**values, **kwargs})
+
+
+class TestListingSerializer:
+    @pytest.mark.parametrize('listing', [
+        make_listing(1),
+        make_listing(2, price=Decimal('1'), total_area=32, number_of_rooms=3, year_built=2020, description='d', slug='listing-2',
+                     country='usa', city='new york', street='wall street', region='ny', district='manhattan', house_number='60',
+                     latitude=40.706173050000004, longitude=-74.00851619618786, full_address='60 Wall Street', geocode_status='DONE'),
+        make_listing(3, category_type='DAILY_RENT', house_type='SECONDARY_HOUSING', wall_type='PANEL', elevator=False, is_published=False,
+                     geocode_status='PENDING', title='юникод "quoted" \\ title', number_of_floors=None),
+        make_listing(4, house_type=None, wall_type=None, elevator=None, images=[Image(id=7, photo='a.jpg', listing_id=4),
+                                                                                Image(id=8, photo='b.jpg', listing_id=4)]),
+    ])
+    def test_matches_validated_schema(self, listing: Listing):
+        assert dumps_listing(listing) == validated_body([listing])[1:-1]
+        assert dumps_listings([listing, listing]) == validated_body([listing, listing])
+
+    def test_empty_list(self):
+        assert dumps_listings([]) == validated_body([]) == b'[]'
+
+    @pytest.mark.asyncio
+    async def test_matches_validated_schema_for_database_rows(self, first_user_client_with_jwt):
+        for price in (1000, 2500.75):
+            await first_user_client_with_jwt.post('/listings/', data={'title': 'contract', 'price': price, 'country': 'usa', 'city': 'la'})
+        async with async_test_session() as session:
+            listings = (await session.execute(select(Listing).order_by(Listing.id))).scalars().all()
+        assert listings
+        assert dumps_listings(listings) == validated_body(listings)
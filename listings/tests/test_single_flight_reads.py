@@ -0,0 +1,59 @@
+import asyncio
+import pytest
+from httpx import AsyncClient
+from main import app
+from ..repositories import RepositoryListing
+
+
+class TestCoalescedReads:
+    @pytest.fixture
+    def slow_repository(self, monkeypatch) -> dict:
+        calls = {}
+
+        def slow(name: str):
+            method = getattr(RepositoryListing, name)
+
+            async def wrapper(self, **kwargs):
+                calls[name] = calls.get(name, 0) + 1
+                await asyncio.sleep(0.05)
+                return await method(self, **kwargs)
+
+            monkeypatch.setattr(RepositoryListing, name, wrapper)
+
+        slow('get_detail_listing')
+        slow('get_all_listings')
+        monkeypatch.setattr(app.state.container, 'listing_detail_cache', None)
+        monkeypatch.setattr(app.state.container, 'listings_cache', None)
+        return calls
+
+    @pytest.mark.parametrize('url, method', [('/listings/{listing_id}', 'get_detail_listing'), ('/listings/?city=new york', 'get_all_listings')])
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_reads_share_one_query(self, client_without_jwt: AsyncClient, listing_id: int, slow_repository: dict,
+                                                               url: str, method: str):
+        single_flight = app.state.container.listings_single_flight
+        coalesced = single_flight.coalesced
+        responses = await asyncio.gather(*(client_without_jwt.get(url.format(listing_id=listing_id)) for _ in range(10)))
+        assert {response.status_code for response in responses} == {200}
+        assert len({response.content for response in responses}) == 1
+        assert slow_repository[method] == 1
+        assert single_flight.coalesced - coalesced == 9
+        assert 0 < single_flight.stats()['coalescing_ratio'] <= 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_missing_reads_all_fail(self, client_without_jwt: AsyncClient, slow_repository: dict):
+        responses = await asyncio.gather(*(client_without_jwt.get('/listings/9999') for _ in range(5)))
+        assert {response.status_code for response in responses} == {404}
+        assert slow_repository['get_detail_listing'] == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_leader_does_not_fail_followers(self, client_without_jwt: AsyncClient, listing_id: int, slow_repository: dict):
+        leader = asyncio.create_task(client_without_jwt.get(f'/listings/{listing_id}'))
+        await asyncio.sleep(0.01)
+        follower = asyncio.create_task(client_without_jwt.get(f'/listings/{listing_id}'))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        response = await follower
+        assert response.status_code == 200
+        assert response.json()['id'] == listing_id
+        assert leader.cancelled()
+        assert slow_repository['get_detail_listing'] == 2
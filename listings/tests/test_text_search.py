@@ -0,0 +1,88 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select, text, update
+from sqlalchemy.dialects import postgresql
+from conftest import async_test_session, save_listings
+from ..models import Listing
+from ..repositories import RepositoryListing
+from ..query_filter_service import QueryListingParamsService
+
+LISTINGS = {
+    'sunny flat with balcony': ('2-room flat, five minutes walk to the metro station', 2),
+    'quiet studio': ('Studio near the metro with a large balcony, the balcony overlooks the park', 1),
+    'family house': ('Three bedrooms, garden and garage', 4),
+    'open plan loft': ('Two rooms and balconies, far from any metro', 2),
+}
+
+
+class TestTextSearch:
+    @pytest.fixture(scope='class')
+    async def listings(self, first_user) -> dict[str, int]:
+        return await save_listings([Listing(title=title, description=description, number_of_rooms=rooms, price=1000, user_id=first_user['id'])
+                                    for title, (description, rooms) in LISTINGS.items()])
+
+    @pytest.mark.parametrize('query, expected_titles', [
+        ('q=metro balcony', {'sunny flat with balcony', 'quiet studio', 'open plan loft'}),
+        ('q=metro balcony&number_of_rooms=2', {'sunny flat with balcony', 'open plan loft'}),
+        ('q="large balcony"', {'quiet studio'}),
+        ('q=metro -studio', {'sunny flat with balcony', 'open plan loft'}),
+        ('q=garden', {'family house'}),
+        ('q=penthouse', set()),
+    ])
+    @pytest.mark.asyncio
+    async def test_search_combines_with_filters(self, client_without_jwt: AsyncClient, listings, read_path: str, query: str,
+                                                expected_titles: set[str]):
+        response = await client_without_jwt.get(f'/listings/?{query}')
+        assert response.status_code == 200
+        assert {listing['title'] for listing in response.json()} == expected_titles
+
+    @pytest.mark.asyncio
+    async def test_results_are_ranked(self, client_without_jwt: AsyncClient, listings, read_path: str):
+        response = await client_without_jwt.get('/listings/?q=balcony')
+        assert [listing['title'] for listing in response.json()] == ['sunny flat with balcony', 'quiet studio', 'open plan loft']
+        assert 'X-Next-Cursor' not in response.headers
+
+    @pytest.mark.asyncio
+    async def test_offset_paging(self, client_without_jwt: AsyncClient, listings):
+        first_page = await client_without_jwt.get('/listings/?q=balcony&limit=2')
+        second_page = await client_without_jwt.get('/listings/?q=balcony&limit=2&offset=2')
+        assert [listing['title'] for listing in first_page.json() + second_page.json()] == \
+               ['sunny flat with balcony', 'quiet studio', 'open plan loft']
+
+    @pytest.mark.asyncio
+    async def test_ranks_only_most_recent_candidates(self, client_without_jwt: AsyncClient, listings, monkeypatch):
+        monkeypatch.setattr(RepositoryListing, 'SEARCH_CANDIDATES', 2)
+        response = await client_without_jwt.get('/listings/?q=balconies&limit=2')
+        assert [listing['title'] for listing in response.json()] == ['quiet studio', 'open plan loft']
+        assert response.headers['X-Search-Window'] == '2'
+        assert response.headers['X-Has-More'] == 'false'
+
+    @pytest.mark.parametrize('query, status_code', [('limit=1&offset=1', 200), ('limit=2&offset=1', 400), ('limit=3', 400)])
+    @pytest.mark.asyncio
+    async def test_pages_cannot_pass_candidate_window(self, client_without_jwt: AsyncClient, listings, read_path: str, monkeypatch, query: str,
+                                                      status_code: int):
+        monkeypatch.setattr(RepositoryListing, 'SEARCH_CANDIDATES', 2)
+        response = await client_without_jwt.get(f'/listings/?q=metro&{query}')
+        assert response.status_code == status_code
+        assert ('X-Search-Window' in response.headers) == (status_code == 200)
+
+    @pytest.mark.asyncio
+    async def test_search_vector_follows_updates(self, client_without_jwt: AsyncClient, listings):
+        async with async_test_session() as session:
+            await session.execute(update(Listing).where(Listing.id == listings['family house']).values(description='Sauna and fireplace'))
+            await session.commit()
+        assert [listing['title'] for listing in (await client_without_jwt.get('/listings/?q=fireplace')).json()] == ['family house']
+
+    @pytest.mark.asyncio
+    async def test_cursor_with_search(self, client_without_jwt: AsyncClient):
+        response = await client_without_jwt.get('/listings/?q=balcony&cursor=abc')
+        assert response.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_search_uses_gin_index(self, listings):
+        stmt = QueryListingParamsService().search_params(stm=select(Listing.id), search='metro balcony')
+        sql = str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={'literal_binds': True}))
+        async with async_test_session() as session:
+            await session.execute(text('SET LOCAL enable_seqscan = off'))
+            plan = '\n'.join((await session.execute(text(f'EXPLAIN {sql}'))).scalars())
+        assert 'ix_listings_search_vector' in plan
@@ -0,0 +1,85 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from conftest import async_test_session, save_listings
+from settings import get_settings
+from ..models import Listing
+from ..counting import Explain, planner_rows
+from .. import repositories
+from ..repositories import RepositoryListing
+
+CITY = 'countville'
+
+
+class TestTotalCount:
+    @pytest.fixture(scope='class')
+    async def listings(self, first_user) -> list[int]:
+        listings = [Listing(title=f'count {i}', price=1000 + i, city=CITY, number_of_rooms=1 + i % 2, user_id=first_user['id'])
+                    for i in range(5)]
+        return list((await save_listings(listings)).values())
+
+    @pytest.mark.parametrize('limit, page_size, has_more', [(4, 4, 'true'), (5, 5, 'false'), (6, 5, 'false')])
+    @pytest.mark.asyncio
+    async def test_has_more(self, client_without_jwt: AsyncClient, listings, read_path: str, limit: int, page_size: int, has_more: str):
+        response = await client_without_jwt.get(f'/listings/?city={CITY}&limit={limit}')
+        assert len(response.json()) == page_size
+        assert response.headers['X-Has-More'] == has_more
+        assert ('X-Next-Cursor' in response.headers) == (has_more == 'true')
+        assert 'X-Total-Count' not in response.headers
+
+    @pytest.mark.parametrize('query, total, queries', [
+        ('limit=10', 5, 1),
+        ('limit=2&offset=4', 5, 1),
+        ('limit=2', 5, 2),
+        ('limit=2&offset=10', 5, 2),
+        ('limit=2&number_of_rooms=2', 2, 1),
+    ])
+    @pytest.mark.asyncio
+    async def test_exact_total_below_cap(self, client_without_jwt: AsyncClient, listings, query_counter, query: str, total: int, queries: int):
+        response = await client_without_jwt.get(f'/listings/?city={CITY}&total=true&fields=id&{query}')
+        assert response.headers['X-Total-Count'] == str(total)
+        assert response.headers['X-Total-Count-Kind'] == 'exact'
+        assert len(query_counter) == queries
+
+    @pytest.mark.parametrize('limit, planned, total, kind', [(3, 10 ** 6, 10 ** 6, 'estimate'), (4, 1, 4, 'at_least')])
+    @pytest.mark.asyncio
+    async def test_total_above_cap(self, client_without_jwt: AsyncClient, listings, monkeypatch, limit: int, planned: int, total: int,
+                                  kind: str):
+        monkeypatch.setattr(get_settings(), 'listings_exact_count_limit', 3)
+        monkeypatch.setattr(repositories, 'planner_rows', lambda plan: planner_rows(plan) and planned)
+        response = await client_without_jwt.get(f'/listings/?city={CITY}&total=true&limit={limit}&fields=title')
+        assert response.headers['X-Total-Count'] == str(total)
+        assert response.headers['X-Total-Count-Kind'] == kind
+
+    @pytest.mark.asyncio
+    async def test_planner_rows(self, listings):
+        async with async_test_session() as session:
+            plan = (await session.execute(Explain(select(Listing.id).where(Listing.city == CITY)))).scalar_one()
+        assert planner_rows(plan) >= 1
+        assert planner_rows('[{"Plan": {"Node Type": "Seq Scan", "Plan Rows": 42}}]') == 42
+
+    @pytest.mark.parametrize('cap, limit, total, kinds', [(10, 2, {3}, {'exact'}), (1, 1, {2, 3}, {'estimate', 'at_least'})])
+    @pytest.mark.asyncio
+    async def test_search_total_is_clamped_to_candidate_window(self, client_without_jwt: AsyncClient, listings, monkeypatch, cap: int,
+                                                               limit: int, total: set[int], kinds: set[str]):
+        monkeypatch.setattr(RepositoryListing, 'SEARCH_CANDIDATES', 3)
+        monkeypatch.setattr(get_settings(), 'listings_exact_count_limit', cap)
+        response = await client_without_jwt.get(f'/listings/?city={CITY}&q=count&total=true&limit={limit}&fields=id')
+        assert int(response.headers['X-Total-Count']) in total
+        assert response.headers['X-Total-Count-Kind'] in kinds
+
+    @pytest.fixture(scope='class')
+    async def polygon_listings(self, first_user) -> list[int]:
+        listings = [Listing(title=f'polygon {i}', price=1000, user_id=first_user['id'], latitude=10.05 + i / 100, longitude=20.05)
+                    for i in range(3)]
+        return list((await save_listings(listings)).values())
+
+    @pytest.mark.parametrize('limit, page_size, has_more', [(1, 1, 'true'), (2, 2, 'true'), (3, 3, 'false'), (5, 3, 'false')])
+    @pytest.mark.asyncio
+    async def test_polygon_search_has_more(self, client_without_jwt: AsyncClient, polygon_listings: list[int], limit: int, page_size: int,
+                                           has_more: str):
+        polygon = [[20.0, 10.0], [20.1, 10.0], [20.1, 10.1], [20.0, 10.1]]
+        response = await client_without_jwt.post(f'/listings/search/polygon?limit={limit}', json={'polygon': polygon})
+        assert {listing['id'] for listing in response.json()} <= set(polygon_listings)
+        assert len(response.json()) == page_size
+        assert response.headers['X-Has-More'] == has_more
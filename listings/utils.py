@@ -12,19 +12,22 @@ class GeoInterface(ABC):
     @abstractmethod
     async def get_address_from_latitude_longitude(self, latitude: float, longitude: float): ...
 
+    async def close(self): ...
+
 
 class Geo(GeoInterface):
     def __init__(self):
         self.nominatim = Nominatim(user_agent='real_estate', adapter_factory=AioHTTPAdapter)
 
+    async def close(self):
+        await self.nominatim.__aexit__(None, None, None)
+
     async def get_address_from_latitude_longitude(self, latitude: str, longitude: str):
-        async with self.nominatim as geo:
-            coord = f'{latitude}, {longitude}'
-            loc = await geo.reverse(coord, language='ru_RU')
-            return loc.address
+        coord = f'{latitude}, {longitude}'
+        loc = await self.nominatim.reverse(coord, language='ru_RU')
+        return loc.address
 
     async def get_longitude_and_latitude(self, country: str, city: str, street: str, house_number: Optional[str] = None):
-        async with self.nominatim as geo:
-            address = f'{house_number}, {street}, {city}, {country}' if house_number else f'{street}, {city}, {country}'
-            location_ = await geo.geocode(address)
-            return location_.latitude, location_.longitude, str(location_)
+        address = f'{house_number}, {street}, {city}, {country}' if house_number else f'{street}, {city}, {country}'
+        location_ = await self.nominatim.geocode(address)
+        return location_.latitude, location_.longitude, str(location_)
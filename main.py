@@ -1,11 +1,30 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.responses import ORJSONResponse
+from container import Container
 from listings.controllers import listings_router
 from auth.controllers import auth_router
 from profile.controllers import profile_router
+from permissions import require_metrics_token
+from settings import get_settings
 
 app = FastAPI(default_response_class=ORJSONResponse, title='Real Estate')
 
 app.include_router(listings_router)
 app.include_router(auth_router)
 app.include_router(profile_router)
+
+
+@app.on_event('startup')
+async def startup():
+    app.state.container = Container(settings=get_settings())
+    await app.state.container.startup()
+
+
+@app.on_event('shutdown')
+async def shutdown():
+    await app.state.container.shutdown()
+
+
+@app.get('/metrics', include_in_schema=False, dependencies=[Depends(require_metrics_token)])
+async def metrics():
+    return app.state.container.stats()
@@ -12,7 +12,7 @@ from settings import get_settings
 sys.path = ['', '..'] + sys.path[1:]
 from database import database_url, Base
 from profile.models import User
-from listings.models import Listing, Favorite, Image
+from listings.models import Listing, Favorite, Image, GeocodeCache
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,31 @@
+"""geocode cache
+
+Revision ID: 2f44ee921029
+Revises: d8495c109b65
+Create Date: 2026-10-18 11:03:17.228904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2f44ee921029'
+down_revision = 'd8495c109b65'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('geocode_cache',
+    sa.Column('address_key', sa.String(), nullable=False),
+    sa.Column('latitude', sa.Float(), nullable=False),
+    sa.Column('longitude', sa.Float(), nullable=False),
+    sa.Column('full_address', sa.String(), nullable=True),
+    sa.Column('created', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('address_key')
+    )
+
+
+def downgrade():
+    op.drop_table('geocode_cache')
@@ -0,0 +1,33 @@
+"""geocode status
+
+Revision ID: 586730bb00d5
+Revises: 2f44ee921029
+Create Date: 2026-10-18 11:48:05.917340
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '586730bb00d5'
+down_revision = '2f44ee921029'
+branch_labels = None
+depends_on = None
+
+geocode_statuses = postgresql.ENUM('PENDING', 'DONE', 'FAILED', name='geocode_statuses')
+
+
+def upgrade():
+    geocode_statuses.create(op.get_bind(), checkfirst=True)
+    op.add_column('listings', sa.Column('geocode_status', geocode_statuses, nullable=True))
+    op.execute("UPDATE listings SET geocode_status = 'DONE' WHERE latitude IS NOT NULL AND longitude IS NOT NULL")
+    op.create_index('ix_listings_geocode_pending', 'listings', ['id'], unique=False,
+                    postgresql_where=sa.text("geocode_status = 'PENDING'"))
+
+
+def downgrade():
+    op.drop_index('ix_listings_geocode_pending', table_name='listings')
+    op.drop_column('listings', 'geocode_status')
+    geocode_statuses.drop(op.get_bind(), checkfirst=True)
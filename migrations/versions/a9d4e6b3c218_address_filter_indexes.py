@@ -0,0 +1,28 @@
+"""address filter indexes
+
+Revision ID: a9d4e6b3c218
+Revises: c5f2a8d91e47
+Create Date: 2026-10-18 22:14:51.663027
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a9d4e6b3c218'
+down_revision = 'c5f2a8d91e47'
+branch_labels = None
+depends_on = None
+
+PATTERN_COLUMNS = ('country', 'city', 'street', 'region', 'district', 'house_number')
+
+
+def upgrade():
+    for column in PATTERN_COLUMNS:
+        op.create_index(f'ix_listings_lower_{column}', 'listings', [sa.text(f'lower({column}) text_pattern_ops')], unique=False)
+
+
+def downgrade():
+    for column in PATTERN_COLUMNS:
+        op.drop_index(f'ix_listings_lower_{column}', table_name='listings')
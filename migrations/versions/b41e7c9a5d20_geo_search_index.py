@@ -0,0 +1,24 @@
+"""geo search index
+
+Revision ID: b41e7c9a5d20
+Revises: 586730bb00d5
+Create Date: 2026-10-18 14:05:27.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b41e7c9a5d20'
+down_revision = '586730bb00d5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_listings_latitude_longitude', 'listings', ['latitude', 'longitude'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_listings_latitude_longitude', table_name='listings')
@@ -0,0 +1,31 @@
+"""geocode claims
+
+Revision ID: b7e1c4a9d352
+Revises: f3b7d2e9a614
+Create Date: 2026-10-19 10:12:41.508113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e1c4a9d352'
+down_revision = 'f3b7d2e9a614'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE geocode_statuses ADD VALUE IF NOT EXISTS 'IN_PROGRESS' AFTER 'PENDING'")
+    op.add_column('listings', sa.Column('geocode_claimed_at', sa.DateTime(), nullable=True))
+    op.create_index('ix_listings_geocode_claimed_at', 'listings', ['geocode_claimed_at'], unique=False,
+                    postgresql_where=sa.text("geocode_status = 'IN_PROGRESS'"))
+
+
+def downgrade():
+    op.drop_index('ix_listings_geocode_claimed_at', table_name='listings')
+    op.drop_column('listings', 'geocode_claimed_at')
+    # postgres cannot drop an enum value; release unfinished claims instead
+    op.execute("UPDATE listings SET geocode_status = 'PENDING' WHERE geocode_status = 'IN_PROGRESS'")
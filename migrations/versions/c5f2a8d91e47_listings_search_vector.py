@@ -0,0 +1,30 @@
+"""listings search vector
+
+Revision ID: c5f2a8d91e47
+Revises: e7a3c1f08b52
+Create Date: 2026-10-18 21:05:37.204118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5f2a8d91e47'
+down_revision = 'e7a3c1f08b52'
+branch_labels = None
+depends_on = None
+
+SEARCH_VECTOR = "setweight(to_tsvector('english', coalesce(title, '')), 'A') || " \
+                "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+
+
+def upgrade():
+    op.add_column('listings', sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(SEARCH_VECTOR, persisted=True), nullable=True))
+    op.create_index('ix_listings_search_vector', 'listings', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade():
+    op.drop_index('ix_listings_search_vector', table_name='listings')
+    op.drop_column('listings', 'search_vector')
@@ -0,0 +1,28 @@
+"""keyset pagination indexes
+
+Revision ID: d8495c109b65
+Revises: 5dbf65e8dc2d
+Create Date: 2026-10-18 10:12:41.503112
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd8495c109b65'
+down_revision = '5dbf65e8dc2d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_listings_updated_id', 'listings', ['updated', 'id'], unique=False)
+    op.create_index('ix_listings_user_id_updated_id', 'listings', ['user_id', 'updated', 'id'], unique=False)
+    op.create_index('ix_favorites_user_id_listing_id', 'favorites', ['user_id', 'listing_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_favorites_user_id_listing_id', table_name='favorites')
+    op.drop_index('ix_listings_user_id_updated_id', table_name='listings')
+    op.drop_index('ix_listings_updated_id', table_name='listings')
@@ -0,0 +1,24 @@
+"""images listing_id index
+
+Revision ID: e7a3c1f08b52
+Revises: b41e7c9a5d20
+Create Date: 2026-10-18 16:42:10.381920
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7a3c1f08b52'
+down_revision = 'b41e7c9a5d20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(op.f('ix_images_listing_id'), 'images', ['listing_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_images_listing_id'), table_name='images')
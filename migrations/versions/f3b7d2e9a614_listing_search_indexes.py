@@ -0,0 +1,39 @@
+"""listing search indexes
+
+Revision ID: f3b7d2e9a614
+Revises: a9d4e6b3c218
+Create Date: 2026-10-18 23:02:18.447190
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3b7d2e9a614'
+down_revision = 'a9d4e6b3c218'
+branch_labels = None
+depends_on = None
+
+PUBLISHED = sa.text('is_published')
+
+
+def upgrade():
+    op.execute('UPDATE listings SET is_published = true WHERE is_published IS NULL')
+    op.alter_column('listings', 'is_published', existing_type=sa.Boolean(), nullable=False, server_default=sa.true())
+    op.create_index('ix_listings_published_updated_id', 'listings', ['updated', 'id'], unique=False, postgresql_where=PUBLISHED)
+    op.create_index('ix_listings_published_category_rooms_updated_id', 'listings', ['category_type', 'number_of_rooms', 'updated', 'id'],
+                    unique=False, postgresql_where=PUBLISHED)
+    op.create_index('ix_listings_published_category_price', 'listings', ['category_type', 'price'], unique=False, postgresql_where=PUBLISHED)
+    op.create_index('ix_listings_published_city_category_updated_id', 'listings', [sa.text('lower(city)'), 'category_type', 'updated', 'id'],
+                    unique=False, postgresql_where=PUBLISHED)
+    op.drop_index('ix_listings_updated_id', table_name='listings')
+
+
+def downgrade():
+    op.create_index('ix_listings_updated_id', 'listings', ['updated', 'id'], unique=False)
+    op.drop_index('ix_listings_published_city_category_updated_id', table_name='listings')
+    op.drop_index('ix_listings_published_category_price', table_name='listings')
+    op.drop_index('ix_listings_published_category_rooms_updated_id', table_name='listings')
+    op.drop_index('ix_listings_published_updated_id', table_name='listings')
+    op.alter_column('listings', 'is_published', existing_type=sa.Boolean(), nullable=True, server_default=None)
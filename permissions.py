@@ -1,10 +1,14 @@
+import hmac
+from typing import Optional
 from fastapi.security.oauth2 import OAuth2PasswordBearer
 from sqlalchemy import select
 from sqlalchemy.engine import Result
 
 from database import get_db
+from auth.principal import Principal, PrincipalCache
 from auth.token_interface import TokenInterface
-from fastapi import Depends
+from container import get_token_service, get_principal_cache
+from fastapi import Depends, Header, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from profile.models import User
@@ -14,12 +18,33 @@ from settings import get_settings
 class GetUser:
     OAUTH_TOKEN = OAuth2PasswordBearer(tokenUrl='/auth/login')
 
-    def __init__(self, token_service: TokenInterface):
-        self._token_service = token_service
+    def __init__(self):
         self._settings = get_settings()
 
-    async def __call__(self, db: AsyncSession = Depends(get_db), token: str = Depends(OAUTH_TOKEN)):
-        payload: dict = await self._token_service.decode_access_token(token=token, secret_key=self._settings.secret_key,
-                                                                      algorithm=self._settings.algorithm)
-        result: Result = await db.execute(select(User).where(User.username == payload.get('sub'), User.is_active))
-        return result.scalars().first()
+    async def __call__(self, db: AsyncSession = Depends(get_db), token: str = Depends(OAUTH_TOKEN),
+                       token_service: TokenInterface = Depends(get_token_service),
+                       cache: PrincipalCache = Depends(get_principal_cache)) -> Principal:
+        if principal := cache.get(token):
+            return principal
+        payload: dict = await token_service.decode_access_token(token=token, secret_key=self._settings.secret_key,
+                                                                algorithm=self._settings.algorithm)
+        result: Result = await db.execute(
+            select(User.id, User.username, User.is_active).where(User.username == payload.get('sub'), User.is_active))
+        if not (row := result.first()):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
+                                detail='Could not validate credentials', headers={"WWW-Authenticate": "Bearer"})
+        principal = Principal(*row)
+        cache.set(token, principal, exp=payload['exp'])
+        return principal
+
+
+get_current_user = GetUser()
+
+
+def require_metrics_token(authorization: Optional[str] = Header(None)):
+    token = get_settings().metrics_token
+    if not token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Not Found')
+    if not authorization or not hmac.compare_digest(authorization.encode(), f'Bearer {token}'.encode()):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Could not validate credentials',
+                            headers={"WWW-Authenticate": "Bearer"})
@@ -3,21 +3,24 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from .services import ProfileService
 from .repository import ProfileRepository
 from database import get_db
-from permissions import GetUser
-from .models import User
-from auth.token_service import TokenService
+from container import get_principal_cache
+from auth.principal import Principal, PrincipalCache
+from permissions import get_current_user
 from .schemas import UserUpdateSchema, ResponseUserSchema
 
 profile_router = APIRouter(prefix='/profile', tags=['profile'])
 
 
+def get_profile_service(db: AsyncSession = Depends(get_db), principal_cache: PrincipalCache = Depends(get_principal_cache)) -> ProfileService:
+    return ProfileService(repository=ProfileRepository(session=db), principal_cache=principal_cache)
+
+
 @profile_router.put('/', status_code=status.HTTP_200_OK, response_model=ResponseUserSchema)
-async def update_profile(updated_data: UserUpdateSchema, db: AsyncSession = Depends(get_db),
-                         user: User = Depends(GetUser(token_service=TokenService()))):
-    return await ProfileService(repository=ProfileRepository(session=db)).update_profile(data=updated_data, user=user)
+async def update_profile(updated_data: UserUpdateSchema, service: ProfileService = Depends(get_profile_service),
+                         user: Principal = Depends(get_current_user)):
+    return await service.update_profile(data=updated_data, user=user)
 
 
 @profile_router.delete('/', status_code=status.HTTP_204_NO_CONTENT)
-async def delete_user(db: AsyncSession = Depends(get_db),
-                      user: User = Depends(GetUser(token_service=TokenService()))):
-    return await ProfileService(repository=ProfileRepository(session=db)).delete_user(user=user)
+async def delete_user(service: ProfileService = Depends(get_profile_service), user: Principal = Depends(get_current_user)):
+    return await service.delete_user(user=user)
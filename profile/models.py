@@ -18,8 +18,8 @@ class User(Base):
     created = _sql.Column(_sql.DateTime, default=datetime.now)
     updated = _sql.Column(_sql.DateTime, default=datetime.now, onupdate=datetime.now)
 
-    listings = relationship('Listing', backref='user', lazy='joined', cascade='all, delete')
-    favorites = relationship('Favorite', backref='user', lazy='joined', cascade='all, delete')
+    listings = relationship('Listing', backref='user', lazy='select', cascade='all, delete')
+    favorites = relationship('Favorite', backref='user', lazy='select', cascade='all, delete')
 
     def __repr__(self) -> str:
         return f'<User: {self.username}>'
@@ -1,6 +1,7 @@
 from sqlalchemy.engine import Result
 from sqlalchemy import update, delete
 from sqlalchemy.ext.asyncio import AsyncSession
+from auth.principal import Principal
 from .models import User
 from .repository_interface import ProfileRepositoryInterface
 
@@ -10,11 +11,11 @@ class ProfileRepository(ProfileRepositoryInterface):
     def __init__(self, session: AsyncSession):
         self._session = session
 
-    async def update_profile(self, updated_data: dict, user: User) -> User:
+    async def update_profile(self, updated_data: dict, user: Principal) -> User:
         result: Result = await self._session.execute(update(User).where(User.id == user.id).values(**updated_data).returning(User))
         await self._session.commit()
         return result.first()
 
-    async def delete_user(self, user: User):
+    async def delete_user(self, user: Principal):
         result: Result = await self._session.execute(delete(User).where(User.id == user.id))
         await self._session.commit()
@@ -1,12 +1,13 @@
 from abc import ABC, abstractmethod
 
+from auth.principal import Principal
 from .models import User
 from .schemas import UserUpdateSchema
 
 
 class ProfileRepositoryInterface(ABC):
     @abstractmethod
-    async def update_profile(self, updated_data: dict, user: User) -> User: pass
+    async def update_profile(self, updated_data: dict, user: Principal) -> User: pass
 
     @abstractmethod
-    async def delete_user(self, user: User): pass
+    async def delete_user(self, user: Principal): pass
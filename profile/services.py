@@ -1,16 +1,21 @@
-from .models import User
+from auth.principal import Principal, PrincipalCache
 from .repository_interface import ProfileRepositoryInterface
 from .schemas import UserUpdateSchema
 from fastapi import status, Response
 
 
 class ProfileService:
-    def __init__(self, repository: ProfileRepositoryInterface):
+    def __init__(self, repository: ProfileRepositoryInterface, principal_cache: PrincipalCache):
         self._repository = repository
+        self._principal_cache = principal_cache
 
-    async def update_profile(self, data: UserUpdateSchema, user: User):
+    async def update_profile(self, data: UserUpdateSchema, user: Principal):
         updated_data = data.dict(exclude_none=True)
-        return await self._repository.update_profile(updated_data=updated_data, user=user)
+        updated_user = await self._repository.update_profile(updated_data=updated_data, user=user)
+        self._principal_cache.invalidate_user(user_id=user.id)
+        return updated_user
 
-    async def delete_user(self, user: User):
-        return await self._repository.delete_user(user=user)
+    async def delete_user(self, user: Principal):
+        result = await self._repository.delete_user(user=user)
+        self._principal_cache.invalidate_user(user_id=user.id)
+        return result
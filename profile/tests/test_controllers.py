@@ -39,6 +39,11 @@ class TestProfileController:
         response = await first_user_client_with_jwt.delete(url='/profile/')
         assert response.status_code == 204
 
+    @pytest.mark.asyncio
+    async def test_deleted_user_token_rejected(self, first_user_client_with_jwt: AsyncClient):
+        response = await first_user_client_with_jwt.put(url='/profile/', json={'first_name': 'elliot'})
+        assert response.status_code == 401
+
     @pytest.mark.asyncio
     async def test_failure_delete_user_not_authenticated(self, client_without_jwt: AsyncClient):
         response = await client_without_jwt.delete(url='/profile/')
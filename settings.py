@@ -1,5 +1,6 @@
 from functools import lru_cache
 from pathlib import Path
+from typing import Optional
 
 from pydantic import BaseSettings
 
@@ -28,6 +29,42 @@ class Settings(BaseSettings):
     test_image_path: str
     test_listing_image_path: str
 
+    metrics_token: Optional[str] = None
+
+    principal_cache_size: int = 10_000
+    principal_cache_ttl: int = 300
+
+    password_hash_rounds: int = 12
+    password_hash_workers: int = 4
+
+    geocode_cache_size: int = 10_000
+    geocode_cache_ttl: int = 86_400
+    geocode_async: bool = False
+    # one budget per database: app processes and backfill_geocode share an advisory lock, and only its holder calls upstream
+    geocode_requests_per_second: float = 1.0
+    geocode_batch_size: int = 20
+    geocode_poll_interval: float = 5.0
+    geocode_claim_timeout: float = 300.0
+
+    # 'memory' keeps cached results and invalidation generations inside one process, so it is only correct with a single worker;
+    # run more than one worker against 'redis', which also carries the detail cache invalidations
+    listings_cache_backend: Optional[str] = 'memory'
+    listings_cache_ttl: float = 30.0
+    listings_cache_size: int = 10_000
+    listings_cache_max_bytes: int = 64 * 1024 * 1024
+    redis_url: Optional[str] = None
+
+    listing_detail_cache_size: int = 10_000
+    listing_detail_cache_ttl: float = 300.0
+    listing_detail_cache_negative_ttl: float = 30.0
+    listing_detail_cache_max_bytes: int = 64 * 1024 * 1024
+
+    listings_fast_read_routes: set[str] = set()
+    listings_exact_count_limit: int = 1000
+
+    gazetteer_dir: Optional[str] = None
+    gazetteer_max_distance_km: Optional[float] = 50.0
+
     class Config:
         env_file = '.env'
         env_file_encoding = 'utf-8'
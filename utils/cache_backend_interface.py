@@ -0,0 +1,21 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+
+class CacheBackendInterface(ABC):
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]: pass
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float): pass
+
+    @abstractmethod
+    async def get_generation(self, namespace: str) -> int: pass
+
+    @abstractmethod
+    async def bump_generation(self, namespace: str) -> int: pass
+
+    async def close(self): ...
+
+    def stats(self) -> dict:
+        return {}
@@ -0,0 +1,65 @@
+from collections import defaultdict
+from typing import Optional
+from .cache_backend_interface import CacheBackendInterface
+from .ttl_cache import TTLCache
+
+try:
+    from redis import asyncio as aioredis
+except ImportError:
+    aioredis = None
+
+
+class MemoryCacheBackend(CacheBackendInterface):
+    def __init__(self, maxsize: int, maxbytes: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl, maxbytes=maxbytes)
+        self._generations: defaultdict[str, int] = defaultdict(int)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float):
+        self._cache.set(key, value, ttl=ttl)
+
+    async def get_generation(self, namespace: str) -> int:
+        return self._generations[namespace]
+
+    async def bump_generation(self, namespace: str) -> int:
+        self._generations[namespace] += 1
+        self._cache.invalidate(lambda key, _: key.startswith(f'{namespace}:'))
+        return self._generations[namespace]
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+class RedisCacheBackend(CacheBackendInterface):
+    def __init__(self, url: str):
+        if aioredis is None:
+            raise RuntimeError('The redis package is required for the redis cache backend')
+        self._redis = aioredis.from_url(url)
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> Optional[bytes]:
+        value = await self._redis.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: float):
+        await self._redis.set(key, value, px=max(int(ttl * 1000), 1))
+
+    async def get_generation(self, namespace: str) -> int:
+        return int(await self._redis.get(f'{namespace}:generation') or 0)
+
+    async def bump_generation(self, namespace: str) -> int:
+        return await self._redis.incr(f'{namespace}:generation')
+
+    async def close(self):
+        await self._redis.close()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'hit_ratio': self.hits / lookups if lookups else 0.0}
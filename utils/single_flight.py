@@ -0,0 +1,39 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class SingleFlight:
+    def __init__(self):
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        self.calls += 1
+        while (future := self._inflight.get(key)) is not None:
+            await asyncio.wait({future})
+            if not future.cancelled():
+                self.coalesced += 1
+                return future.result()
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await func()
+        except Exception as error:
+            future.set_exception(error)
+            future.exception()
+            raise
+        except BaseException:
+            # the leader was cancelled: wake the followers without its error so one of them takes over
+            future.cancel()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def stats(self) -> dict:
+        return {'calls': self.calls, 'coalesced': self.coalesced, 'inflight': len(self._inflight),
+                'coalescing_ratio': self.coalesced / self.calls if self.calls else 0.0}
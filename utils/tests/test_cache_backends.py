@@ -0,0 +1,14 @@
+import pytest
+from ..cache_backends import MemoryCacheBackend
+
+
+class TestMemoryCacheBackend:
+    @pytest.mark.asyncio
+    async def test_bump_generation_drops_namespace(self):
+        backend = MemoryCacheBackend(maxsize=10, maxbytes=1024, ttl=60)
+        await backend.set('listings:0:a', b'a', ttl=60)
+        await backend.set('other:0:a', b'b', ttl=60)
+        assert await backend.get_generation('listings') == 0
+        assert await backend.bump_generation('listings') == 1
+        assert await backend.get('listings:0:a') is None
+        assert await backend.get('other:0:a') == b'b'
@@ -0,0 +1,33 @@
+import time
+from datetime import datetime, timedelta, timezone
+import pytest
+from ..conditional import etag_matches, http_date, make_etag
+
+
+class TestConditional:
+    @pytest.mark.parametrize('if_none_match, etag, expected_value', [
+        (None, '"a"', False),
+        ('"a"', '"a"', True),
+        ('W/"a"', '"a"', True),
+        ('"b", W/"a"', 'W/"a"', True),
+        ('"b"', '"a"', False),
+        ('*', '"a"', True),
+    ])
+    def test_etag_matches(self, if_none_match, etag, expected_value):
+        assert etag_matches(if_none_match=if_none_match, etag=etag) == expected_value
+
+    def test_make_etag(self):
+        assert make_etag(1, 'a') == make_etag(1, 'a') != make_etag(1, 'b')
+        assert make_etag(1, weak=True).startswith('W/"')
+
+    @pytest.fixture
+    def new_york_time(self, monkeypatch):
+        monkeypatch.setenv('TZ', 'America/New_York')
+        time.tzset()
+        yield
+        monkeypatch.undo()
+        time.tzset()
+
+    @pytest.mark.parametrize('value', [datetime(2021, 12, 1, 10, 30), datetime(2021, 12, 1, 17, 30, tzinfo=timezone(timedelta(hours=2)))])
+    def test_http_date_converts_to_gmt(self, new_york_time, value: datetime):
+        assert http_date(value) == 'Wed, 01 Dec 2021 15:30:00 GMT'
@@ -0,0 +1,68 @@
+import asyncio
+import pytest
+from ..single_flight import SingleFlight
+
+
+class TestSingleFlight:
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_result(self):
+        single_flight = SingleFlight()
+        calls = []
+
+        async def load():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return len(calls)
+
+        results = await asyncio.gather(*(single_flight.do('key', load) for _ in range(3)))
+        assert results == [1, 1, 1]
+        assert single_flight.stats()['coalesced'] == 2
+        assert await single_flight.do('key', load) == 2
+
+    @pytest.mark.asyncio
+    async def test_error_is_shared_and_not_cached(self):
+        single_flight = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError('upstream error')
+
+        results = await asyncio.gather(*(single_flight.do('key', fail) for _ in range(2)), return_exceptions=True)
+        assert all(isinstance(result, ValueError) for result in results)
+        assert single_flight.stats()['inflight'] == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_leader_hands_over_to_follower(self):
+        single_flight = SingleFlight()
+        calls = []
+
+        async def load():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return len(calls)
+
+        leader = asyncio.create_task(single_flight.do('key', load))
+        await asyncio.sleep(0)
+        followers = [asyncio.create_task(single_flight.do('key', load)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        assert await asyncio.gather(*followers) == [2, 2]
+        assert leader.cancelled()
+        assert single_flight.stats()['inflight'] == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_follower_does_not_affect_leader(self):
+        single_flight = SingleFlight()
+
+        async def load():
+            await asyncio.sleep(0.02)
+            return 'value'
+
+        leader = asyncio.create_task(single_flight.do('key', load))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(single_flight.do('key', load))
+        await asyncio.sleep(0.01)
+        follower.cancel()
+        assert await leader == 'value'
+        assert follower.cancelled()
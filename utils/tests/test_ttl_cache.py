@@ -0,0 +1,49 @@
+import time
+import pytest
+from ..ttl_cache import TTLCache
+
+
+class TestTTLCache:
+
+    def test_get_and_set(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set('a', 1)
+        assert cache.get('a') == 1
+        assert cache.get('b') is None
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_lru_eviction(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        assert cache.get('b') is None
+        assert cache.get('a') == 1
+        assert cache.get('c') == 3
+
+    @pytest.mark.parametrize('ttl', [0.01, -1])
+    def test_expired_entries(self, ttl: float):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set('a', 1, ttl=ttl)
+        time.sleep(0.02)
+        assert cache.get('a') is None
+        assert len(cache) == 0
+
+    def test_invalidate(self):
+        cache = TTLCache(maxsize=10, ttl=60)
+        for i in range(5):
+            cache.set(i, i % 2)
+        assert cache.invalidate(lambda key, value: value == 1) == 2
+        assert len(cache) == 3
+        assert cache.stats()['size'] == 3
+
+    def test_maxbytes_eviction(self):
+        cache = TTLCache(maxsize=10, ttl=60, maxbytes=10)
+        cache.set('a', b'1234')
+        cache.set('b', b'1234')
+        cache.set('c', b'1234')
+        cache.set('too_big', b'12345678901')
+        assert cache.get('a') is None
+        assert cache.get('too_big') is None
+        assert cache.stats()['bytes'] == 8
@@ -0,0 +1,76 @@
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+MISSING = object()
+
+
+class TTLCache:
+    def __init__(self, maxsize: int, ttl: float, maxbytes: Optional[int] = None, weigher: Callable[[Any], int] = len):
+        self._maxsize = maxsize
+        self._maxbytes = maxbytes
+        self._weigher = weigher
+        self._ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any, int]] = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _weight(self, value: Any) -> int:
+        return self._weigher(value) if self._maxbytes is not None else 0
+
+    def _remove(self, key: Hashable) -> Any:
+        item = self._data.pop(key, MISSING)
+        if item is MISSING:
+            return MISSING
+        self._bytes -= item[2]
+        return item[1]
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        item = self._data.get(key, MISSING)
+        if item is MISSING or item[0] <= time.monotonic():
+            if item is not MISSING:
+                self._remove(key)
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return item[1]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        ttl = self._ttl if ttl is None else ttl
+        self._remove(key)
+        if ttl <= 0:
+            return
+        weight = self._weight(value)
+        if self._maxbytes is not None and weight > self._maxbytes:
+            return
+        self._data[key] = (time.monotonic() + ttl, value, weight)
+        self._bytes += weight
+        while len(self._data) > self._maxsize or (self._maxbytes is not None and self._bytes > self._maxbytes):
+            self._remove(next(iter(self._data)))
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        value = self._remove(key)
+        return default if value is MISSING else value
+
+    def invalidate(self, predicate: Callable[[Hashable, Any], bool]) -> int:
+        keys = [key for key, (_, value, _) in self._data.items() if predicate(key, value)]
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+
+    def clear(self):
+        self._data.clear()
+        self._bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        stats = {'size': len(self._data), 'maxsize': self._maxsize, 'hits': self.hits, 'misses': self.misses,
+                 'hit_ratio': self.hits / lookups if lookups else 0.0}
+        if self._maxbytes is not None:
+            stats.update({'bytes': self._bytes, 'maxbytes': self._maxbytes})
+        return stats